@@ -1,18 +1,21 @@
-from fastapi import FastAPI # Imports FastAPI class to create the main app instance
+from fastapi import FastAPI, Request, HTTPException # Imports FastAPI class to create the main app instance, Request and HTTPException for the metrics token check
 from fastapi.middleware.cors import CORSMiddleware # Imports CORS to enable communication beteween frontend and backend
-from fastapi.templating import Jinja2Templates  # Imports Jinja2 template support
-from fastapi.staticfiles import StaticFiles # Serves Static Files Like CSS, JS & Images
 from routes.admin_routes import router as admin_router # Imports Admin router instance from the admin_routes module and renames it as admin_router
 from routes.protected_routes import router as protected_router  # Imports Protected router instance from the protected_routes module and renames it as protected_router
 from fastapi.middleware.wsgi import WSGIMiddleware # Imports WSGI adapter to mount WSGI apps inside FastAPI
-from fastapi.responses import RedirectResponse  # For returning HTML content in the welcome route
+from fastapi.responses import RedirectResponse, Response  # For returning HTML content in the welcome route
 from routes.frontend_routes import router as frontend_router # Imports API router instance from the frontend_routes module and renames it as frontendrouter
 from routes.backend_routes import router as backend_router  # Imports API router instance from the api_routes module and rename it as api_router
 from routes.user_routes import router as user_router # Imports User router instance from the user_routes module and renames it as user_router
-from routes.ui_routes import router as ui_router  # Imports UI router instance from the ui_routes module and rename it as ui_router
+from routes.ui_routes import router as ui_router, mongo_indexes, tally_journal  # Imports UI router instance from the ui_routes module and rename it as ui_router, plus its Mongo index manager and tally journal
 from routes.email_routes import router as email_router  # Imports Email router instance from the email_routes module and rename it as email_router
-from fastapi.templating import Jinja2Templates  # Imports Jinja2 template support
-from pathlib import Path # Provides object-oriented file system paths
+from config.query_profiler import PROFILER_ENABLED, QueryProfilerMiddleware, profiler # Imports the opt-in per-route query profiler
+from config.metrics import METRICS_ENABLED, MetricsMiddleware, render_metrics, mark_worker_dead, metrics_authorized # Imports the Prometheus metrics middleware and exposition
+from database.database import engine # Imports the engine whose pool saturation is exported
+from config.compression import COMPRESSION_ENABLED, CompressionMiddleware # Imports the gzip/brotli response compression
+from config.static_assets import ImmutableStaticFiles, ASSETS_BUILD_ON_STARTUP, assets # Serves fingerprinted assets with immutable caching
+from config.templates import templates, precompile, TEMPLATE_PRECOMPILE # Shared template environment every router renders with
+from config.static_pages import static_pages # Constant pages rendered once
 import os
 
 app = FastAPI(
@@ -48,8 +51,7 @@ class AuthenticatedWSGIMiddleware:
         return self.app(environ, custom_start_response)  # Forwards request to wrapped app
 
 
-app.mount("/static", StaticFiles(directory="static"), name="static") # Mounts the 'static' Files directory making it accessible via '/static' URL 
-templates = Jinja2Templates(directory=Path(__file__).parent.parent/"templates")  # Sets up Jinja2Templates for dynamic HTML rendering from templates folder
+app.mount("/static", ImmutableStaticFiles(directory="static"), name="static") # Mounts the 'static' Files directory making it accessible via '/static' URL, fingerprinted files under static/dist are cached for a year
 
 # Registers routers for different features
 app.include_router(backend_router, prefix="/api", tags=["Backend"]) # Adds the Backend router to the main app, prefixing all its routes with "/api" meaning every path inside the api_router will be available under "/api". The tags parameter groups the routes under a Backend tag in Swagger UI
@@ -66,6 +68,40 @@ print(f"Current ENV: {ENV}")
 if ENV not in ["dev", "prod"]:
     raise ValueError("Invalid ENV setting. Must be 'dev' or 'prod'.")
 
+# Ensures the Mongo indexes in the background, status is reported at /api/diagnostics/mongo-indexes
+@app.on_event("startup")
+def provision_mongo_indexes():
+    mongo_indexes.ensure_in_background()
+
+# Restores the station tallies saved before the last shutdown or crash before any request is served
+@app.on_event("startup")
+def restore_station_tallies():
+    if tally_journal is not None:
+        tally_journal.open()
+
+# Writes a final tally snapshot when the server stops
+@app.on_event("shutdown")
+def snapshot_station_tallies():
+    if tally_journal is not None:
+        tally_journal.close()
+
+# Compiles every template before the first request, loading the bytecode cache written by earlier workers
+@app.on_event("startup")
+def precompile_templates():
+    if TEMPLATE_PRECOMPILE:
+        precompile(templates)
+
+# Renders the constant pages once, later hits are served from memory with an ETag
+@app.on_event("startup")
+def prerender_static_pages():
+    static_pages.render_all()
+
+# Builds missing fingerprinted and converted assets in the background, templates use the plain /static paths until the manifest is loaded
+@app.on_event("startup")
+def build_static_assets():
+    if ASSETS_BUILD_ON_STARTUP:
+        assets.rebuild_in_background()
+
 @app.get("/", response_class=RedirectResponse)
 def root_redirect():
     if ENV == "prod":
@@ -88,4 +124,41 @@ app.add_middleware(
     allow_credentials=True,     # Allows cookies and authentication headers
     allow_methods=["*"],        # Allows all HTTP methods 
     allow_headers=["*"],        # Allows all headers
-)
\ No newline at end of file
+)
+
+# Compresses pages, JSON and exports with brotli or gzip, switched off with COMPRESSION_ENABLED=false
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Opt-in per-route SQL/Mongo query profiling enabled with QUERY_PROFILER=true
+if PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+
+    # Returns query counts and time per route plus the slow query log
+    @app.get("/debug/queries", tags=["Debug"])
+    def query_profile():
+        return profiler.summary()
+
+    # Clears the collected query statistics
+    @app.delete("/debug/queries", tags=["Debug"])
+    def reset_query_profile():
+        profiler.reset()
+        return {"success": True}
+
+# Prometheus metrics for route, DB and SMTP latency plus hot path counters and saturation gauges
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, engine=engine)
+
+    # Exposes metrics in the Prometheus text format, aggregated over all workers when PROMETHEUS_MULTIPROC_DIR is set
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(request: Request):
+        if not metrics_authorized(request.headers.get("authorization")):
+            raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+        payload, content_type = render_metrics()
+        return Response(content=payload, media_type=content_type)
+
+    # Drops this worker's live gauges when it stops
+    @app.on_event("shutdown")
+    def remove_worker_metrics():
+        mark_worker_dead()
+
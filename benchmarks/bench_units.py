@@ -0,0 +1,112 @@
+import pytest # Testing framework to define and run benchmark functions
+from datetime import datetime, timedelta # Expiry of the revoked benchmark tokens
+from benchmarks.harness import build_app, item_names, BENCH_EMAIL, BENCH_PASSWORD # Throwaway SQLite and Mongo wiring
+
+app = build_app() # Configures the environment before any app module is imported below
+
+from fastapi.testclient import TestClient # Simulates requests to the app
+from crud.tally_operations import Catalogue, StationTally # Per-station tallies
+from utilities.utils import AppUtils, ExportUtils # Totals, equivalents and export helpers
+from routes.ui_routes import catalogue, fragments # Catalogue and fragment cache the UI uses
+from jose import jwt # Decodes tokens without the revocation check
+from config.jwt_handler import JWTHandler, JWT_SECRET, JWT_ALGORITHM # Login token creation and verification
+from config.token_revocation import revoked_tokens # In-memory denylist consulted on every verification
+
+# Stored session documents like MongoCRUD.insert_session writes, for a large event
+SESSIONS = [{"session": [{"ingesamt": 2.5 + index % 7, **AppUtils.calculate_equivalents(2.5 + index % 7)}]} for index in range(5000)]
+
+# Pytest fixture provides a client with its own station cookie
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+# UNIT BENCHMARKS
+# Benchmarks one tally click on a station
+def test_station_update(benchmark):
+    tally = StationTally(catalogue)
+    benchmark(tally.update, catalogue.names[0], "increment")
+
+# Benchmarks building the grouped view rendered by the templates
+def test_station_grouped_view(benchmark):
+    tally = StationTally(catalogue)
+    benchmark(tally.grouped)
+
+# Benchmarks cumulative totals over a large event
+def test_calculate_total(benchmark):
+    totals, count = benchmark(AppUtils.calculate_total, SESSIONS)
+    assert count == len(SESSIONS)
+
+# Benchmarks recomputing equivalents and running sums for a large event
+def test_batch_totals(benchmark):
+    benchmark(AppUtils.batch_totals, [doc["session"][0]["ingesamt"] for doc in SESSIONS])
+
+# Benchmarks a cached item fragment
+def test_fragment_cache_hit(benchmark):
+    context = {"item": catalogue.item_view(0, 1), "hx_post_url": "/UI/main/hx-updatee"}
+    fragments.render("partials/item.html", ("bench", 1), context)
+    benchmark(fragments.render, "partials/item.html", ("bench", 1), context)
+
+# Benchmarks serialising a session export
+def test_export_stream(benchmark):
+    rows = [{"timestamp": "2026-05-01T10:00:00", "ingesamt": 2.5, "item": "Hemd", "count": 1, "co2": 2.5}] * 5000
+    benchmark(lambda: sum(len(chunk) for chunk in ExportUtils.stream(rows, list(rows[0]), "csv")))
+
+# Function to fill the denylist like a busy day of logouts would
+def revoke_many(count: int = 10000):
+    for index in range(count):
+        revoked_tokens.revoked[f"bench-{index}"] = datetime.utcnow() + timedelta(hours=24)
+
+# Benchmarks decoding a login token without the revocation check, the baseline for the one below
+def test_decode_login_token(benchmark):
+    token = JWTHandler.create_login_token(BENCH_EMAIL, 1, "Bench", "User")
+    benchmark(jwt.decode, token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+
+# Benchmarks verifying a login token against a denylist of 10000 revoked tokens
+def test_verify_login_token(benchmark):
+    revoke_many()
+    token = JWTHandler.create_login_token(BENCH_EMAIL, 1, "Bench", "User")
+    assert benchmark(JWTHandler.verify_login_token, token)["sub"] == BENCH_EMAIL
+
+# Benchmarks the revocation check alone
+def test_revocation_check(benchmark):
+    revoke_many()
+    assert benchmark(revoked_tokens.is_revoked, "bench-42") is True
+
+# ROUTE BENCHMARKS
+# Benchmarks a demo page tally click
+def test_route_hx_update(benchmark, client):
+    response = benchmark(client.post, "/UI/hx-update", data={"action": "increment", "item_name": item_names()[0]})
+    assert response.status_code == 200
+
+# Benchmarks a main page tally click
+def test_route_hx_updatee(benchmark, client):
+    response = benchmark(client.post, "/UI/main/hx-updatee", data={"action": "increment", "item_name": item_names()[1]})
+    assert response.status_code == 200
+
+# Benchmarks saving a session
+def test_route_main_reset(benchmark, client):
+    # Counts one item before every save so each round inserts a session
+    def save():
+        client.post("/UI/main/hx-updatee", data={"action": "increment", "item_name": item_names()[2]})
+        return client.post("/UI/main/reset", follow_redirects=False)
+    assert benchmark(save).status_code == 303
+
+# Benchmarks a client login, dominated by bcrypt
+def test_route_login(benchmark, client):
+    response = benchmark.pedantic(client.post, args=("/rec/auth/login",), kwargs={"json": {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}}, rounds=10)
+    assert response.status_code == 200
+
+# Benchmarks a token verification request, revocation check included
+def test_route_verify_token(benchmark, client):
+    token = client.post("/rec/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}).json()["data"]["token"]
+    response = benchmark(client.get, "/rec/auth/verify", params={"token": token})
+    assert response.status_code == 200
+
+# Benchmarks a pre-rendered email outcome page
+def test_route_static_page(benchmark, client):
+    assert benchmark(client.get, "/email/approved").status_code == 200
+
+# Benchmarks the admin backend page
+def test_route_api(benchmark, client):
+    assert benchmark(client.get, "/api/").status_code == 200
@@ -0,0 +1,60 @@
+import argparse # Parses command line arguments
+import json # Writes the results
+import time # Measures CPU time
+from benchmarks.harness import build_app, item_names # Throwaway SQLite and Mongo wiring
+
+app = build_app() # Configures the environment before any app module is imported below
+
+from fastapi.testclient import TestClient # Fetches the uncompressed responses
+from config.compression import Compressor, SUPPORTED_ENCODINGS # Compressors the middleware uses
+
+# Responses measured: (label, method, path, form data)
+RESPONSES = [
+    ("main page", "GET", "/UI/main", None),
+    ("demo page", "GET", "/UI/", None),
+    ("admin page", "GET", "/api/", None),
+    ("hx-updatee fragment", "POST", "/UI/main/hx-updatee", "increment"),
+    ("hx-update fragment", "POST", "/UI/hx-update", "increment"),
+]
+GZIP_LEVELS = [1, 6, 9]
+BROTLI_QUALITIES = [1, 4, 6, 11]
+
+# Function to fetch every measured response without compression
+def fetch_bodies():
+    bodies = {}
+    with TestClient(app) as client:
+        for label, method, path, action in RESPONSES:
+            data = {"action": action, "item_name": item_names()[0]} if action else None
+            response = client.request(method, path, data=data, headers={"accept-encoding": "identity"})
+            response.raise_for_status()
+            bodies[label] = response.content
+    return bodies
+
+# Function to compress one body repeatedly and return its compressed size and CPU time per response
+def measure(body: bytes, encoding: str, level: int, rounds: int):
+    start = time.process_time()
+    for _ in range(rounds):
+        compressed = Compressor(encoding, gzip_level=level, brotli_quality=level).compress(body, final=True)
+    cpu_us = (time.process_time() - start) / rounds * 1_000_000
+    return {"encoding": encoding, "level": level, "bytes": len(compressed), "ratio": round(len(body) / len(compressed), 2), "cpu_us": round(cpu_us, 1)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare bytes on the wire and CPU per response of gzip and brotli levels for the main pages")
+    parser.add_argument("--rounds", type=int, default=200, help="Compressions per measurement")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for label, body in fetch_bodies().items():
+        settings = [("gzip", level) for level in GZIP_LEVELS]
+        if "br" in SUPPORTED_ENCODINGS:
+            settings += [("br", quality) for quality in BROTLI_QUALITIES]
+        results[label] = {"identity_bytes": len(body), "encodings": [measure(body, encoding, level, args.rounds) for encoding, level in settings]}
+
+        print(f"{label} ({len(body)} bytes uncompressed)")
+        for row in results[label]["encodings"]:
+            print(f"  {row['encoding']:>4} {row['level']:>2}: {row['bytes']:>7} bytes  x{row['ratio']:<6} {row['cpu_us']:>8} us CPU")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2)
@@ -0,0 +1,72 @@
+import os # Sets the environment before the app modules read it
+import tempfile # Scratch directory for the SQLite database and archive
+from pathlib import Path # Provides object-oriented file system paths
+
+# Benchmark Configurations
+BENCH_DIR = Path(os.getenv("BENCH_DIR") or tempfile.mkdtemp(prefix="co2-bench-")) # Holds the SQLite file and the Parquet archive
+BENCH_MONGO_URL = os.getenv("BENCH_MONGO_URL") # A local mongod to benchmark against, mongomock is used when unset
+BENCH_EMAIL = "bench.user@example.com" # Verified client account used by the login scenario
+BENCH_PASSWORD = "Bench#Password1"
+CATEGORIES = ["UNTERTEILE", "OBERTEILE", "ACCESSORIES", "JACKEN", "EINTEILER & SCHUHE"] # The five categories main.html and demo.html render
+ITEMS_PER_CATEGORY = 8
+
+_app = None # App built once per process
+
+# Points the app at a throwaway SQLite database and Mongo before any app module is imported
+def configure_environment():
+    os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR / 'bench.db'}"
+    os.environ["SQL_ECHO"] = "false"
+    os.environ["ARCHIVE_DIR"] = str(BENCH_DIR / "archive")
+    os.environ["TALLY_JOURNAL_DIR"] = str(BENCH_DIR / "tally")
+    os.environ["TEMPLATE_CACHE_DIR"] = str(BENCH_DIR / "jinja_cache")
+    os.environ.setdefault("JWT", "benchmark-secret")
+    os.environ.setdefault("ENV", "dev")
+
+    import database.database as database # Reads DATABASE_URL on import
+    if database.engine is None: # Imported earlier without a database, e.g. by other test modules
+        database.engine = database.connect_sql(os.environ["DATABASE_URL"])
+        database.SessionLocal.configure(bind=database.engine)
+    if BENCH_MONGO_URL:
+        database.uri = None # Skips Atlas and connects to the local server
+        database.LOCAL_MONGO_URL = BENCH_MONGO_URL
+    else:
+        import mongomock # In-memory Mongo for runs without a server
+        database.MongoClient = mongomock.MongoClient
+        database.uri = "mongodb://benchmark"
+    return database
+
+# Seeds the catalogue and a verified client user, the UI loads the catalogue when its module is imported
+def seed(database):
+    from crud.operations import CatalogueCRUD
+    from models.models import User
+    from schemas.schemas import CreateCategory, CreateItem
+    from config.pwd_handler import PWDHandler
+
+    database.Base.metadata.create_all(bind=database.engine)
+    categories = [CreateCategory(name=name, description=None) for name in CATEGORIES]
+    items = [CreateItem(name=f"{name.title()} {index}", base_co2=1.5 + index, category_name=name) for name in CATEGORIES for index in range(ITEMS_PER_CATEGORY)]
+
+    with database.SessionLocal() as db:
+        CatalogueCRUD().import_catalogue(db, categories, items)
+        if not db.query(User).filter(User.email == BENCH_EMAIL).first():
+            db.add(User(first_name="Bench", last_name="Marker", email=BENCH_EMAIL, password=PWDHandler.hash_password(BENCH_PASSWORD), user_type="client", is_verified=True))
+            db.commit()
+    return [item.name for item in items]
+
+# Returns the FastAPI app wired to the benchmark databases
+def build_app():
+    global _app
+    if _app is None:
+        database = configure_environment()
+        seed(database)
+        if BENCH_MONGO_URL:
+            from routes.ui_routes import mongo_client # Starts each run from empty session and event collections
+            mongo_client.db.drop_collection("sessions")
+            mongo_client.db.drop_collection("Event_Logs")
+        from app.main import app
+        _app = app
+    return _app
+
+# Names of the seeded items, in catalogue order
+def item_names():
+    return [f"{name.title()} {index}" for name in CATEGORIES for index in range(ITEMS_PER_CATEGORY)]
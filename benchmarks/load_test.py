@@ -0,0 +1,123 @@
+import argparse # Parses command line arguments
+import asyncio # Runs concurrent virtual users
+import json # Writes and reads result files
+import random # Picks items to count
+import statistics # Latency percentiles
+import sys # Exit status for regressions
+import time # Measures latency and throughput
+from datetime import datetime # Timestamps result files
+import httpx # Async HTTP client, in-process through ASGITransport or against a running server
+from benchmarks.harness import build_app, item_names, BENCH_EMAIL, BENCH_PASSWORD, BENCH_MONGO_URL # Throwaway SQLite and Mongo wiring
+
+HTMX_HEADERS = {"HX-Request": "true"} # Sent by htmx with every fragment request
+
+# Scenario name -> (method, path, request builder), each virtual user keeps its own cookies and therefore its own station
+SCENARIOS = {
+    "hx-update": ("POST", "/UI/hx-update", lambda names: {"data": {"action": "increment", "item_name": random.choice(names)}, "headers": HTMX_HEADERS}),
+    "main-hx-updatee": ("POST", "/UI/main/hx-updatee", lambda names: {"data": {"action": random.choice(["increment", "increment", "decrement"]), "item_name": random.choice(names)}, "headers": HTMX_HEADERS}),
+    "main-reset": ("POST", "/UI/main/reset", lambda names: {}),
+    "auth-login": ("POST", "/rec/auth/login", lambda names: {"json": {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}}),
+    "api": ("GET", "/api/", lambda names: {}),
+}
+
+# Sends one scenario's requests from several concurrent users and returns latency percentiles and throughput
+async def run_scenario(make_client, name: str, requests: int, concurrency: int):
+    method, path, build = SCENARIOS[name]
+    names = item_names()
+    latencies, errors = [], 0
+    remaining = iter(range(requests)) # Shared work queue, each user takes the next request number
+
+    # One virtual user sending requests until the scenario's budget is spent
+    async def user():
+        nonlocal errors
+        async with make_client() as client:
+            for _ in remaining:
+                if name == "main-reset":
+                    await client.post("/UI/main/hx-updatee", data={"action": "increment", "item_name": random.choice(names)}, headers=HTMX_HEADERS) # Something to save
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **build(names))
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, errors, elapsed)
+
+# Reduces raw latencies to the reported statistics
+def summarize(latencies: list, errors: int, elapsed: float):
+    ordered = sorted(latencies)
+    percentile = lambda p: round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+# Compares results against a stored baseline and returns the regressions found
+def compare(results: dict, baseline: dict, tolerance: float):
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {previous['p95_ms']} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {current['throughput_rps']} req/s vs baseline {previous['throughput_rps']} req/s")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors vs baseline {previous['errors']}")
+    return regressions
+
+async def main(args):
+    if args.base_url:
+        make_client = lambda: httpx.AsyncClient(base_url=args.base_url, timeout=30) # The server must hold the benchmark user and catalogue
+    else:
+        transport = httpx.ASGITransport(app=build_app())
+        make_client = lambda: httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30)
+
+    scenarios = {}
+    for name in args.scenarios:
+        requests = args.login_requests if name == "auth-login" else args.requests # bcrypt makes logins orders of magnitude slower
+        scenarios[name] = await run_scenario(make_client, name, requests, args.concurrency)
+        stats = scenarios[name]
+        print(f"{name:>16}: {stats['throughput_rps']:>8} req/s  p50 {stats['p50_ms']:>9} ms  p95 {stats['p95_ms']:>9} ms  p99 {stats['p99_ms']:>9} ms  errors {stats['errors']}")
+
+    return {
+        "meta": {"at": datetime.utcnow().isoformat(), "target": args.base_url or "in-process", "mongo": BENCH_MONGO_URL or "mongomock", "concurrency": args.concurrency, "requests": args.requests, "login_requests": args.login_requests},
+        "scenarios": scenarios,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the tally, admin and auth routes and compare against a baseline")
+    parser.add_argument("--base-url", help="Running server to test, the app is run in-process on SQLite and mongomock when omitted")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=40, help="Requests for the login scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the results")
+    parser.add_argument("--baseline", help="Results file to compare against, e.g. benchmarks/baseline.json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 increase and throughput drop before a scenario counts as a regression")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    with open(args.output, "w", encoding="utf-8") as out:
+        json.dump(results, out, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,78 @@
+import argparse # Parses command line arguments
+import json # Writes results for comparison between runs
+import os # Accesses the environment variables
+import random # Picks items to increment
+import statistics # Latency percentiles
+import time # Measures throughput and latency
+from concurrent.futures import ThreadPoolExecutor # Runs concurrent increments
+from dotenv import load_dotenv # Loads secrets from .env.
+from pymongo import MongoClient # Connects to the benchmark server
+from crud.mongo_operations import MongoCRUD # Layout aware Mongo operations under test
+
+load_dotenv() # Loads Environment Variables from .env File
+
+BENCH_DB = "co2_layout_benchmark" # Scratch database, dropped after the run
+
+# Builds a catalogue of categories and items like the seeded co2 collection
+def build_catalogue(categories: int, items_per_category: int):
+    return [
+        {"category": f"CAT{c}", "items": [{"name": f"item-{c}-{i}", "base_co2": 1.5, "count": 0, "co2": 0} for i in range(items_per_category)]}
+        for c in range(categories)
+    ]
+
+# Runs concurrent update_item calls against one layout and returns throughput and latency
+def run_layout(client, layout: str, catalogue: list, threads: int, increments: int, hot_category: bool):
+    client.drop_database(BENCH_DB)
+    db = client[BENCH_DB]
+    mongo = MongoCRUD(co2=db["co2"], sos=db["sessions"], logs=db["Event_Logs"], items=db["co2_items"], layout=layout)
+    db["co2"].create_index("category", unique=True)
+    db["co2_items"].create_index("name", unique=True)
+    mongo.send_to_mongo(catalogue)
+
+    targets = [(category["category"], item["name"]) for category in catalogue[:1 if hot_category else None] for item in category["items"]] # A hot category puts every writer on the same embedded document
+
+    # Increments random items and records each call's latency
+    def worker(_):
+        latencies = []
+        for _ in range(increments):
+            category, name = random.choice(targets)
+            start = time.perf_counter()
+            mongo.update_item(category, name, 1, 1.5)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = [latency for batch in pool.map(worker, range(threads)) for latency in batch]
+    elapsed = time.perf_counter() - start
+
+    assert sum(item["count"] for item in mongo.get_item_totals()) == threads * increments # Every increment landed
+    client.drop_database(BENCH_DB)
+    return {
+        "layout": layout,
+        "operations": len(latencies),
+        "ops_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(statistics.quantiles(latencies, n=20)[18] * 1000, 3),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare concurrent increment throughput of the embedded and flat Mongo layouts")
+    parser.add_argument("--url", default=os.getenv("LOCAL_MONGO_URL", "mongodb://localhost:27017"), help="Mongo server to benchmark against, never a production cluster")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--increments", type=int, default=500, help="Increments per thread")
+    parser.add_argument("--categories", type=int, default=5)
+    parser.add_argument("--items", type=int, default=12, help="Items per category")
+    parser.add_argument("--hot-category", action="store_true", help="Send every increment to items of one category")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    client = MongoClient(args.url)
+    catalogue = build_catalogue(args.categories, args.items)
+    results = [run_layout(client, layout, catalogue, args.threads, args.increments, args.hot_category) for layout in ("embedded", "flat")]
+
+    for result in results:
+        print(f"{result['layout']:>8}: {result['ops_per_second']:>9} ops/s  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump({"threads": args.threads, "increments": args.increments, "hot_category": args.hot_category, "results": results}, out, indent=2)
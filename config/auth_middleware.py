@@ -59,7 +59,10 @@ class AuthMiddleware:
             if not token:
                 raise HTTPException(status_code=401, detail="Not authenticated - token missing") # Raises 401 if no cookie
             
-            payload = JWTHandler.verify_login_token(token) # Decodes and verifies token
+            try:
+                payload = JWTHandler.verify_login_token(token) # Decodes and verifies token, refusing revoked ones
+            except ValueError as e:
+                raise HTTPException(status_code=401, detail=str(e)) # Invalid, expired or logged out tokens are unauthenticated, not server errors
 
             # Fetches user by email stored in token's 'sub' claim
             user = ucrud.get_user_by_email(db, payload["sub"])
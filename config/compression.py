@@ -0,0 +1,131 @@
+import os # Accesses the environment variables
+import zlib # Gzip streams
+from starlette.datastructures import Headers, MutableHeaders # Reads request and edits response headers
+from dotenv import load_dotenv # Loads secrets from .env.
+
+try:
+    import brotli # Brotli compression, optional
+except ImportError:
+    brotli = None
+
+load_dotenv() # Loads Environment Variables from .env File
+
+# Compression Configurations
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true" # Switches the middleware off
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500")) # Smaller complete responses are sent as is, the headers would eat the saving
+COMPRESS_HTMX = os.getenv("COMPRESS_HTMX", "false").lower() == "true" # HTMX fragments are a few KB sent on every click, compressing them cost more throughput than it saved on the wire
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6")) # zlib level 1-9
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4")) # Brotli quality 0-11, 4-5 compresses better than gzip 6 at similar CPU for dynamic pages
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml") # Content type prefixes worth compressing
+SKIPPED_TYPES = ("text/event-stream",) # Live streams must reach the browser event by event
+SUPPORTED_ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"] # Preference order when the client accepts several equally
+
+# Function to mark an endpoint whose responses must not be compressed, put it below the route decorator
+def no_compression(endpoint):
+    endpoint.__compress__ = False
+    return endpoint
+
+# Function to pick the best supported encoding from an Accept-Encoding header, None when only identity is acceptable
+def negotiate(accept_encoding: str, supported: list = SUPPORTED_ENCODINGS):
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, *params = [piece.strip() for piece in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token.lower()] = q
+    ranked = [(weights.get(encoding, weights.get("*", 0.0)), -index, encoding) for index, encoding in enumerate(supported)]
+    q, _, encoding = max(ranked)
+    return encoding if q > 0 else None
+
+# Incremental compressor for one response body in one encoding
+class Compressor:
+    def __init__(self, encoding: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        self.encoding = encoding
+        if encoding == "br":
+            self.engine = brotli.Compressor(quality=brotli_quality)
+        else:
+            self.engine = zlib.compressobj(gzip_level, zlib.DEFLATED, 31) # wbits 31 writes the gzip container
+
+    # Function to compress a chunk, intermediate chunks are flushed so streamed rows reach the client without waiting for the next one
+    def compress(self, data: bytes, final: bool = False):
+        if self.encoding == "br":
+            return self.engine.process(data) + (self.engine.finish() if final else self.engine.flush())
+        return self.engine.compress(data) + self.engine.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+# ASGI MIDDLEWARE
+# Compresses HTML, JSON and streamed exports with brotli or gzip as the client accepts, HTMX fragments only with COMPRESS_HTMX
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY, compress_htmx: bool = COMPRESS_HTMX):
+        self.app = app # Stores app being wrapped
+        self.minimum_size = minimum_size
+        self.compress_htmx = compress_htmx
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        request_headers = Headers(scope=scope)
+        if not self.compress_htmx and "hx-request" in request_headers:
+            return await self.app(scope, receive, send) # Fragment swaps are passed through untouched
+        encoding = negotiate(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        state = {"start": None, "compressor": None, "passthrough": False} # Start message is held until the first body chunk decides
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                return await send(message)
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if state["compressor"] is None:
+                start = state["start"]
+                headers = MutableHeaders(raw=start["headers"])
+                if not self.should_compress(scope, start["status"], headers) or (not more_body and len(body) < self.minimum_size):
+                    state["passthrough"] = True
+                    if self.compressible_type(headers):
+                        headers.add_vary_header("Accept-Encoding") # Caches must not hand a plain copy to a client that gets it compressed later
+                    await send(start)
+                    return await send(message)
+
+                state["compressor"] = Compressor(encoding, self.gzip_level, self.brotli_quality)
+                body = state["compressor"].compress(body, final=not more_body)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"] # Streamed length isn't known up front
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                return await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+            await send({"type": "http.response.body", "body": state["compressor"].compress(body, final=not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    # Function to check whether a response's content type is worth compressing
+    @staticmethod
+    def compressible_type(headers):
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(SKIPPED_TYPES)
+
+    # Function to decide whether a response gets compressed, opted out endpoints, encoded, partial and bodiless responses are left alone
+    def should_compress(self, scope, status: int, headers):
+        endpoint = scope.get("endpoint") # Set by the router once a route matched
+        if endpoint is not None and getattr(endpoint, "__compress__", True) is False:
+            return False
+        if status < 200 or status in (204, 206, 304) or "content-encoding" in headers or "content-range" in headers:
+            return False
+        return self.compressible_type(headers)
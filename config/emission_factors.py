@@ -0,0 +1,31 @@
+import os # Accesses the environment variables
+import json # Parses the factor override
+import logging # Reports an unusable override
+from dotenv import load_dotenv # Loads secrets from .env.
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Grams of CO2 per passenger kilometre for each mode of transport, keyed by the equivalent's field name
+DEFAULT_EMISSION_FACTORS = {
+    "wieauto": 170.65, # Car
+    "wieflugzeug": 181.59, # Plane
+    "wiebus": 27.33, # Bus
+}
+
+# Function to load the factor table, an EMISSION_FACTORS JSON object (e.g. {"wiebus": 29.1}) overrides or adds modes
+def load_emission_factors():
+    factors = dict(DEFAULT_EMISSION_FACTORS)
+    override = os.getenv("EMISSION_FACTORS")
+    if override:
+        try:
+            values = {mode: float(grams) for mode, grams in json.loads(override).items()}
+            if any(grams <= 0 for grams in values.values()):
+                raise ValueError("factors must be positive")
+            factors.update(values)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Ignoring invalid EMISSION_FACTORS ({e}), using the defaults")
+    return factors
+
+EMISSION_FACTORS = load_emission_factors() # Factor table shared by all equivalents calculations
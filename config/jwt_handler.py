@@ -1,7 +1,9 @@
 import os # Accesses the environment variables..
+import uuid # Generates unique token ids
 from jose import JWTError, jwt # Creates and verifies Json Web Tokens
 from dotenv import load_dotenv # Loads secrets from .env.
 from datetime import datetime, timedelta # Imports date time Library for token expiration and timestamp handling
+from config.token_revocation import revoked_tokens # Denylist of login tokens revoked at logout
 
 load_dotenv() # Loads Environment Variables from .env File
 
@@ -43,6 +45,7 @@ class JWTHandler:
             "first_name": first_name, # User's first name for payload reference
             "last_name": last_name, # User's last name for payload reference
             "action": "login", # Custom claim indicating token is for login action
+            "jti": uuid.uuid4().hex, # Unique token id, lets logout revoke this token
             "exp": exp # Expiration claim required by JWT to invalidate old tokens
         }
         # Encodes the payload into a JWT using the secret and specified algorithm
@@ -59,6 +62,10 @@ class JWTHandler:
             # Checks if the action in the payload is "login" to ensure correct token type
             if payload.get("action") != "login":
                 raise ValueError("Invalid token type")  # Raises error for incorrect token purpose
+
+            # Refuses tokens revoked at logout, answered from memory
+            if revoked_tokens.is_revoked(payload.get("jti")):
+                raise ValueError("Token has been revoked")
             return payload # Returns the decoded payload if valid
         
         except JWTError:
@@ -3,6 +3,7 @@ import smtplib # Simple Mail Transfer Protocol to  send emails via an SMTP serve
 from email.mime.text import MIMEText # Creates email content in either plain text or HTML format.
 from email.mime.multipart import MIMEMultipart # For Email that has multiple parts as both HTML & Attachments
 from config.jwt_handler import JWTHandler # Imports JWT Handler Class 
+from config.metrics import time_smtp # Observes SMTP send latency
 from dotenv import load_dotenv # Loads secrets from .env.
 
 load_dotenv() # Loads Environment Variables from .env File
@@ -14,6 +15,7 @@ EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
 
 base_url = os.getenv("base_url","http://127.0.0.1:5050")
+SMTP_BATCH_SIZE = int(os.getenv("SMTP_BATCH_SIZE", "50")) # Mails sent over one SMTP connection before reconnecting, stays under provider per-connection limits
 
 class EmailHandler:
     @staticmethod
@@ -51,7 +53,7 @@ class EmailHandler:
         msg.attach(MIMEText(html_content, "html"))
 
         try:
-            with smtplib.SMTP("smtp.gmail.com", 587) as server:  # Establishes connection to the SMTP server and send the email
+            with time_smtp("admin_registration"), smtplib.SMTP("smtp.gmail.com", 587) as server:  # Establishes connection to the SMTP server and send the email
                 server.starttls() # Secures connetion
                 server.login(SENDER_EMAIL, EMAIL_PASSWORD)
                 server.sendmail(SENDER_EMAIL, ADMIN_EMAIL, msg.as_string())
@@ -61,7 +63,7 @@ class EmailHandler:
             raise Exception("Error sending authentication email")
         
     @staticmethod
-    def send_to_user(name: str, email: str, password: str):  # Sends an email to the User with a generated password
+    def credentials_message(name: str, email: str, password: str):  # Builds the email giving an approved User their generated password
 
         # HTML Content 4 The Email
         html_content = f"""
@@ -88,13 +90,40 @@ class EmailHandler:
         msg["To"] = email
         msg["Subject"] = "Account Approved"
         msg.attach(MIMEText(html_content, "html"))
+        return msg
+
+    @staticmethod
+    def send_to_user(name: str, email: str, password: str):  # Sends an email to the User with a generated password
+        msg = EmailHandler.credentials_message(name, email, password)
 
         try:
-            with smtplib.SMTP("smtp.gmail.com", 587) as server:  # Establishes connection to the SMTP server and send the email
+            with time_smtp("user_credentials"), smtplib.SMTP("smtp.gmail.com", 587) as server:  # Establishes connection to the SMTP server and send the email
                 server.starttls() # Secures connetion
                 server.login(SENDER_EMAIL, EMAIL_PASSWORD)
                 server.sendmail(SENDER_EMAIL, email, msg.as_string())
             print("Credentials sent to user")
         except Exception as e:
             print(f"Failed to send email: {e}")
-            raise Exception("Error sending credentials email")
\ No newline at end of file
+            raise Exception("Error sending credentials email")
+
+    @staticmethod
+    def send_credentials_batch(recipients: list):  # Sends credentials to many Users as (name, email, password) over one connection per SMTP_BATCH_SIZE mails, returns {email: error or None}
+        results = {}
+        for start in range(0, len(recipients), SMTP_BATCH_SIZE):
+            batch = recipients[start:start + SMTP_BATCH_SIZE]
+            try:
+                with time_smtp("user_credentials_batch"), smtplib.SMTP("smtp.gmail.com", 587) as server:  # One connection, TLS handshake and login for the whole batch
+                    server.starttls() # Secures connetion
+                    server.login(SENDER_EMAIL, EMAIL_PASSWORD)
+                    for name, email, password in batch:
+                        try:
+                            server.sendmail(SENDER_EMAIL, email, EmailHandler.credentials_message(name, email, password).as_string())
+                            results[email] = None
+                        except smtplib.SMTPRecipientsRefused as e: # Only this recipient failed, the connection is still usable
+                            results[email] = f"Recipient refused: {e}"
+            except Exception as e:
+                print(f"Failed to send credentials batch: {e}")
+                for _, email, _ in batch:
+                    results.setdefault(email, f"Error sending credentials email: {e}") # Mails sent before the connection broke keep their success
+        print(f"Credentials sent to {sum(error is None for error in results.values())} of {len(recipients)} users")
+        return results
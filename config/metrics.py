@@ -0,0 +1,144 @@
+import os # Accesses the environment variables
+import time # Measures call durations
+import hmac # Compares the scrape token in constant time
+from contextlib import contextmanager # Builds the SMTP timing context manager
+from dotenv import load_dotenv # Loads secrets from .env.
+from sqlalchemy import event # Registers SQLAlchemy cursor events
+from sqlalchemy.engine import Engine # Engine class used to register cursor level events
+from pymongo import monitoring # Pymongo command monitoring API
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST, REGISTRY # Prometheus metric types and exposition
+from prometheus_client import multiprocess # Aggregates metrics written by several uvicorn workers
+import anyio.to_thread # Reads the threadpool limiter used for sync endpoints
+
+load_dotenv() # Loads Environment Variables from .env File
+
+# Metrics Configurations
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true" # Opt-in, /metrics is unauthenticated unless METRICS_TOKEN is set
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") # Bearer token Prometheus must send to scrape /metrics
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") # Shared directory used when running several workers, must be emptied before start
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # Seconds, from a cached fragment up to a slow SMTP handshake
+
+# LATENCY HISTOGRAMS
+REQUEST_LATENCY = Histogram("co2_http_request_duration_seconds", "Latency of HTTP requests by route", ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+DB_LATENCY = Histogram("co2_db_call_duration_seconds", "Latency of SQL statements and Mongo commands", ["backend", "operation"], buckets=LATENCY_BUCKETS)
+SMTP_LATENCY = Histogram("co2_smtp_send_duration_seconds", "Latency of SMTP sends", ["email", "outcome"], buckets=LATENCY_BUCKETS)
+
+# HOT PATH COUNTERS
+TALLY_CHANGES = Counter("co2_tally_changes_total", "Tally increments and decrements", ["action"])
+SESSIONS_SAVED = Counter("co2_sessions_saved_total", "Exchange sessions saved through /UI/main/reset")
+AUDIT_ROWS = Counter("co2_audit_rows_written_total", "Audit log rows written")
+BCRYPT_OPERATIONS = Counter("co2_bcrypt_operations_total", "bcrypt hash and verify operations", ["operation"])
+
+# SATURATION GAUGES, summed over live workers in multiprocess mode
+THREADPOOL_BUSY = Gauge("co2_threadpool_busy_threads", "Threads in use by sync endpoints", multiprocess_mode="livesum")
+THREADPOOL_SIZE = Gauge("co2_threadpool_size_threads", "Threadpool capacity for sync endpoints", multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("co2_db_pool_checked_out_connections", "SQL connections checked out of the pool", multiprocess_mode="livesum")
+DB_POOL_SIZE = Gauge("co2_db_pool_size_connections", "SQL pool size excluding overflow", multiprocess_mode="livesum")
+
+# Returns the latest metrics in the Prometheus text format, aggregating all workers when a multiprocess directory is configured
+def render_metrics():
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+# Function to check a scrape's Authorization header against METRICS_TOKEN, every scrape is allowed when no token is set
+def metrics_authorized(authorization: str, token: str = METRICS_TOKEN):
+    if not token:
+        return True
+    scheme, _, credentials = (authorization or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode())
+
+# Removes this worker's live gauge files on shutdown so dead workers don't count towards saturation
+def mark_worker_dead():
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+# Context manager timing an SMTP send and labelling it with its outcome
+@contextmanager
+def time_smtp(email: str):
+    start = time.perf_counter()
+    outcome = "error" # Stays error if the send raises
+    try:
+        yield
+        outcome = "success"
+    finally:
+        SMTP_LATENCY.labels(email, outcome).observe(time.perf_counter() - start)
+
+# SQLALCHEMY HOOKS
+# Stores the start time of each statement on the connection
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+# Observes each statement's latency labelled by the engine's dialect (postgresql, sqlite) and its verb (SELECT, INSERT, ...)
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_start")
+    if starts:
+        operation = statement.lstrip().split(" ", 1)[0].upper() or "UNKNOWN"
+        DB_LATENCY.labels(conn.engine.dialect.name, operation).observe(time.perf_counter() - starts.pop())
+
+# Hooks the cursor events of every engine
+def instrument_sqlalchemy():
+    if not event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+# MONGO HOOKS
+# Pymongo command listener observing each command's latency
+class MongoMetricsListener(monitoring.CommandListener):
+    def started(self, event):
+        pass # Duration is reported on completion
+
+    def succeeded(self, event):
+        DB_LATENCY.labels("mongo", event.command_name).observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        DB_LATENCY.labels("mongo", event.command_name).observe(event.duration_micros / 1_000_000)
+
+# Returns the listeners to pass to MongoClient(event_listeners=...), empty when metrics are disabled
+def mongo_listeners():
+    return [MongoMetricsListener()] if METRICS_ENABLED else []
+
+# ASGI MIDDLEWARE
+# Observes request latency per route and samples threadpool and DB pool saturation around every request
+class MetricsMiddleware:
+    def __init__(self, app, engine=None):
+        self.app = app # Stores app being wrapped
+        self.engine = engine # Engine whose pool is sampled, None when no SQL database is reachable
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = {"code": 500} # Stays 500 if the app raises before responding
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        self.sample_saturation()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route") # Set by the FastAPI router once a route matches, unmatched paths share one label
+            REQUEST_LATENCY.labels(scope["method"], route.path if route else "unmatched", str(status["code"])).observe(time.perf_counter() - start)
+            self.sample_saturation()
+
+    # Updates this worker's threadpool and DB pool gauges
+    def sample_saturation(self):
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+        THREADPOOL_SIZE.set(limiter.total_tokens)
+
+        pool = getattr(self.engine, "pool", None)
+        if pool is not None and hasattr(pool, "checkedout"):
+            DB_POOL_CHECKED_OUT.set(pool.checkedout())
+            if hasattr(pool, "size"):
+                DB_POOL_SIZE.set(pool.size())
+
+if METRICS_ENABLED:
+    instrument_sqlalchemy()
@@ -2,6 +2,13 @@ import random # Generates random passwords
 import bcrypt # Securely hashes passwords
 import string # For Letters, digits & symbols choice
 import re # Enables regular expression matching to validate password strength
+import os # Accesses the environment variables
+from concurrent.futures import ThreadPoolExecutor # Hashes many passwords at once, bcrypt releases the GIL while it works
+from config.metrics import BCRYPT_OPERATIONS # Counts bcrypt hash and verify operations
+
+# Password Hashing Configurations
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1)))) # Threads hashing passwords in bulk operations
+hash_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt") # Shared so bulk requests don't start threads of their own
 
 class PWDHandler:
     @staticmethod
@@ -11,11 +18,17 @@ class PWDHandler:
 
     @staticmethod
     def hash_password(password): # Hashes a plain password using bcrypt.
+        BCRYPT_OPERATIONS.labels("hash").inc()
         hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()) # Hashes password with bcrypt
         return hashed.decode('utf-8') # Returns hashed password as string
+
+    @staticmethod
+    def hash_passwords(passwords): # Hashes a list of passwords in parallel, returns the hashes in the same order
+        return list(hash_pool.map(PWDHandler.hash_password, passwords))
     
     @staticmethod
     def verify_password(plain_password, hashed_password): # Verifies a password attempt against a stored bcrypt hash and returns True if they match, False otherwise
+        BCRYPT_OPERATIONS.labels("verify").inc()
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8')) # Since both inputs must be bytes, we encode them and check if passwords match
     
     @staticmethod
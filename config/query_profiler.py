@@ -0,0 +1,164 @@
+import os # Accesses the environment variables
+import time # Measures query and request durations
+import threading # Guards the shared per-route statistics
+import logging # Logs slow queries as they happen
+from collections import deque # Bounded slow query log
+from contextvars import ContextVar # Carries the current request's counters into threadpool workers
+from datetime import datetime # Timestamps slow query entries
+from dotenv import load_dotenv # Loads secrets from .env.
+from sqlalchemy import event # Registers SQLAlchemy cursor events
+from sqlalchemy.engine import Engine # Engine class used to register cursor level events
+from pymongo import monitoring # Pymongo command monitoring API
+
+load_dotenv() # Loads Environment Variables from .env File
+
+# Profiler Configurations
+PROFILER_ENABLED = os.getenv("QUERY_PROFILER", "false").lower() == "true" # Instrumentation is opt-in
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100")) # Queries slower than this are written to the slow query log
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200")) # Number of slow queries kept in memory
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Function to label a request by method and route template, e.g. "POST /UI/main/hx-updatee", the raw path until a route matched
+def route_label(scope):
+    route = scope.get("route") # Set by the FastAPI router once a route matches
+    return f"{scope['method']} {route.path if route else scope['path']}"
+
+# Counters for the request currently being served
+class RequestStats:
+    __slots__ = ("scope", "label", "sql_count", "sql_ms", "mongo_count", "mongo_ms")
+
+    def __init__(self, scope=None):
+        self.scope = scope # The router adds the matched route to it before the handler runs
+        self.label = None # Route label, resolved on first use after the route matched
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.mongo_count = 0
+        self.mongo_ms = 0.0
+
+    # Function to return the request's route label, read from the scope when first needed so queries run by the handler carry it
+    @property
+    def route(self):
+        if self.label is None and self.scope is not None:
+            if "route" not in self.scope:
+                return route_label(self.scope) # Not matched yet, not cached so the template replaces it later
+            self.label = route_label(self.scope)
+        return self.label
+
+current_stats: ContextVar = ContextVar("current_stats", default=None) # The same RequestStats object is shared with threadpool workers, so increments made there are visible to the middleware
+
+# Collects per-route query counts/time and a log of slow queries
+class QueryProfiler:
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, log_size: int = SLOW_QUERY_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self.lock = threading.Lock()
+        self.routes = {} # Route label -> aggregated statistics
+        self.slow_queries = deque(maxlen=log_size) # Most recent slow queries, oldest dropped first
+
+    # Records one SQL statement or Mongo command against the current request and the slow query log
+    def record(self, kind: str, statement: str, duration_ms: float):
+        stats = current_stats.get()
+        if stats is not None:
+            if kind == "sql":
+                stats.sql_count += 1
+                stats.sql_ms += duration_ms
+            else:
+                stats.mongo_count += 1
+                stats.mongo_ms += duration_ms
+
+        if duration_ms >= self.slow_query_ms:
+            route = stats.route if stats else None
+            entry = {"at": datetime.utcnow().isoformat(), "route": route, "kind": kind, "duration_ms": round(duration_ms, 2), "statement": statement[:500]}
+            with self.lock:
+                self.slow_queries.append(entry)
+            logger.warning(f"Slow {kind} query ({duration_ms:.1f} ms) on {route}: {statement[:200]}")
+
+    # Adds a finished request's counters to its route's totals
+    def finish_request(self, route: str, stats: RequestStats, elapsed_ms: float):
+        with self.lock:
+            totals = self.routes.setdefault(route, {"requests": 0, "sql_queries": 0, "sql_ms": 0.0, "mongo_commands": 0, "mongo_ms": 0.0, "request_ms": 0.0, "max_sql_queries": 0})
+            totals["requests"] += 1
+            totals["sql_queries"] += stats.sql_count
+            totals["sql_ms"] += stats.sql_ms
+            totals["mongo_commands"] += stats.mongo_count
+            totals["mongo_ms"] += stats.mongo_ms
+            totals["request_ms"] += elapsed_ms
+            totals["max_sql_queries"] = max(totals["max_sql_queries"], stats.sql_count)
+
+    # Returns per-route totals and averages plus the slow query log
+    def summary(self):
+        with self.lock:
+            routes = {}
+            for route, totals in self.routes.items():
+                requests = totals["requests"] or 1
+                routes[route] = {
+                    **{key: round(value, 2) if isinstance(value, float) else value for key, value in totals.items()},
+                    "avg_sql_queries": round(totals["sql_queries"] / requests, 2),
+                    "avg_mongo_commands": round(totals["mongo_commands"] / requests, 2),
+                    "avg_db_ms": round((totals["sql_ms"] + totals["mongo_ms"]) / requests, 2),
+                    "avg_request_ms": round(totals["request_ms"] / requests, 2),
+                }
+            return {"slow_query_ms": self.slow_query_ms, "routes": routes, "slow_queries": list(self.slow_queries)}
+
+    # Clears all collected statistics
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+            self.slow_queries.clear()
+
+profiler = QueryProfiler() # Shared profiler instance
+
+# SQLALCHEMY HOOKS
+# Stores the start time of each statement on the connection
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+# Times the statement and records it against the current route
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if starts:
+        profiler.record("sql", statement, (time.perf_counter() - starts.pop()) * 1000)
+
+# Hooks the cursor events of every engine, including the cloud and local fallbacks
+def instrument_sqlalchemy():
+    if not event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+# MONGO HOOKS
+# Pymongo command listener that records each command's server round-trip time
+class MongoCommandProfiler(monitoring.CommandListener):
+    def started(self, event):
+        pass # Duration is reported on completion
+
+    def succeeded(self, event):
+        profiler.record("mongo", f"{event.command_name} {event.database_name}", event.duration_micros / 1000)
+
+    def failed(self, event):
+        profiler.record("mongo", f"{event.command_name} {event.database_name} (failed)", event.duration_micros / 1000)
+
+# Returns the listeners to pass to MongoClient(event_listeners=...), empty unless profiling is enabled
+def mongo_listeners():
+    return [MongoCommandProfiler()] if PROFILER_ENABLED else []
+
+# ASGI MIDDLEWARE
+# Attributes query counts and time to the FastAPI route that served each request
+class QueryProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app # Stores app being wrapped
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_stats.reset(token)
+            profiler.finish_request(stats.route, stats, (time.perf_counter() - start) * 1000)
+
+if PROFILER_ENABLED:
+    instrument_sqlalchemy()
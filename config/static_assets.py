@@ -0,0 +1,154 @@
+import os # Accesses the environment variables
+import json # Reads the asset manifest
+import logging # Logs manifest and build problems
+import threading # Builds assets without blocking startup
+from mimetypes import guess_type # Content type of precompressed files
+from markupsafe import Markup, escape # Safe HTML for the picture helper
+from starlette.datastructures import Headers # Reads the request headers
+from starlette.responses import FileResponse # Serves files from disk
+from starlette.staticfiles import NotModifiedResponse # Keeps only the headers allowed on a 304
+from fastapi.staticfiles import StaticFiles # Base static file handler
+from dotenv import load_dotenv # Loads secrets from .env.
+from utilities.asset_pipeline import AssetPipeline, STATIC_DIR, DIST_NAME, MANIFEST_NAME # Builds the fingerprinted assets
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Static Asset Configurations
+STATIC_URL = "/static" # Mount point of the static files
+ASSETS_BUILD_ON_STARTUP = os.getenv("ASSETS_BUILD_ON_STARTUP", "true").lower() == "true" # Builds missing assets in the background at startup
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable" # Fingerprinted files never change under their name
+MODERN_MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"} # <source> types of the converted formats, best first
+PREFERRED_ENCODINGS = ["br", "gzip"] # Precompressed encodings, best first
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"} # File suffix of each precompressed encoding
+
+# Resolves source asset names to their fingerprinted files, falls back to the plain /static path until a build exists
+class AssetManifest:
+    def __init__(self, path=STATIC_DIR / DIST_NAME / MANIFEST_NAME):
+        self.path = path
+        self.entries = {}
+        self.version = 0 # Bumped on every reload, lets pre-rendered pages notice their asset URLs changed
+        self.load()
+
+    # Function to (re)load the manifest, a missing or broken manifest leaves the plain paths in use
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as manifest_file:
+                self.entries = json.load(manifest_file) # Swapped in one assignment so renders never see a partial manifest
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read the asset manifest {self.path}: {e}")
+        self.version += 1
+        return self.entries
+
+    # Function to pick the variant of an image closest to (not below) a width in a format
+    def variant(self, entry: dict, width: int = None, fmt: str = None):
+        sizes = entry.get("variants", {}).get(fmt or entry.get("format"))
+        if not sizes:
+            return entry["file"]
+        widths = sorted(int(size) for size in sizes)
+        chosen = next((size for size in widths if width and size >= width), widths[-1])
+        return sizes[str(chosen)]
+
+    # Function to return the URL of an asset, optionally of a resized or converted image variant
+    def url(self, name: str, width: int = None, fmt: str = None):
+        entry = self.entries.get(name)
+        if entry is None:
+            return f"{STATIC_URL}/{name}"
+        if width is None and fmt is None:
+            return f"{STATIC_URL}/{DIST_NAME}/{entry['file']}"
+        return f"{STATIC_URL}/{DIST_NAME}/{self.variant(entry, width, fmt)}"
+
+    # Function to return a srcset listing every width of an image in a format
+    def srcset(self, name: str, fmt: str = None):
+        entry = self.entries.get(name)
+        if entry is None or not entry.get("variants"):
+            return ""
+        sizes = entry["variants"].get(fmt or entry["format"], {})
+        return ", ".join(f"{STATIC_URL}/{DIST_NAME}/{file} {size}w" for size, file in sorted(sizes.items(), key=lambda item: int(item[0])))
+
+    # Function to return a CSS image-set offering AVIF and WebP with the original format as fallback
+    def image_set(self, name: str, width: int = None):
+        entry = self.entries.get(name)
+        if entry is None or not entry.get("variants"):
+            return Markup(f'url("{escape(self.url(name))}")')
+        options = [f'url("{self.url(name, width, fmt)}") type("{mime}")' for fmt, mime in MODERN_MIME_TYPES.items() if fmt in entry["variants"]]
+        options.append(f'url("{self.url(name, width)}") type("{guess_type(entry["file"])[0]}")')
+        return Markup(f"image-set({', '.join(options)})") # Names come from the manifest, marked safe so autoescaping keeps the quotes
+
+    # Function to render a <picture> with AVIF and WebP sources and the original as <img>, attributes are passed through (cls becomes class)
+    def picture(self, name: str, sizes: str = None, **attributes):
+        entry = self.entries.get(name, {})
+        sizes_attribute = f' sizes="{escape(sizes)}"' if sizes else ""
+        sources = "".join(
+            f'<source type="{mime}" srcset="{escape(self.srcset(name, fmt))}"{sizes_attribute}>'
+            for fmt, mime in MODERN_MIME_TYPES.items() if fmt in entry.get("variants", {})
+        )
+        attributes = {"class" if key == "cls" else key: value for key, value in attributes.items()}
+        rendered = "".join(f' {key}="{escape(value)}"' for key, value in attributes.items())
+        return Markup(f'<picture>{sources}<img src="{escape(self.url(name))}"{rendered}></picture>')
+
+    # Function to build missing assets and reload the manifest
+    def rebuild(self, prune: bool = False):
+        try:
+            AssetPipeline().build(prune=prune)
+        except Exception as e:
+            logger.error(f"Static asset build failed, serving the plain files: {e}")
+        return self.load()
+
+    # Function to run the build on a background thread so startup doesn't wait for image encoding
+    def rebuild_in_background(self):
+        thread = threading.Thread(target=self.rebuild, name="asset-builder", daemon=True)
+        thread.start()
+        return thread
+
+# Serves static files, fingerprinted files under dist/ get immutable caching and their precompressed copy when the client accepts it
+class ImmutableStaticFiles(StaticFiles):
+    # Function to return the encodings a request accepts, ignoring those sent with q=0
+    @staticmethod
+    def accepted_encodings(headers: Headers):
+        accepted = set()
+        for part in headers.get("accept-encoding", "").split(","):
+            token, _, params = part.strip().partition(";")
+            if token and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(token.lower())
+        return accepted
+
+    # Function to build the response for a file, overrides StaticFiles.file_response
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        relative = os.path.relpath(full_path, self.directory)
+        if relative.split(os.sep)[0] != DIST_NAME:
+            return super().file_response(full_path, stat_result, scope, status_code) # Plain paths keep the default revalidation
+
+        request_headers = Headers(scope=scope)
+        headers = {"Cache-Control": IMMUTABLE_CACHE}
+        media_type = guess_type(str(full_path))[0] or "text/plain"
+        path = full_path
+        if media_type.startswith("text/") or media_type in ("application/javascript", "application/json", "image/svg+xml"):
+            headers["Vary"] = "Accept-Encoding"
+            accepted = self.accepted_encodings(request_headers)
+            for encoding in PREFERRED_ENCODINGS:
+                compressed = f"{full_path}{ENCODING_SUFFIXES[encoding]}"
+                if encoding in accepted and os.path.isfile(compressed):
+                    path, stat_result = compressed, os.stat(compressed)
+                    headers["Content-Encoding"] = encoding
+                    break
+
+        response = FileResponse(path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+assets = AssetManifest() # Shared manifest behind the template helpers
+
+# Function to expose the asset helpers to a Jinja2Templates instance
+def register_asset_helpers(templates):
+    templates.env.globals.update(
+        asset_url=assets.url,
+        asset_srcset=assets.srcset,
+        asset_image_set=assets.image_set,
+        asset_picture=assets.picture,
+    )
+    return templates
@@ -0,0 +1,83 @@
+import os # Accesses the environment variables
+import hashlib # Derives ETags from the rendered bytes
+import logging # Reports pages whose template is missing
+import threading # Guards re-renders from concurrent threadpool requests
+from dotenv import load_dotenv # Loads secrets from .env.
+from jinja2 import TemplateNotFound # Raised for pages registered without a template
+from starlette.requests import Request # Reads the conditional request headers
+from starlette.responses import Response # Serves the pre-rendered bytes
+from config.static_assets import assets # Asset URLs baked into the pages
+from config.templates import templates # Shared template environment
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Static Page Configurations
+STATIC_PAGE_MAX_AGE = int(os.getenv("STATIC_PAGE_MAX_AGE", "3600")) # Seconds browsers may reuse a page before revalidating its ETag
+MISSING_PAGE_HTML = b"<h1>Page not found</h1>" # Served for registered pages whose template doesn't exist
+
+# Pages whose output never varies, rendered once into bytes and served with an ETag instead of through the template engine on every hit
+class StaticPageRegistry:
+    def __init__(self, templates=templates, manifest=assets, max_age: int = STATIC_PAGE_MAX_AGE):
+        self.templates = templates
+        self.manifest = manifest
+        self.cache_control = f"public, max-age={max_age}"
+        self.pages = [] # Registered template names, a constant page is fully defined by its template
+        self.rendered = {} # Template name -> (manifest version, body, ETag), None body for missing templates
+        self.lock = threading.Lock()
+
+    # Function to register a constant page and add its GET route to a router
+    def page(self, router, path: str, template_name: str):
+        if template_name not in self.pages:
+            self.pages.append(template_name)
+
+        def serve(request: Request):
+            return self.response(template_name, request)
+
+        router.add_api_route(path, serve, methods=["GET"], include_in_schema=False, name=template_name.rsplit(".", 1)[0])
+        return serve
+
+    # Function to render one page into bytes with a weak ETag, weak because the compression middleware may re-encode the body
+    def render(self, template_name: str):
+        version = self.manifest.version
+        try:
+            body = self.templates.get_template(template_name).render().encode("utf-8")
+            etag = f'W/"{hashlib.sha256(body).hexdigest()[:16]}"'
+        except TemplateNotFound:
+            logger.warning(f"Static page template {template_name} does not exist, serving 404")
+            body = etag = None
+        self.rendered[template_name] = (version, body, etag)
+        return self.rendered[template_name]
+
+    # Function to render every registered page, called at startup
+    def render_all(self):
+        with self.lock:
+            for template_name in self.pages:
+                self.render(template_name)
+        return {template_name: body is not None for template_name, (_, body, _) in self.rendered.items()}
+
+    # Function to return the bytes and ETag of a page, re-rendered only after the asset manifest changed
+    def lookup(self, template_name: str):
+        cached = self.rendered.get(template_name)
+        if cached is None or cached[0] != self.manifest.version:
+            with self.lock:
+                cached = self.rendered.get(template_name)
+                if cached is None or cached[0] != self.manifest.version:
+                    cached = self.render(template_name)
+        return cached
+
+    # Function to answer a request for a page, a matching If-None-Match gets an empty 304
+    def response(self, template_name: str, request: Request):
+        _, body, etag = self.lookup(template_name)
+        if body is None:
+            return Response(MISSING_PAGE_HTML, status_code=404, media_type="text/html")
+
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag[2:] in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) or if_none_match.strip() == "*": # Weak comparison, proxies may drop the W/
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="text/html", headers=headers)
+
+# Shared registry, routers opt their constant pages in with static_pages.page(router, path, template)
+static_pages = StaticPageRegistry()
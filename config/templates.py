@@ -0,0 +1,66 @@
+import os # Accesses the environment variables
+import time # Measures template compile times
+import logging # Reports the precompile timings and broken templates
+from pathlib import Path # Provides object-oriented file system paths
+from dotenv import load_dotenv # Loads secrets from .env.
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateError # Template environment and its on-disk bytecode cache
+from fastapi.templating import Jinja2Templates # Renders TemplateResponses from the shared environment
+from config.static_assets import register_asset_helpers # Adds the asset_url template helpers
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Template Configurations
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates" # Every page, email and partial template
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", "data/jinja_cache") # Compiled template bytecode shared by workers and restarts
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", str(os.getenv("ENV", "dev") != "prod")).lower() == "true" # Checks template files for edits on every render, off in prod
+TEMPLATE_PRECOMPILE = os.getenv("TEMPLATE_PRECOMPILE", "true").lower() == "true" # Compiles every template at startup instead of on its first request
+TEMPLATE_CACHE_SIZE = 400 # Compiled templates kept in memory, well above the number of templates
+
+# Function to create the bytecode cache, templates are compiled in memory only when the directory can't be used
+def create_bytecode_cache(directory: str = TEMPLATE_CACHE_DIR):
+    try:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        return FileSystemBytecodeCache(directory)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled, {directory} is not writable: {e}")
+        return None
+
+# Function to create the Jinja environment every router renders with
+def create_environment(directory: Path = TEMPLATES_DIR, auto_reload: bool = TEMPLATE_AUTO_RELOAD, cache_dir: str = TEMPLATE_CACHE_DIR):
+    return Environment(
+        loader=FileSystemLoader(directory),
+        autoescape=True, # Same escaping Jinja2Templates applies to its own environments
+        auto_reload=auto_reload,
+        cache_size=TEMPLATE_CACHE_SIZE,
+        bytecode_cache=create_bytecode_cache(cache_dir) if cache_dir else None,
+    )
+
+# Function to compile every template ahead of the first request and report how long it took, broken templates are logged instead of stopping startup
+def precompile(templates):
+    start = time.perf_counter()
+    timings, failed = {}, {}
+    for name in templates.env.list_templates(extensions=["html"]):
+        template_start = time.perf_counter()
+        try:
+            templates.env.get_template(name)
+            timings[name] = (time.perf_counter() - template_start) * 1000
+        except TemplateError as e:
+            failed[name] = str(e)
+            logger.error(f"Template {name} does not compile: {e}")
+
+    slowest = sorted(timings.items(), key=lambda timing: timing[1], reverse=True)[:3]
+    report = {
+        "templates": len(timings),
+        "failed": failed,
+        "compile_ms": round((time.perf_counter() - start) * 1000, 2),
+        "slowest": {name: round(ms, 2) for name, ms in slowest},
+        "bytecode_cache": templates.env.bytecode_cache is not None,
+        "auto_reload": templates.env.auto_reload,
+    }
+    logger.info(f"Precompiled templates: {report}")
+    return report
+
+# Shared templates for every router, one compiled copy of each template per worker
+templates = register_asset_helpers(Jinja2Templates(env=create_environment()))
@@ -0,0 +1,81 @@
+import os # Accesses the environment variables
+import time # Schedules syncs with the database
+import logging # Reports failed syncs
+import threading # Guards the in-memory denylist from concurrent threadpool requests
+from datetime import datetime # Compares and stores token expiry times
+from dotenv import load_dotenv # Loads secrets from .env.
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError # Duplicate revocations and unreachable databases
+from database.database import SessionLocal # Opens sessions for syncs outside of requests
+from models.models import RevokedToken # Persisted denylist shared by every worker
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Token Revocation Configurations
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5")) # Longest a token revoked on another worker is still accepted here
+REVOCATION_PURGE_SECONDS = float(os.getenv("REVOCATION_PURGE_SECONDS", "3600")) # How often expired rows are deleted from the table
+SYNC_ID_OVERLAP = 100 # Rows below the highest loaded id read again, catches concurrent logouts whose commits landed out of id order
+
+# Denylist of revoked login tokens: a set in memory answers every request, the RevokedTokens table shares revocations between workers
+class TokenRevocationList:
+    def __init__(self, session_factory=SessionLocal, sync_seconds: float = REVOCATION_SYNC_SECONDS, purge_seconds: float = REVOCATION_PURGE_SECONDS):
+        self.session_factory = session_factory
+        self.sync_seconds = sync_seconds
+        self.purge_seconds = purge_seconds
+        self.revoked = {} # jti -> expiry, dict lookups keep the per-request check O(1)
+        self.last_id = 0 # Highest table row already loaded
+        self.last_sync = None
+        self.last_purge = time.monotonic()
+        self.lock = threading.Lock() # Lets one request sync while the others keep using the current set
+
+    # Function to tell whether a token id was revoked, syncing with the table at most once per interval
+    def is_revoked(self, jti: str):
+        if jti is None:
+            return False # Tokens issued before jti claims can't be revoked and expire on their own
+        if self.last_sync is None or time.monotonic() - self.last_sync >= self.sync_seconds:
+            self.sync()
+        return jti in self.revoked
+
+    # Function to revoke a token until it expires, in this worker at once and in the others on their next sync
+    def revoke(self, db, jti: str, expires_at: datetime):
+        if jti is None:
+            return False
+        self.revoked[jti] = expires_at
+        try:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            db.commit()
+        except IntegrityError:
+            db.rollback() # Already revoked, e.g. logging out twice
+        return True
+
+    # Function to revoke the token of a decoded login payload
+    def revoke_payload(self, db, payload: dict):
+        return self.revoke(db, payload.get("jti"), datetime.utcfromtimestamp(payload["exp"]))
+
+    # Function to load revocations added since the last sync and drop expired ones, skipped when another request is already syncing
+    def sync(self):
+        if self.session_factory is None or not self.lock.acquire(blocking=False):
+            return
+        try:
+            now = datetime.utcnow()
+            with self.session_factory() as db:
+                rows = db.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.id > self.last_id - SYNC_ID_OVERLAP).all()
+                for row_id, jti, expires_at in rows:
+                    self.revoked[jti] = expires_at
+                    self.last_id = max(self.last_id, row_id)
+                if time.monotonic() - self.last_purge >= self.purge_seconds:
+                    db.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(synchronize_session=False) # Expired tokens fail verification anyway
+                    db.commit()
+                    self.last_purge = time.monotonic()
+            for jti, expires_at in list(self.revoked.items()): # Copied first, logouts may add entries meanwhile
+                if expires_at < now:
+                    self.revoked.pop(jti, None)
+        except SQLAlchemyError as e:
+            logger.error(f"Token revocation sync failed, using the revocations known so far: {e}")
+        finally:
+            self.last_sync = time.monotonic() # A failing database is retried on the next interval, not on every request
+            self.lock.release()
+
+# Shared denylist consulted by every login token verification
+revoked_tokens = TokenRevocationList()
@@ -0,0 +1,134 @@
+import os # Accesses the environment variables and replaces finished files atomically
+import uuid # Names each archived event
+from datetime import datetime, date # Event dates and query bounds
+from pathlib import Path # Builds partition paths
+from dotenv import load_dotenv # Loads secrets from .env.
+import pyarrow as pa # Columnar tables
+import pyarrow.compute as pc # Filters on archived columns
+import pyarrow.dataset as ds # Reads the partitioned archive
+import pyarrow.parquet as pq # Writes Parquet files
+from config.emission_factors import EMISSION_FACTORS # Equivalent fields stored with each session
+
+load_dotenv() # Loads Environment Variables from .env File
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive") # Root of the Parquet archive, one dataset per table partitioned by event_date
+
+# Column layouts of the two archived tables
+SESSION_SCHEMA = pa.schema([
+    ("event_id", pa.string()),
+    ("timestamp", pa.timestamp("ms")),
+    ("ingesamt", pa.float64()),
+    *[(mode, pa.float64()) for mode in EMISSION_FACTORS],
+])
+ITEM_SCHEMA = pa.schema([
+    ("event_id", pa.string()),
+    ("timestamp", pa.timestamp("ms")),
+    ("category", pa.string()),
+    ("item", pa.string()),
+    ("count", pa.int32()),
+    ("co2", pa.float64()),
+])
+SCHEMAS = {"sessions": SESSION_SCHEMA, "items": ITEM_SCHEMA}
+PARTITIONING = ds.partitioning(pa.schema([("event_date", pa.date32())]), flavor="hive") # Directories named event_date=YYYY-MM-DD
+
+# ARCHIVE OPERATIONS
+class SessionArchive:
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = Path(root)
+
+    # Writes one event's session documents as new Parquet files under the event's date partition and returns a summary
+    def archive_event(self, session_docs, event_date: date = None):
+        event_id = uuid.uuid4().hex
+        sessions = {name: [] for name in SESSION_SCHEMA.names}
+        items = {name: [] for name in ITEM_SCHEMA.names}
+
+        for doc in session_docs:
+            session = doc["session"][0]
+            sessions["event_id"].append(event_id)
+            sessions["timestamp"].append(session.get("timestamp"))
+            for field in SESSION_SCHEMA.names[2:]:
+                sessions[field].append(session.get(field, 0))
+
+            for category, exchanged in session.get("exc_items", {}).items():
+                for item in exchanged:
+                    items["event_id"].append(event_id)
+                    items["timestamp"].append(session.get("timestamp"))
+                    items["category"].append(category)
+                    items["item"].append(item["name"])
+                    items["count"].append(item["count"])
+                    items["co2"].append(item["co2"])
+
+        if not sessions["event_id"]:
+            return {"event_id": None, "sessions": 0, "items": 0}
+
+        started = min((stamp for stamp in sessions["timestamp"] if stamp), default=None) # An event belongs to the day it started
+        event_date = event_date or (started.date() if started else date.today()) # Sessions without timestamps are filed under the archiving day
+        self.write("sessions", pa.Table.from_pydict(sessions, schema=SESSION_SCHEMA), event_date, event_id)
+        self.write("items", pa.Table.from_pydict(items, schema=ITEM_SCHEMA), event_date, event_id)
+        return {"event_id": event_id, "event_date": event_date.isoformat(), "sessions": len(sessions["event_id"]), "items": len(items["event_id"])}
+
+    # Writes a table to a new file in its partition, via a temporary file so readers never see half a file
+    def write(self, table_name: str, table, event_date: date, event_id: str):
+        partition = self.root / table_name / f"event_date={event_date.isoformat()}"
+        partition.mkdir(parents=True, exist_ok=True)
+        target = partition / f"{event_id}.parquet"
+        temporary = partition / f".{event_id}.parquet.tmp"
+        pq.write_table(table, temporary)
+        os.replace(temporary, target)
+
+    # Reads an archived table restricted to an inclusive date range, only the matching partitions are opened
+    def read(self, table_name: str, start: date = None, end: date = None):
+        path = self.root / table_name
+        if not path.exists():
+            return None
+        schema = SCHEMAS[table_name].append(pa.field("event_date", pa.date32())) # Files written before a mode was added read it as null
+        dataset = ds.dataset(path, schema=schema, format="parquet", partitioning=PARTITIONING)
+        condition = None
+        if start:
+            condition = ds.field("event_date") >= pa.scalar(start, pa.date32())
+        if end:
+            upper = ds.field("event_date") <= pa.scalar(end, pa.date32())
+            condition = upper if condition is None else condition & upper
+        return dataset.to_table(filter=condition)
+
+    # Returns one row per archived event with its date, session count, CO2 and equivalent totals
+    def event_trends(self, start: date = None, end: date = None):
+        table = self.read("sessions", start, end)
+        if table is None or table.num_rows == 0:
+            return []
+        totals = table.group_by(["event_date", "event_id"]).aggregate(
+            [("event_id", "count"), ("timestamp", "min"), ("timestamp", "max")] + [(field, "sum") for field in SESSION_SCHEMA.names[2:]]
+        )
+        rows = [
+            {
+                "event_date": row["event_date"].isoformat(),
+                "event_id": row["event_id"],
+                "sessions": row["event_id_count"],
+                "started": row["timestamp_min"],
+                "ended": row["timestamp_max"],
+                **{field: round(row[f"{field}_sum"] or 0, 2) for field in SESSION_SCHEMA.names[2:]},
+            }
+            for row in totals.to_pylist()
+        ]
+        return sorted(rows, key=lambda row: (row["event_date"], row["started"] or datetime.min))
+
+    # Returns per event and item exchange counts and CO2, optionally for a single item
+    def item_trends(self, start: date = None, end: date = None, item: str = None):
+        table = self.read("items", start, end)
+        if table is None or table.num_rows == 0:
+            return []
+        if item:
+            table = table.filter(pc.equal(table["item"], item))
+        totals = table.group_by(["event_date", "event_id", "category", "item"]).aggregate([("count", "sum"), ("co2", "sum")])
+        rows = [
+            {
+                "event_date": row["event_date"].isoformat(),
+                "event_id": row["event_id"],
+                "category": row["category"],
+                "item": row["item"],
+                "count": row["count_sum"],
+                "co2": round(row["co2_sum"], 2),
+            }
+            for row in totals.to_pylist()
+        ]
+        return sorted(rows, key=lambda row: (row["event_date"], row["event_id"], -row["count"]))
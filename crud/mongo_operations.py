@@ -1,14 +1,31 @@
 from pymongo.collection import Collection # Imports the type hint for MongoDB collection
+from pymongo import UpdateOne, ReplaceOne # Batched writes used by the layout migration
+from dotenv import load_dotenv # Loads secrets from .env.
+import os # Accesses the environment variables
 from collections import defaultdict # Imports defaultdict to group data by category
 from datetime import datetime # Imports date time Library for recording timestamps
+from config.emission_factors import EMISSION_FACTORS # Equivalent fields stored with sessions and event totals
+
+load_dotenv() # Loads Environment Variables from .env File
+
+MONGO_LAYOUT = os.getenv("MONGO_LAYOUT", "embedded").lower() # "embedded": one co2 document per category with an items array, "flat": one co2_items document per item
+EXPORT_BATCH_SIZE = 500 # Documents fetched per cursor round-trip while exporting
+SESSION_EXPORT_COLUMNS = ["timestamp", "ingesamt", *EMISSION_FACTORS, "category", "item", "count", "co2"] # One row per exchanged item, session fields repeated
+EVENT_EXPORT_COLUMNS = ["timestamp", "sessions", "ingesamt", *EMISSION_FACTORS, "item", "count", "co2"] # One row per item in an event's leaderboard, event fields repeated
 
 # MONGO OPERATIONS
 class MongoCRUD:
     # Initializes the MongoCRUD instance witj references to the MongoDB collection
-    def __init__(self, co2: Collection, sos: Collection, logs: Collection):
-        self.co2 = co2 # For item  data
+    def __init__(self, co2: Collection, sos: Collection, logs: Collection, items: Collection = None, layout: str = MONGO_LAYOUT):
+        if layout not in ("embedded", "flat"):
+            raise ValueError(f"Unknown MONGO_LAYOUT '{layout}', use 'embedded' or 'flat'")
+        if layout == "flat" and items is None:
+            raise ValueError("The flat layout needs the co2_items collection")
+        self.co2 = co2 # For item  data grouped by category
         self.sos = sos # For session logs
         self.logs = logs # For user activity logs
+        self.items = items # For item data with one document per item
+        self.layout = layout
 
     def group_data_by_category(self, items):
         grouped = defaultdict(list) # Creates a dictionary where each key is a category and the value is a list of items
@@ -37,14 +54,33 @@ class MongoCRUD:
                 ]
 
 
-    # Inserts grouped category-item data inzo the MongoDB 'co2' collection
+    # Returns True when no item data has been stored yet in the active layout
+    def is_empty(self):
+        return (self.items if self.layout == "flat" else self.co2).count_documents({}, limit=1) == 0
+
+    # Inserts grouped category-item data inzo the MongoDB 'co2' collection, or one document per item in the flat layout
     def send_to_mongo(self, grouped_items):
         if grouped_items:
-            self.co2.insert_many(grouped_items)
+            if self.layout == "flat":
+                self.items.insert_many(self.flatten(grouped_items))
+            else:
+                self.co2.insert_many(grouped_items)
         return grouped_items
 
+    # Converts grouped category documents into one document per item
+    @staticmethod
+    def flatten(grouped_items):
+        return [
+            {"name": item["name"], "category": category["category"], "base_co2": item.get("base_co2"), "count": item.get("count", 0), "co2": item.get("co2", 0)}
+            for category in grouped_items
+            for item in category["items"]
+        ]
+
     # Updates a specific item's count & CO" value in Mongo DB by using $inc operator to increment values efficiently
     def update_item(self, category, item_name, count, co2):  
+        if self.layout == "flat":
+            self.items.update_one({"name": item_name}, {"$inc": {"count": count, "co2": co2}}) # Updates only this item's document
+            return
         self.co2.update_one(
             {"category": category, "items.name": item_name}, # Filters to find the correct category & item
             {"$inc": { # $inc is used to increment the values
@@ -53,12 +89,30 @@ class MongoCRUD:
             }}
         )
     
-    # Retrieves all documents from the 'co2' collection to prepare them for display
+    # Retrieves all documents from the 'co2' collection to prepare them for display, regrouped by category in the flat layout
     def get_updated_items(self):
+        if self.layout == "flat":
+            grouped = defaultdict(list)
+            for item in self.items.find({}, {"_id": 0}):
+                grouped[item["category"]].append(item)
+            return [{"category": category, "items": items} for category, items in grouped.items()]
         return list(self.co2.find())
+
+    # Returns every item's name, count and CO2 as flat rows, ready for sorting
+    def get_item_totals(self):
+        if self.layout == "flat":
+            return list(self.items.find({}, {"_id": 0, "name": 1, "count": 1, "co2": 1}))
+        return [
+            {"name": item["name"], "count": item["count"], "co2": item.get("co2", 0)}
+            for doc in self.co2.find({}, {"_id": 0, "items.name": 1, "items.count": 1, "items.co2": 1})
+            for item in doc["items"]
+        ]
     
     # Resets count & co2 fields to 0 in eachh category document to prepare for a new session
     def reset_counts(self, items):
+        if self.layout == "flat":
+            self.items.update_many({}, {"$set": {"count": 0, "co2": 0}})
+            return
         for category in items:
              # For each category, performs an update on the MongoDB collection
             self.co2.update_one(
@@ -89,9 +143,9 @@ class MongoCRUD:
     def get_all_sessions(self):
         return list(self.sos.find())
     
-    # Deletes all session documents in the 'sos' collection
-    def clear_sessions(self):
-        self.sos.delete_many({})
+    # Deletes all session documents in the 'sos' collection, or only the given ids so sessions saved meanwhile are kept
+    def clear_sessions(self, ids: list = None):
+        self.sos.delete_many({} if ids is None else {"_id": {"$in": ids}})
 
     # Inserts the events logs as a list inside a document into the 'Event_Logs' collection after capturing the timestamp, user identity, number of sessions, sorted item usage and CO2 totals.  
     def log_out(self,  sessions, sorted_items, total):
@@ -101,4 +155,60 @@ class MongoCRUD:
                 "sorted_items": sorted_items, # Adds sorted items
                 "total": total # Adds total as well
             }
-            self.logs.insert_one({"Logs": [logs]})            
\ No newline at end of file
+            self.logs.insert_one({"Logs": [logs]})            
+
+    # Streams stored sessions as flat rows, one per exchanged item, holding only one cursor batch in memory
+    def iter_session_rows(self, batch_size: int = EXPORT_BATCH_SIZE):
+        cursor = self.sos.find({}, {"_id": 0, "session": 1}, batch_size=batch_size).sort("_id", 1) # Insertion order through the default index
+        for doc in cursor:
+            for session in doc.get("session", []):
+                timestamp = session.get("timestamp")
+                base = {"timestamp": timestamp.isoformat() if timestamp else None, "ingesamt": session.get("ingesamt"), **{mode: session.get(mode) for mode in EMISSION_FACTORS}}
+                exchanged = [(category, item) for category, items in (session.get("exc_items") or {}).items() for item in items]
+                if not exchanged:
+                    yield {**base, "category": None, "item": None, "count": None, "co2": None}
+                for category, item in exchanged:
+                    yield {**base, "category": category, "item": item.get("name"), "count": item.get("count"), "co2": item.get("co2")}
+
+    # Streams event logs as flat rows, one per item of each event's leaderboard, holding only one cursor batch in memory
+    def iter_event_rows(self, batch_size: int = EXPORT_BATCH_SIZE):
+        cursor = self.logs.find({}, {"_id": 0, "Logs": 1}, batch_size=batch_size).sort("_id", 1)
+        for doc in cursor:
+            for log in doc.get("Logs", []):
+                timestamp = log.get("timestamp")
+                total = log.get("total") or {}
+                base = {"timestamp": timestamp.isoformat() if timestamp else None, "sessions": log.get("sessions"), "ingesamt": total.get("ingesamt"), **{mode: total.get(mode) for mode in EMISSION_FACTORS}}
+                items = log.get("sorted_items") or []
+                if not items:
+                    yield {**base, "item": None, "count": None, "co2": None}
+                for item in items:
+                    yield {**base, "item": item.get("name"), "count": item.get("count"), "co2": item.get("co2")}
+
+    # LAYOUT MIGRATION
+    # Copies the category documents into one document per item, upserting by name so reruns are safe
+    def migrate_to_flat(self, drop_source: bool = False, batch_size: int = EXPORT_BATCH_SIZE):
+        operations = []
+        for doc in self.co2.find({}, {"_id": 0}, batch_size=batch_size):
+            for item in self.flatten([doc]):
+                operations.append(ReplaceOne({"name": item["name"]}, item, upsert=True))
+                if len(operations) >= batch_size:
+                    self.items.bulk_write(operations, ordered=False) # Writes a full batch per round-trip
+                    operations = []
+        if operations:
+            self.items.bulk_write(operations, ordered=False)
+        migrated = self.items.count_documents({})
+        if drop_source:
+            self.co2.delete_many({})
+        return {"layout": "flat", "items": migrated}
+
+    # Copies the per-item documents back into one document per category, replacing each category's items array
+    def migrate_to_embedded(self, drop_source: bool = False, batch_size: int = EXPORT_BATCH_SIZE):
+        grouped = defaultdict(list)
+        for item in self.items.find({}, {"_id": 0}, batch_size=batch_size):
+            grouped[item["category"]].append({"name": item["name"], "base_co2": item.get("base_co2"), "count": item.get("count", 0), "co2": item.get("co2", 0)})
+        operations = [UpdateOne({"category": category}, {"$set": {"items": items}}, upsert=True) for category, items in grouped.items()]
+        if operations:
+            self.co2.bulk_write(operations, ordered=False)
+        if drop_source:
+            self.items.delete_many({})
+        return {"layout": "embedded", "categories": len(operations), "items": sum(len(items) for items in grouped.values())}
@@ -1,10 +1,13 @@
 from sqlalchemy.orm import Session, joinedload # Imports SQLAlchemy Session for DB operations, and loading strategies for relationships
+from sqlalchemy import delete, select, func # Builds set-based DELETE ... WHERE statements and catalogue lookups
+from sqlalchemy.dialects import postgresql, sqlite # Dialect specific INSERT constructs supporting ON CONFLICT
 from fastapi import Request
 from models.models import Admin, User, UserProfile, Item, Category # Imports all SQLAlchemy ORM models
 from schemas.schemas import Create_AdminUser, CreateUser, CreateUserProfile, CreateCategory, CreateItem # Imports Pydantic schemas for request validation and response formatting
 from config.pwd_handler import PWDHandler # Imports password hashing and verification handler
 from config.mail_handler import EmailHandler # Imports email handler to send registration or verification emails
 from utilities.utils import AuditLogger  # Imports audit helper class
+from database.database import unit_of_work # Commits each request-level operation once
 from datetime import datetime # Used for handling and formatting datetime values
 
 # ADMIN OPERATIONS
@@ -12,11 +15,11 @@ class AdminUserCRUD:
     # Function to register new admin user and add them to the pending users database with parameters: the active database session and user following the user Structure to validate the data
     def register_admin_user(self, db: Session, user: Create_AdminUser, request: Request = None):
         new_user = Admin(**user.model_dump()) # Creates new instance of User ORM Model. **user.model_dump() converts the Pydantic model into a dictionary of field names and values as ** operator unpacks them as arguments to the User constructor
-        db.add(new_user) # Adds new user object to the currrent database session
-        db.commit() # Commits the session to save the new user permanently to the database
-        db.refresh(new_user) # Refreshes the new_user object to get any updates made by the database like adding the auto generated id
+        with unit_of_work(db):
+            db.add(new_user) # Adds new user object to the currrent database session
+            db.flush() # Sends the INSERT so the generated id comes back through RETURNING
+            AuditLogger.log_action(db=db, action="register_admin_user", resource_type="Admin", resource_id=new_user.id, admin_id=new_user.id, status="success", details={"email": new_user.email, "first_name": new_user.first_name}, request=request, commit=False) # Logs the action in the same transaction
         EmailHandler.send_to_admin(new_user.first_name, new_user.last_name, new_user.email) # Sends email to admin for verification
-        AuditLogger.log_action(db=db, action="register_admin_user", resource_type="Admin", resource_id=new_user.id, admin_id=new_user.id, status="success", details={"email": new_user.email, "first_name": new_user.first_name}, request=request) # Logs the action
         return new_user # Returns newly created user instance with id
     
     # Function to get all Admin Users from the database with active database session as parameter
@@ -33,20 +36,25 @@ class AdminUserCRUD:
         
         # Proceeds with deletion if the admin_user exists in the database,
         if user:
-            db.delete(user) # Marks the user for deletion in the current session
-            db.commit() # Commits the transaction to remove the user from the database permanently
-            AuditLogger.log_action(db=db, action="delete_admin_user", resource_type="Admin", resource_id=user.id, admin_id=user.id, status="success", details={"email": user.email}, request=request) # Logs the action
+            with unit_of_work(db):
+                db.delete(user) # Marks the user for deletion in the current session, audit logs are removed by the database cascade
+                AuditLogger.log_action(db=db, action="delete_admin_user", resource_type="Admin", resource_id=user.id, admin_id=None, status="success", details={"email": user.email}, request=request, commit=False) # Logs the action without linking to the deleted admin row
         return user  # Return the deleted user instance or None if the user was not found
     
-    # Function to delete all admin users from the database
-    def delete_admin_users(self, db: Session):
-        users = self.get_all_admin_users(db) # Retrieves all admin users 
-        # Proceeds with deletion 
-        if users:
-            for user in users:
-                db.delete(user) # Deletes each adminuser individually
-            db.commit() # Commits the transaction to remove the admin users from the database permanently
-        return users  # Returns list of deleted admin users or empty list
+    # Function to delete admin users in one set-based statement, optionally only unverified ones or ones created before a cutoff
+    def delete_admin_users(self, db: Session, unverified_only: bool = False, created_before: datetime = None, request: Request = None):
+        stmt = delete(Admin).returning(Admin.id, Admin.email) # Single DELETE ... WHERE returning only the projected columns
+        if unverified_only:
+            stmt = stmt.where(Admin.is_verified.is_(False)) # Restricts to pending registrations
+        if created_before:
+            stmt = stmt.where(Admin.created_at < created_before) # Restricts to stale accounts
+
+        with unit_of_work(db):
+            rows = db.execute(stmt, execution_options={"synchronize_session": False}).all() # Audit rows are removed by the database's ON DELETE CASCADE
+            summary = {"deleted": len(rows), "users": [{"id": row.id, "email": row.email} for row in rows]} # Projected summary instead of full ORM objects
+            if rows:
+                AuditLogger.log_action(db=db, action="delete_admin_users", resource_type="Admin", status="success", details={"deleted": summary["deleted"], "unverified_only": unverified_only, "created_before": created_before.isoformat() if created_before else None}, request=request, commit=False) # Logs the bulk deletion
+        return summary  # Returns count and id/email of the deleted admin users
 
     # Function to verify pending Admin user
     def verify_admin_user(self, db: Session, email: str, request: Request = None):
@@ -68,12 +76,9 @@ class AdminUserCRUD:
         user.is_verified = True # Marks admin user as verified
         user.force_password_change = True # Forces password change on first login
         
-        EmailHandler.send_to_user(user.first_name, user.email, pwd)
-        
-        db.commit() # Commits the transaction
-        db.refresh(user) # Refreshes to get the new ID from database
-
-        AuditLogger.log_action(db=db, action="verify_admin_user", resource_type="Admin", resource_id=user.id, admin_id=user.id, status="success", details={"email": user.email}, request=request) # Logs the action
+        with unit_of_work(db):
+            EmailHandler.send_to_user(user.first_name, user.email, pwd) # Sends credentials before committing so a failed email leaves the admin pending
+            AuditLogger.log_action(db=db, action="verify_admin_user", resource_type="Admin", resource_id=user.id, admin_id=user.id, status="success", details={"email": user.email}, request=request, commit=False) # Logs the action in the same transaction
         return user # Returns admin user plus unhashed password which can be emailed to user
     
     # Function to reject admin user
@@ -88,12 +93,58 @@ class AdminUserCRUD:
         if user.is_verified:
             return "already_verified"
         
-        db.delete(user) # Deletes entirely from database
-        db.commit() # Commits the transaction
-
-        AuditLogger.log_action(db=db, action="reject_admin_user", resource_type="Admin", resource_id=None, admin_id=None, staus="success", details={"email": email}, request=request) # Logs the action
+        with unit_of_work(db):
+            db.delete(user) # Deletes entirely from database
+            AuditLogger.log_action(db=db, action="reject_admin_user", resource_type="Admin", resource_id=None, admin_id=None, status="success", details={"email": email}, request=request, commit=False) # Logs the action in the same transaction
         return "rejected" # Returns status
        
+    # Function to approve and reject many pending admin users in one transaction, returns one result per email
+    def review_admin_users(self, db: Session, approve: list, reject: list, request: Request = None):
+        decisions = {} # Email -> "approve" or "reject", in request order
+        results = {} # Email -> (status, detail)
+        for decision, emails in (("approve", approve), ("reject", reject)):
+            for email in emails:
+                if decisions.get(email, decision) != decision:
+                    results[email] = ("conflict", "Listed for approval and rejection") # Left untouched
+                decisions.setdefault(email, decision)
+
+        users = {user.email: user for user in db.query(Admin).filter(Admin.email.in_(list(decisions)))} # One query for the whole list
+        approvals, rejections = [], []
+        for email, decision in decisions.items():
+            user = users.get(email)
+            if email in results:
+                continue
+            if not user:
+                results[email] = ("not_found", None)
+            elif user.is_verified:
+                results[email] = ("already_verified", None)
+            else:
+                (approvals if decision == "approve" else rejections).append(user)
+
+        # Hashes the generated passwords in parallel and sends every credentials email before committing, so a failed email leaves that admin pending
+        passwords = [PWDHandler.generate_password() for _ in approvals]
+        hashes = PWDHandler.hash_passwords(passwords)
+        email_errors = EmailHandler.send_credentials_batch([(user.first_name, user.email, pwd) for user, pwd in zip(approvals, passwords)]) if approvals else {}
+
+        with unit_of_work(db): # One commit for every approval, rejection and audit row
+            for user, hashedpwd in zip(approvals, hashes):
+                if email_errors.get(user.email):
+                    results[user.email] = ("email_failed", email_errors[user.email])
+                    continue
+                user.password = hashedpwd
+                user.is_verified = True # Marks admin user as verified
+                user.force_password_change = True # Forces password change on first login
+                AuditLogger.log_action(db=db, action="verify_admin_user", resource_type="Admin", resource_id=user.id, admin_id=user.id, status="success", details={"email": user.email, "bulk": True}, request=request, commit=False)
+                results[user.email] = ("approved", None)
+            for user in rejections:
+                db.delete(user) # Deletes entirely from database
+                AuditLogger.log_action(db=db, action="reject_admin_user", resource_type="Admin", resource_id=None, admin_id=None, status="success", details={"email": user.email, "bulk": True}, request=request, commit=False)
+                results[user.email] = ("rejected", None)
+
+        report = [{"email": email, "status": results[email][0], "detail": results[email][1]} for email in decisions]
+        counts = {status: sum(row["status"] == status for row in report) for status in ("approved", "rejected")}
+        return {**counts, "failed": len(report) - counts["approved"] - counts["rejected"], "results": report}
+
     # Function to update a verified admin users password by confirming their email
     def change_password(self, db: Session, email: str, new_password: str, request: Request = None):
         user = self.get_admin_user_by_email(db, email) # Fetches the admin user from database using the provided email
@@ -105,11 +156,10 @@ class AdminUserCRUD:
             return "Password must be at least 8 characters long, include upper and lower case letters, a number, and a special character."   # Raises an exception if new password doesnt meant the criteria
             
         hashed_pwd = PWDHandler.hash_password(new_password) # Hashes the new password
-        user.password = hashed_pwd # Updates the Password field 
-        user.force_password_change = False # Clears the force change flag
-        db.commit() # Commits the session to save all the changes permanetly in the database
-        db.refresh(user) # Refreshes the ORM instance to ensure it reflects the latest state from the database
-        AuditLogger.log_action(db=db, action="change_password", resource_type="Admin", resource_id=user.id, admin_id=user.id, user_id=None, status="success", details={"email": email}, request=request) # Logs password change
+        with unit_of_work(db): # Commits the password change and its audit row together
+            user.password = hashed_pwd # Updates the Password field 
+            user.force_password_change = False # Clears the force change flag
+            AuditLogger.log_action(db=db, action="change_password", resource_type="Admin", resource_id=user.id, admin_id=user.id, user_id=None, status="success", details={"email": email}, request=request, commit=False) # Logs password change
         return "success" # Returns the updated Admin User or None if none was found
     
     # Function to confirm new password
@@ -144,17 +194,17 @@ class UserCRUD:
 
         new_user = User(**user_data)  # Creates new instance of User ORM Model. **user.model_dump() converts the Pydantic model into a dictionary of fields ** operator unpacks them as arguments to the User constructor
         EmailHandler.send_confirmation_email(new_user.first_name, new_user.last_name, new_user.work_email) # Initiates email verification workflow
-        db.add(new_user) # Adds new user object to the currrent database session
-        db.commit() # Commits the session to save the new user permanently to the database
-        db.refresh(new_user) # Refreshes the new_user object to get any updates made by the database like adding the auto generated id
-
-        # Auto-creates profile for client users to ensure data consistency
-        if user_type == "client":
-            profile_crud = UserProfileCRUD()    
-            default_profile = CreateUserProfile(user_id=new_user.id, company_name="", industry="", preferences={}) # Creates basic profile with default values
-            profile_crud.create_profile(db, default_profile, new_user.id)
-        
-        AuditLogger.log_action(db=db, action="create_user", resource_type="User", resource_id=new_user.id, user_id=new_user.id, status="success", details={"email": new_user.work_email, "first_name": new_user.first_name}, request=request) # Logs user registration
+        with unit_of_work(db):
+            db.add(new_user) # Adds new user object to the currrent database session
+            db.flush() # Sends the INSERT so the generated id comes back through RETURNING
+
+            # Auto-creates profile for client users to ensure data consistency
+            if user_type == "client":
+                profile_crud = UserProfileCRUD()    
+                default_profile = CreateUserProfile(user_id=new_user.id, company_name="", industry="", preferences={}) # Creates basic profile with default values
+                profile_crud.create_profile(db, default_profile, new_user.id, commit=False) # Joins this unit of work instead of committing separately
+            
+            AuditLogger.log_action(db=db, action="create_user", resource_type="User", resource_id=new_user.id, user_id=new_user.id, status="success", details={"email": new_user.work_email, "first_name": new_user.first_name}, request=request, commit=False) # Logs user registration
         return new_user # Returns newly created user instance with id
     
     # Function to get all users from the database with active database session as parameter
@@ -192,11 +242,27 @@ class UserCRUD:
         user = self.get_user_by_email(db, work_email, user_type) # Retrieves the user by email to ensure they exists before attempting deletion
         # Proceeds with deletion if the user exists in the database,
         if user:
-            db.delete(user) # Marks the user for deletion in the current session
-            db.commit() # Commit the transaction to remove the user from the database permanently
-
-            AuditLogger.log_action(db=db, action="delete_user", resource_type="User", resource_id=user.id, user_id=None, status="success", details={"email": work_email}, request=request) # Logs deletion
+            with unit_of_work(db):
+                db.delete(user) # Marks the user for deletion in the current session
+                AuditLogger.log_action(db=db, action="delete_user", resource_type="User", resource_id=user.id, user_id=None, status="success", details={"email": work_email}, request=request, commit=False) # Logs deletion in the same transaction
         return user  # Return the deleted user instance or None if the user was not found
+
+    # Function to delete users in one set-based statement, optionally filtered by type, verification status or creation date
+    def delete_users(self, db: Session, user_type: str = None, unverified_only: bool = False, created_before: datetime = None, request: Request = None):
+        stmt = delete(User).returning(User.id, User.email) # Single DELETE ... WHERE returning only the projected columns
+        if user_type:
+            stmt = stmt.where(User.user_type == user_type) # Restricts to admin or client users
+        if unverified_only:
+            stmt = stmt.where(User.is_verified.is_(False)) # Restricts to users who never verified their email
+        if created_before:
+            stmt = stmt.where(User.created_at < created_before) # Restricts to stale accounts
+
+        with unit_of_work(db):
+            rows = db.execute(stmt, execution_options={"synchronize_session": False}).all() # Profiles and audit rows are removed by the database's ON DELETE CASCADE
+            summary = {"deleted": len(rows), "users": [{"id": row.id, "email": row.email} for row in rows]} # Projected summary instead of full ORM objects
+            if rows:
+                AuditLogger.log_action(db=db, action="delete_users", resource_type="User", status="success", details={"deleted": summary["deleted"], "user_type": user_type, "unverified_only": unverified_only, "created_before": created_before.isoformat() if created_before else None}, request=request, commit=False) # Logs the bulk deletion
+        return summary # Returns count and id/email of the deleted users
     
     # Function to verify pending user
     def verify_user(self, db: Session, email: str, user_type: str = None, request: Request = None):
@@ -210,13 +276,10 @@ class UserCRUD:
         if user.is_verified:
             return "already_verified"
         
-        user.is_verified = True # Changes verification boolean from false to True
-        user.verified_at = datetime.utcnow() # Indicates time user was verified
-
-        db.commit()  # Commits the transaction
-        db.refresh(user)  # Refreshes to get the new ID from database
-
-        AuditLogger.log_action(db=db, action="verify_user", resource_type="User", resource_id=user.id, user_id=user.id, status="success", details={"email": email}, request=request) # Logs verification
+        with unit_of_work(db): # Commits the verification and its audit row together
+            user.is_verified = True # Changes verification boolean from false to True
+            user.verified_at = datetime.utcnow() # Indicates time user was verified
+            AuditLogger.log_action(db=db, action="verify_user", resource_type="User", resource_id=user.id, user_id=user.id, status="success", details={"email": email}, request=request, commit=False) # Logs verification
         return user # Returns veified user
     
       
@@ -231,11 +294,10 @@ class UserCRUD:
             return "Password must be at least 8 characters long, include upper and lower case letters, a number, and a special character."   # Raises an exception if new password doesnt meant the criteria
             
         hashed_pwd = PWDHandler.hash_password(new_password) # Hashes the new password
-        user.password = hashed_pwd # Updates the Password field 
-        user.force_password_change = False # Clears the force change flag
-        db.commit() # Commits the session to save all the changes permanetly in the database
-        db.refresh(user) # Refreshes the ORM instance to ensure it reflects the latest state from the database
-        AuditLogger.log_action(db=db, action="change_password", resource_type="Admin", resource_id=user.id, admin_id=user.id, user_id=None, status="success", details={"email": email}, request=request) # Logs password change
+        with unit_of_work(db): # Commits the password change and its audit row together
+            user.password = hashed_pwd # Updates the Password field 
+            user.force_password_change = False # Clears the force change flag
+            AuditLogger.log_action(db=db, action="change_password", resource_type="Admin", resource_id=user.id, admin_id=user.id, user_id=None, status="success", details={"email": email}, request=request, commit=False) # Logs password change
         return "success" # Returns the updated Admin User or None if none was found
     
 
@@ -255,7 +317,7 @@ class UserCRUD:
 
 # USER PROFILE OPERATIONS
 class UserProfileCRUD:
-    def create_profile(self, db: Session, profile_data: CreateUserProfile, user_id: int, request: Request = None):
+    def create_profile(self, db: Session, profile_data: CreateUserProfile, user_id: int, request: Request = None, commit: bool = True):
         # Checks if profile already exists for this user
         existing_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
         if existing_profile:
@@ -264,10 +326,11 @@ class UserProfileCRUD:
         # Creates new profile with default preferences
         new_profile = UserProfile(user_id=user_id, name=profile_data.name, location=profile_data.location)
         db.add(new_profile) # Adds new user profile object to the currrent database session
-        db.commit() # Commits the session to save the new user profile permanently to the database
-        db.refresh(new_profile) # Refreshes the new_profile object to get any updates made by the database like adding the auto generated id
+        db.flush() # Sends the INSERT so the generated id comes back through RETURNING
 
-        AuditLogger.log_action(db=db, action="create_profile", resource_type="UserProfile", resource_id=new_profile.id, user_id=user_id, status="success", details={"name": profile_data.name, "location": profile_data.location}, request=request) # Logs profile creation
+        AuditLogger.log_action(db=db, action="create_profile", resource_type="UserProfile", resource_id=new_profile.id, user_id=user_id, status="success", details={"name": profile_data.name, "location": profile_data.location}, request=request, commit=False) # Logs profile creation
+        if commit:
+            db.commit() # Commits profile and audit row together unless the caller owns the unit of work
         return new_profile # Returns newly created user profile instance with id
     
     # Function to return a single user profile by user_id with active database session and user id as parameters
@@ -281,15 +344,12 @@ class UserProfileCRUD:
         if not profile:
             return None
 
-        # Updates profile fields
-        profile.name = profile_data.name
-        profile.location = profile_data.location
-        profile.updated_at = datetime.utcnow()
-
-        db.commit() # Commits the session to save the updated user profile permanently to the database
-        db.refresh(profile) # Refreshes the updated profile object to get any updates made by the database like adding the auto generated id
-        
-        AuditLogger.log_action(db=db, action="update_profile", resource_type="UserProfile", resource_id=profile.id, user_id=user_id, status="success", details={"name": profile_data.name, "location": profile_data.location}, request=request) # Logs profile update
+        # Updates profile fields and commits them with the audit row
+        with unit_of_work(db):
+            profile.name = profile_data.name
+            profile.location = profile_data.location
+            profile.updated_at = datetime.utcnow()
+            AuditLogger.log_action(db=db, action="update_profile", resource_type="UserProfile", resource_id=profile.id, user_id=user_id, status="success", details={"name": profile_data.name, "location": profile_data.location}, request=request, commit=False) # Logs profile update
         return profile # Returns upated user profile instance with id
 
 # ITEM OPERATIONS
@@ -310,8 +370,7 @@ class ItemCRUD:
         )
 
         db.add(new_item) # Adds new item object to the currrent database session
-        db.commit() # Commits the session to save the new item permanently to the database
-        db.refresh(new_item) # Refreshes the new_item object to get any updates made by the database like adding the auto generated id
+        db.commit() # Commits the session to save the new item permanently to the database, the generated id comes back through RETURNING
         return new_item # Returns newly created item instance with id
     
     # Function to get all items from the database with active database session as parameter
@@ -339,8 +398,7 @@ class ItemCRUD:
                 raise ValueError(f"Category '{data.category_name}' does not exist")
             item.category_id = category.id
             item.base_co2 = data.base_co2 # Updates the Base_CO2 field with the new CO2 value in case its changed
-            db.commit() # Commits the session to save all the changes permanetly in the database
-            db.refresh(item) # Refreshes the ORM instance to ensure it reflects the latest state from the database
+            db.commit() # Commits the session to save all the changes permanetly in the database, the instance stays loaded so no refresh is needed
         return item # Returns the updated item or None if no item was found to updated
 
     # Function to delete an item from the database identified by 'Name'
@@ -358,8 +416,7 @@ class CategoryCRUD:
     def create_category(self, db: Session, category: CreateCategory):
         new_category = Category(**category.model_dump())  # Creates new instance of Category ORM Model
         db.add(new_category)  # Adds new category object to the current database session
-        db.commit()  # Commits the session to save the new category permanently to the database
-        db.refresh(new_category)  # Refreshes the object to get any updates from the database such as auto generated id
+        db.commit()  # Commits the session to save the new category permanently to the database, the generated id comes back through RETURNING
         return new_category  # Returns newly created category instance with id
     
     # Function to get all categories from the database with active database session as parameter
@@ -376,8 +433,7 @@ class CategoryCRUD:
         if category:
             category.name = data.name  # Updates the Name field
             category.description = data.description  # Updates the Description field if provided
-            db.commit()  # Commits changes permanently
-            db.refresh(category)  # Refreshes the ORM instance with latest state
+            db.commit()  # Commits changes permanently, the instance stays loaded so no refresh is needed
         return category  # Returns updated category or None if no category was found
 
     # Function to delete a category from the database identified by 'Name'
@@ -386,4 +442,62 @@ class CategoryCRUD:
         if category:
             db.delete(category)  # Marks the category for deletion
             db.commit()  # Permanently deletes the category
-        return category  # Returns deleted category instance or None if not found
\ No newline at end of file
+        return category  # Returns deleted category instance or None if not found
+
+# CATALOGUE OPERATIONS
+class CatalogueCRUD:
+    BATCH_SIZE = 500 # Number of rows sent per INSERT ... ON CONFLICT statement
+
+    # Function to pick the dialect specific insert construct that supports ON CONFLICT upserts
+    @staticmethod
+    def upsert_insert(db: Session):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert
+        if dialect == "sqlite":
+            return sqlite.insert
+        raise ValueError(f"Bulk catalogue import is not supported on '{dialect}'") # Other dialects lack ON CONFLICT
+
+    # Function to upsert categories and items in batches with parameters: the active database session plus validated CreateCategory and CreateItem lists
+    def import_catalogue(self, db: Session, categories: list[CreateCategory], items: list[CreateItem], request: Request = None):
+        insert = self.upsert_insert(db)
+
+        # Collects every category named either directly or by an item, keeping the first description given
+        category_rows = {}
+        for category in categories:
+            category_rows.setdefault(category.name, {"name": category.name, "description": category.description})
+        for item in items:
+            category_rows.setdefault(item.category_name, {"name": item.category_name, "description": None})
+
+        # Upserts categories, keeping an existing description when the import doesn't provide one
+        rows = list(category_rows.values())
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            stmt = insert(Category).values(rows[start:start + self.BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(index_elements=[Category.name], set_={"description": func.coalesce(stmt.excluded.description, Category.description)})
+            db.execute(stmt)
+
+        # Resolves all category names to ids with one query
+        category_ids = dict(db.execute(select(Category.name, Category.id).where(Category.name.in_(list(category_rows)))).all())
+
+        # Upserts items, updating base CO2 and category of existing names while leaving their counts untouched
+        item_rows = list({item.name: {"name": item.name, "base_co2": item.base_co2, "category_id": category_ids[item.category_name], "count": 0} for item in items}.values())
+        for start in range(0, len(item_rows), self.BATCH_SIZE):
+            stmt = insert(Item).values(item_rows[start:start + self.BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(index_elements=[Item.name], set_={"base_co2": stmt.excluded.base_co2, "category_id": stmt.excluded.category_id})
+            db.execute(stmt)
+
+        summary = {"categories": len(rows), "items": len(item_rows)}
+        AuditLogger.log_action(db=db, action="import_catalogue", resource_type="Catalogue", status="success", details=summary, request=request) # Logs the import and commits it with the upserts as one transaction
+        return summary # Returns the number of upserted categories and items
+
+    # Function to stream the catalogue as (category, description, item, base_co2) rows ordered like the admin page, including categories without items
+    def iter_catalogue(self, db: Session):
+        stmt = (
+            select(Category.name, Category.description, Item.name, Item.base_co2)
+            .outerjoin(Item, Item.category_id == Category.id)
+            .order_by(Category.name.asc(), Item.name.asc())
+            .execution_options(yield_per=self.BATCH_SIZE) # Fetches rows in batches instead of loading the table
+        )
+        for row in db.execute(stmt):
+            yield tuple(row)
+
@@ -0,0 +1,197 @@
+import os # Accesses the environment variables, fsyncs and replaces files atomically
+import json # Encodes log records and the snapshot
+import time # Schedules snapshots and measures restores
+import logging # Reports restores and unusable journals
+import threading # Background fsync and snapshot thread
+from datetime import datetime # Timestamps snapshots
+from pathlib import Path # Provides object-oriented file system paths
+from dotenv import load_dotenv # Loads secrets from .env.
+
+try:
+    import fcntl # Locks the journal against a second process, not available on Windows
+except ImportError:
+    fcntl = None
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Tally Journal Configurations
+TALLY_JOURNAL_ENABLED = os.getenv("TALLY_JOURNAL_ENABLED", "true").lower() == "true" # Keeps station tallies across restarts
+TALLY_JOURNAL_DIR = os.getenv("TALLY_JOURNAL_DIR", "data/tally") # Holds the snapshot, the log and the lock file
+TALLY_FSYNC = os.getenv("TALLY_FSYNC", "interval").lower() # always: fsync every change, interval: every TALLY_FSYNC_SECONDS, never: leave it to the OS
+TALLY_FSYNC_SECONDS = float(os.getenv("TALLY_FSYNC_SECONDS", "1")) # Background thread tick, bounds the changes an OS crash can lose with fsync=interval
+TALLY_SNAPSHOT_SECONDS = float(os.getenv("TALLY_SNAPSHOT_SECONDS", "30")) # Compacts the log into a fresh snapshot this often while tallies change
+FSYNC_POLICIES = ("always", "interval", "never")
+SNAPSHOT_VERSION = 1
+
+# Keeps station tallies across restarts: every change is appended to a log of absolute counts, which is compacted into an atomically replaced snapshot
+class TallyJournal:
+    def __init__(self, directory: str = TALLY_JOURNAL_DIR, fsync: str = TALLY_FSYNC, fsync_seconds: float = TALLY_FSYNC_SECONDS, snapshot_seconds: float = TALLY_SNAPSHOT_SECONDS):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"TALLY_FSYNC must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.directory = Path(directory)
+        self.snapshot_path = self.directory / "snapshot.json"
+        self.log_path = self.directory / "journal.log"
+        self.lock_path = self.directory / "journal.lock"
+        self.fsync = fsync
+        self.fsync_seconds = fsync_seconds
+        self.snapshot_seconds = snapshot_seconds
+        self.store = None # TallyStore whose stations are journaled
+        self.log = None # Unbuffered append handle, None while closed so changes are only kept in memory
+        self.lock_file = None
+        self.lock = threading.Lock() # Orders appends, fsyncs and compaction
+        self.dirty = False # Changes since the last snapshot
+        self.unsynced = False # Appends since the last fsync
+        self.last_snapshot = time.monotonic()
+        self.stop = threading.Event()
+        self.thread = None
+
+    # Function to journal the stations of a store, new stations pick the journal up from the store
+    def attach(self, store):
+        self.store = store
+        store.journal = self
+        return self
+
+    # JOURNAL RECORDS
+    # Function to append one record, a single unbuffered write so a crashed process never leaves it half in a user space buffer
+    def append(self, record: list):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self.lock:
+            if self.log is None:
+                return
+            self.log.write(line)
+            self.dirty = True
+            if self.fsync == "always":
+                os.fsync(self.log.fileno())
+            else:
+                self.unsynced = True
+
+    # Function to journal the new absolute counts of some items, replaying a record twice gives the same tally
+    def record_counts(self, station_id: str, counts: dict):
+        self.append(["set", station_id, counts])
+
+    # Function to journal a station saving or clearing its tally
+    def record_reset(self, station_id: str):
+        self.append(["reset", station_id])
+
+    # Function to journal a station dropped for being idle
+    def record_drop(self, station_id: str):
+        self.append(["drop", station_id])
+
+    # RESTORE & COMPACTION
+    # Function to read the snapshot and replay the log on top of it, a torn last line from a crash is skipped
+    def read_state(self):
+        stations, replayed = {}, 0
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as snapshot_file:
+                stations = json.load(snapshot_file).get("stations", {})
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.error(f"Ignoring unreadable tally snapshot {self.snapshot_path}: {e}") # os.replace never leaves a partial file, so this is outside damage
+
+        try:
+            with open(self.log_path, "rb") as log_file:
+                for line in log_file:
+                    try:
+                        kind, station_id, *payload = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipping a torn tally journal record")
+                        continue
+                    if kind == "set":
+                        counts = stations.setdefault(station_id, {})
+                        counts.update(payload[0])
+                    elif kind in ("reset", "drop"):
+                        stations.pop(station_id, None)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        return {station_id: {name: count for name, count in counts.items() if count} for station_id, counts in stations.items()}, replayed
+
+    # Function to write the current tallies to a new snapshot and start an empty log, holding the journal lock so no change falls in between
+    def compact(self):
+        with self.lock:
+            stations = {station_id: counts for station_id, counts in self.store.snapshot().items() if counts}
+            payload = json.dumps({"version": SNAPSHOT_VERSION, "written_at": datetime.utcnow().isoformat(), "stations": stations}, separators=(",", ":")).encode("utf-8")
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as tmp:
+                tmp.write(payload)
+                tmp.flush()
+                if self.fsync != "never":
+                    os.fsync(tmp.fileno())
+            os.replace(tmp_path, self.snapshot_path) # Readers see the old or the new snapshot, never a partial one
+
+            if self.log is not None:
+                self.log.close()
+            self.log = open(self.log_path, "wb", buffering=0) # The snapshot now holds everything the old log did
+            self.dirty = False
+            self.unsynced = False
+            self.last_snapshot = time.monotonic()
+        return len(stations)
+
+    # LIFECYCLE
+    # Function to restore the tallies and start journaling, called once at startup before requests are served
+    def open(self):
+        if self.log is not None:
+            return None # Already journaling
+        start = time.perf_counter()
+        self.stop.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self.acquire_process_lock():
+            logger.error(f"Another process is journaling tallies in {self.directory}, this one keeps its tallies in memory only")
+            return None
+
+        stations, replayed = self.read_state()
+        self.store.load(stations)
+        self.compact()
+        self.thread = threading.Thread(target=self.run, name="tally-journal", daemon=True)
+        self.thread.start()
+        summary = {"stations": len(stations), "records_replayed": replayed, "restore_ms": round((time.perf_counter() - start) * 1000, 2)}
+        logger.info(f"Restored station tallies: {summary}")
+        return summary
+
+    # Function to take the process lock, only one process may append to the log
+    def acquire_process_lock(self):
+        self.lock_file = open(self.lock_path, "a+")
+        if fcntl is None:
+            return True # No advisory locks here, a single worker is documented
+        try:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self.lock_file.close()
+            self.lock_file = None
+            return False
+
+    # Function run by the background thread, fsyncs on the interval policy and compacts once per snapshot interval while tallies change
+    def run(self):
+        while not self.stop.wait(self.fsync_seconds):
+            try:
+                self.tick()
+            except OSError as e:
+                logger.error(f"Tally journal maintenance failed: {e}")
+
+    # Function for one background step
+    def tick(self):
+        with self.lock:
+            if self.unsynced and self.fsync == "interval" and self.log is not None:
+                os.fsync(self.log.fileno())
+                self.unsynced = False
+        if self.dirty and time.monotonic() - self.last_snapshot >= self.snapshot_seconds:
+            self.compact()
+
+    # Function to write a final snapshot and release the journal, called at shutdown
+    def close(self):
+        if self.log is None:
+            return
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        self.compact()
+        with self.lock:
+            self.log.close()
+            self.log = None
+        if self.lock_file is not None:
+            self.lock_file.close() # Closing releases the flock
+            self.lock_file = None
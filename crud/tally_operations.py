@@ -0,0 +1,215 @@
+import os # Accesses the environment variables
+import time # Tracks when a station was last active
+import threading # Guards the station registry from concurrent threadpool requests
+import secrets # Generates unguessable station ids
+from array import array # Compact catalogue and per-station count storage
+from operator import mul # Pairs counts with CO2 values for the dot product
+from dotenv import load_dotenv # Loads secrets from .env.
+from config.metrics import TALLY_CHANGES # Counts tally increments and decrements
+
+load_dotenv() # Loads Environment Variables from .env File
+
+# Tally Configurations
+STATION_COOKIE = "station_id" # Cookie identifying the volunteer station a browser counts for
+STATION_ID_MAX_LENGTH = 64 # Longer cookie values are replaced rather than stored
+STATION_IDLE_SECONDS = int(os.getenv("STATION_IDLE_SECONDS", "14400")) # Stations untouched this long are dropped, defaults to 4 hours
+EVICTION_INTERVAL = 60 # Seconds between sweeps for idle stations
+TOTAL_PRECISION = 6 # Decimal places kept from the running total, drops float drift left by increment/decrement pairs
+MAX_COUNT = 2**31 - 1 # Largest count a packed 32-bit slot holds
+MAX_BATCH_OPERATIONS = int(os.getenv("MAX_BATCH_OPERATIONS", "500")) # Longest list of changes one batch request may carry
+
+# Shared, read-only index of catalogue items in display order
+class Catalogue:
+    __slots__ = ("names", "base_co2", "index", "categories")
+
+    def __init__(self, grouped_items: list):
+        self.names = [] # Item names by position
+        self.base_co2 = array("d") # CO2 saved per item by position, packed doubles
+        self.index = {} # Item name -> position
+        self.categories = [] # (category name, positions of its items) in display order
+
+        for category in grouped_items:
+            positions = []
+            for item in category["items"]:
+                self.index[item["name"]] = len(self.names)
+                positions.append(len(self.names))
+                self.names.append(item["name"])
+                self.base_co2.append(item["base_co2"] or 0.0) # Items without a value save nothing
+            self.categories.append((category["category"], positions))
+
+    def __len__(self):
+        return len(self.names)
+
+    # Returns the position of an item or None for unknown names
+    def position(self, name: str):
+        return self.index.get(name)
+
+    # Builds one item dict in the shape the templates and Mongo expect
+    def item_view(self, position: int, count: int = 0):
+        return {"name": self.names[position], "base_co2": self.base_co2[position], "count": count, "co2": count * self.base_co2[position]}
+
+    # Builds the grouped category/items view used by the templates, with zero counts when none are given
+    def grouped(self, counts=None):
+        return [
+            {"category": category, "items": [self.item_view(position, counts[position] if counts else 0) for position in positions]}
+            for category, positions in self.categories
+        ]
+
+    # Returns the CO2 saved for counts aligned to the catalogue positions
+    def dot(self, counts):
+        return sum(map(mul, counts, self.base_co2))
+
+# Counts of a single volunteer station, aligned to the catalogue positions
+class StationTally:
+    __slots__ = ("catalogue", "counts", "total_co2", "last_seen", "lock", "station_id", "journal") # Keeps a station to its count array plus a few fields
+
+    def __init__(self, catalogue: Catalogue, station_id: str = None, journal=None):
+        self.catalogue = catalogue
+        self.counts = array("i", bytes(4 * len(catalogue))) # One 32-bit count per catalogue item, all zero
+        self.total_co2 = 0.0 # Running total kept in step with counts
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock() # Serialises clicks and batches of one station arriving on different threadpool workers
+        self.station_id = station_id
+        self.journal = journal # Records every change so the tally survives a restart, None keeps it in memory only
+
+    # Applies an increment or decrement and returns the updated item, None for unknown names
+    def update(self, item_name: str, action: str):
+        position = self.catalogue.position(item_name)
+        if position is None:
+            return None
+        with self.lock:
+            if action == "increment":
+                self.counts[position] += 1
+                self.total_co2 += self.catalogue.base_co2[position]
+                self.record({item_name: self.counts[position]})
+                TALLY_CHANGES.labels("increment").inc()
+            elif action == "decrement":
+                if self.counts[position] > 0:
+                    self.counts[position] -= 1
+                    self.total_co2 -= self.catalogue.base_co2[position]
+                    self.record({item_name: self.counts[position]})
+                TALLY_CHANGES.labels("decrement").inc()
+            return self.catalogue.item_view(position, self.counts[position])
+
+    # Applies (item name, delta) pairs in order as one change and returns the touched items, raises KeyError listing unknown names and changes nothing then
+    def apply(self, deltas: list):
+        positions = [(self.catalogue.position(name), delta) for name, delta in deltas]
+        unknown = [name for (name, _), (position, _) in zip(deltas, positions) if position is None]
+        if unknown:
+            raise KeyError(unknown)
+
+        with self.lock:
+            staged = {} # Position -> new count, written only once the whole batch is valid
+            for position, delta in positions:
+                count = max(0, staged.get(position, self.counts[position]) + delta) # Stops at zero like the minus button
+                if count > MAX_COUNT:
+                    raise ValueError(f"Count of {self.catalogue.names[position]} would exceed {MAX_COUNT}")
+                staged[position] = count
+            for position, count in staged.items():
+                self.total_co2 += (count - self.counts[position]) * self.catalogue.base_co2[position]
+                self.counts[position] = count
+            self.record({self.catalogue.names[position]: count for position, count in staged.items()})
+            touched = [self.catalogue.item_view(position, count) for position, count in staged.items()]
+
+        TALLY_CHANGES.labels("increment").inc(sum(delta for _, delta in deltas if delta > 0))
+        TALLY_CHANGES.labels("decrement").inc(sum(-delta for _, delta in deltas if delta < 0))
+        return touched
+
+    # Returns the CO2 saved by the current tally from the running total
+    def total(self):
+        return round(self.total_co2, TOTAL_PRECISION)
+
+    # Recomputes the running total from the counts
+    def recompute(self):
+        self.total_co2 = self.catalogue.dot(self.counts)
+        return self.total()
+
+    # Returns the grouped view of this station's tally
+    def grouped(self):
+        return self.catalogue.grouped(self.counts)
+
+    # Returns the counted items grouped by category, as stored with a saved session
+    def exchanged(self):
+        exc_items = {}
+        for category, positions in self.catalogue.categories:
+            for position in positions:
+                if self.counts[position] > 0:
+                    item = self.catalogue.item_view(position, self.counts[position])
+                    exc_items.setdefault(category, []).append({"name": item["name"], "count": item["count"], "co2": item["co2"]})
+        return exc_items
+
+    # Zeroes every count
+    def reset(self):
+        with self.lock:
+            self.counts = array("i", bytes(4 * len(self.catalogue)))
+            self.total_co2 = 0.0
+            if self.journal is not None:
+                self.journal.record_reset(self.station_id)
+
+    # Journals the new absolute counts of changed items, caller holds the lock so the log follows the order of changes
+    def record(self, counts: dict):
+        if self.journal is not None:
+            self.journal.record_counts(self.station_id, counts)
+
+    # Sets counts by item name without journaling, used when restoring, names no longer in the catalogue are skipped
+    def load(self, counts: dict):
+        with self.lock:
+            for name, count in counts.items():
+                position = self.catalogue.position(name)
+                if position is not None:
+                    self.counts[position] = max(0, min(int(count), MAX_COUNT))
+            self.recompute()
+
+    # Returns the non-zero counts by item name
+    def snapshot(self):
+        return {self.catalogue.names[position]: count for position, count in enumerate(self.counts.tolist()) if count}
+
+# Registry of station tallies keyed by the station cookie, dropping stations that went idle
+class TallyStore:
+    def __init__(self, catalogue: Catalogue, idle_seconds: int = STATION_IDLE_SECONDS, journal=None):
+        self.catalogue = catalogue
+        self.idle_seconds = idle_seconds
+        self.stations = {} # Station id -> StationTally
+        self.lock = threading.Lock()
+        self.last_sweep = time.monotonic()
+        self.journal = journal # Handed to every station, set by TallyJournal.attach
+
+    # Returns the station id and tally for a cookie value, creating a new station for missing or evicted ids
+    def get(self, station_id: str = None):
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_sweep > EVICTION_INTERVAL:
+                self.evict_idle(now)
+            if station_id and len(station_id) > STATION_ID_MAX_LENGTH:
+                station_id = None
+            tally = self.stations.get(station_id) if station_id else None
+            if tally is None:
+                station_id = station_id or secrets.token_urlsafe(16) # Keeps the browser's id so its cookie stays valid after eviction
+                tally = self.stations[station_id] = StationTally(self.catalogue, station_id, self.journal)
+            tally.last_seen = now
+            return station_id, tally
+
+    # Drops stations idle for longer than the configured timeout, caller holds the lock
+    def evict_idle(self, now: float):
+        cutoff = now - self.idle_seconds
+        for station_id in [key for key, tally in self.stations.items() if tally.last_seen < cutoff]:
+            del self.stations[station_id]
+            if self.journal is not None:
+                self.journal.record_drop(station_id)
+        self.last_sweep = now
+
+    # Replaces the stations with restored counts {station id: {item name: count}}, restored stations start a fresh idle window
+    def load(self, stations: dict):
+        with self.lock:
+            self.stations = {}
+            for station_id, counts in stations.items():
+                tally = self.stations[station_id] = StationTally(self.catalogue, station_id, self.journal)
+                tally.load(counts)
+
+    # Returns the non-zero counts of every station, reads a copy of the registry so journal compaction never waits on the store lock
+    def snapshot(self):
+        return {station_id: tally.snapshot() for station_id, tally in dict(self.stations).items()}
+
+    # Number of stations currently tracked
+    def __len__(self):
+        return len(self.stations)
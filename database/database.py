@@ -1,9 +1,25 @@
-from sqlalchemy import create_engine, text # create_engine function creates the connection to interact with the database
-from sqlalchemy.orm import sessionmaker, declarative_base # sessionmaker creates session objects which we use to interact with the database such as add, query, update, delete whilce declarative_base allows class definitions that map to databse tables
+from sqlalchemy import create_engine, text, event # create_engine function creates the connection to interact with the database
+from sqlalchemy.engine import Engine # Engine class used to register connection level events
+from sqlalchemy.pool import Pool # Pool class used to detach sessions from returned connections
+from contextlib import contextmanager # Builds the unit of work context manager
+from sqlalchemy.orm import Session, sessionmaker, declarative_base # sessionmaker creates session objects which we use to interact with the database such as add, query, update, delete whilce declarative_base allows class definitions that map to databse tables
 from pymongo import MongoClient # Imports the MongoClient class from the pymongo library.
 from dotenv import load_dotenv # Loads secrets from .env.
 import os # Accesses the environment variables.
 import certifi # Imports the certifi library which is required by Atlas in terms of secure SSL/TLS connections
+import sqlite3 # Used to detect SQLite connections which need foreign keys switched on
+from config import query_profiler, metrics # Opt-in Mongo command profiling listeners and latency metrics
+from sqlalchemy.engine import make_url # Reads the driver of a database URL
+from database.probing import BackendProbe, BACKEND_PROBE_TIMEOUT # Probes the cloud and local backends side by side
+
+
+# Switches on foreign key enforcement for SQLite connections so ON DELETE CASCADE behaves like Postgres
+@event.listens_for(Engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
 
 # Loads enviroment variables from .env file to retrieve sensitive data securely
@@ -14,38 +30,63 @@ LOCAL_DB_URL = os.getenv("LOCAL_POSTGRES_URL")
 DATABASE_URL = os.getenv("DATABASE_URL") 
 LOCAL_MONGO_URL = os.getenv("LOCAL_MONGO_URL")
 uri = os.getenv("uri")
+SQL_ECHO = os.getenv("SQL_ECHO", "true").lower() == "true" # Statement echo can be switched off when the query profiler is used instead
 
-# Tracks Postgres online & offline status
-is_postgres_online = False
-engine = None
-
-# Tries to connect to the cloud first
-try:
-    engine = create_engine(DATABASE_URL, echo=True, future=True)
-    with engine.connect() as conn:
-        conn.execute(text("SELECT 1")) # Tests if database works before it connects to it
-    print("Connected to Supabase")
-    is_postgres_online = True
-
-except Exception as e:
-    print(f"Supabase connection failed: {e}")
-
+# Function to create an engine and check it answers, Postgres connections give up after the probe timeout
+def connect_sql(url: str):
+    connect_args = {"connect_timeout": max(1, int(BACKEND_PROBE_TIMEOUT))} if make_url(url).get_backend_name() == "postgresql" else {} # psycopg2 otherwise waits on the OS TCP timeout
+    engine = create_engine(url, echo=SQL_ECHO, future=True, connect_args=connect_args)
     try:
-        engine = create_engine(LOCAL_DB_URL, echo=True, future=True)
         with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        print("Supabase unavailable. Using local Postgres.")
-        is_postgres_online = False
+            conn.execute(text("SELECT 1")) # Tests if database works before it connects to it
+    except Exception:
+        engine.dispose()
+        raise
+    return engine
 
-    except Exception as local_e:
-        print(f"Local Postgres connection failed too: {local_e}")
-        engine = None  
-        is_postgres_online = False
+# Probes Supabase and local Postgres at once, Supabase is preferred whenever it answers
+sql_candidates = [(name, lambda url=url: connect_sql(url), lambda engine: engine.dispose()) for name, url in (("Supabase", DATABASE_URL), ("local Postgres", LOCAL_DB_URL)) if url]
+sql_backend, engine = BackendProbe("SQL", sql_candidates).select()
+is_postgres_online = sql_backend == "Supabase" # Tracks Postgres online & offline status
+print(f"Connected to {sql_backend}" if engine else "No SQL database reachable")
 
  # Creates database engine using SQLite
-SessionLocal = sessionmaker(bind=engine, autoflush=False) # Creates a class called SessionLocal that creates database sessions like add(), delete() etc. autoflush ensures changes wont be automatically flushed to the DB until committed
+SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False) # Creates a class called SessionLocal that creates database sessions like add(), delete() etc. autoflush ensures changes wont be automatically flushed to the DB until committed while expire_on_commit=False keeps committed objects loaded so no refresh SELECT is needed
 Base = declarative_base() # Base class for ORM model classes from which ever model will inherit from
 
+# STATEMENT COUNTING
+# Links the connection a session begins on to the session's info dict so its statements can be counted
+@event.listens_for(Session, "after_begin")
+def attach_session_info(session, transaction, connection):
+    connection.info["session_info"] = session.info
+
+# Counts every statement sent to the database against the session that issued it
+@event.listens_for(Engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    info = conn.info.get("session_info")
+    if info is not None:
+        info["statements"] = info.get("statements", 0) + 1
+
+# Detaches the session once its connection goes back to the pool
+@event.listens_for(Pool, "checkin")
+def detach_session_info(dbapi_connection, connection_record):
+    if connection_record is not None:
+        connection_record.info.pop("session_info", None)
+
+# Returns how many statements a session has issued so far, e.g. to assert round-trips in tests
+def statement_count(db: Session):
+    return db.info.get("statements", 0)
+
+# Unit of work that commits everything done inside it once, or rolls it all back on error
+@contextmanager
+def unit_of_work(db: Session):
+    try:
+        yield db
+        db.commit() # One commit for the whole request-level operation
+    except Exception:
+        db.rollback() # Leaves the session usable after a failed operation
+        raise
+
 # Dependency function that creates and provides a new database session for each request
 def get_db():
     if not SessionLocal:
@@ -60,35 +101,36 @@ def get_db():
 class Co2:
     def __init__(self): # Constructor method i creates an instance of co2 & setsup references to the necessary collections
         
-        self.is_online = False  # Defaults to offline unless proven otherwise
-       
-        try:
-            # Loads the MongoDB URI (connection string) from environment variables
-            if not uri:
-                raise EnvironmentError("MongoDB URI not found in environment variables.")
-            
-            # Initializes the MongoClient to establish a connection to MongoDB
-            self.client = MongoClient(uri, tlsCAFile=certifi.where())  
-            self.client.admin.command('ping')  # Ensured the connection is alive
-            self.is_online = True
-            print("Connected to MongoDB Atlas")
-
-        except Exception as e:
-            print(f"Failed to connect to MongoDB Atlas: {e}")
-            print("Trying local MongoDB...")
-
-            try:
-                self.client = MongoClient(LOCAL_MONGO_URL)
-                self.client.admin.command('ping')
-                self.is_online = False 
-                print("Connected to local MongoDB")
-
-            except Exception as e2:
-                print(f"Failed to connect to local MongoDB too: {e2}")
-                raise
+        listeners = query_profiler.mongo_listeners() + metrics.mongo_listeners()
+        candidates = []
+        if uri:
+            candidates.append(("MongoDB Atlas", {"host": uri, "tlsCAFile": certifi.where()}))
+        if LOCAL_MONGO_URL:
+            candidates.append(("local MongoDB", {"host": LOCAL_MONGO_URL}))
+
+        # Pings every candidate at once with short timeouts on throwaway clients, Atlas is preferred whenever it answers
+        name, options = BackendProbe("Mongo", [(name, lambda options=options: self.ping(options), lambda options: None) for name, options in candidates]).select()
+        if name is None:
+            raise ConnectionError("No MongoDB reachable, tried: " + (", ".join(name for name, _ in candidates) or "none configured"))
+
+        self.client = MongoClient(**options, event_listeners=listeners) # Runtime client keeps the driver's default timeouts
+        self.is_online = name == "MongoDB Atlas" # Defaults to offline unless proven otherwise
+        print(f"Connected to {name}")
 
         # Accesses the database and the co2, sos, collections plus Event Logs after sign out
         self.db = self.client["YoungCaritas"]
         self.co2 = self.db["co2"]
         self.sos = self.db["sessions"] 
-        self.logs = self.db["Event_Logs"]
\ No newline at end of file
+        self.logs = self.db["Event_Logs"]
+        self.items = self.db["co2_items"] # Item data with one document per item, used when MONGO_LAYOUT=flat
+
+    # Function to ping a Mongo server with a short lived client, returns the options that reached it
+    @staticmethod
+    def ping(options: dict):
+        timeout_ms = int(BACKEND_PROBE_TIMEOUT * 1000)
+        client = MongoClient(**options, serverSelectionTimeoutMS=timeout_ms, connectTimeoutMS=timeout_ms)
+        try:
+            client.admin.command('ping') # Ensures the connection is alive
+        finally:
+            client.close()
+        return options
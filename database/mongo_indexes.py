@@ -0,0 +1,67 @@
+import time # Measures index build durations
+import logging # Logs build results
+import threading # Builds indexes without blocking startup
+from datetime import datetime # Timestamps status changes
+from pymongo import ASCENDING # Index key direction
+from pymongo.errors import PyMongoError # Raised by failed index builds
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Indexes the app's queries rely on: (collection, keys, options)
+MONGO_INDEXES = [
+    ("co2", [("category", ASCENDING)], {"name": "category_unique", "unique": True}), # reset_counts and update_item filter on category
+    ("co2", [("items.name", ASCENDING)], {"name": "items_name"}), # Multikey index for update_item's positional filter
+    ("co2_items", [("name", ASCENDING)], {"name": "item_name_unique", "unique": True}), # Flat layout updates filter on the item name
+    ("sessions", [("session.timestamp", ASCENDING)], {"name": "session_timestamp"}), # Time ranged session queries
+    ("Event_Logs", [("Logs.timestamp", ASCENDING)], {"name": "logs_timestamp"}), # Time ranged event queries
+]
+
+# Ensures the Mongo indexes exist and keeps the status of each build for diagnostics
+class MongoIndexManager:
+    def __init__(self, db, indexes: list = MONGO_INDEXES):
+        self.db = db # Mongo database holding the collections
+        self.indexes = indexes
+        self.lock = threading.Lock()
+        self.thread = None
+        self.status = {
+            options["name"]: {"collection": collection, "keys": dict(keys), "unique": options.get("unique", False), "status": "pending", "error": None, "duration_ms": None, "updated_at": None}
+            for collection, keys, options in indexes
+        }
+
+    # Records a status change for one index
+    def set_status(self, name: str, **fields):
+        with self.lock:
+            self.status[name].update(fields, updated_at=datetime.utcnow().isoformat())
+
+    # Creates every missing index, create_index is a no-op for indexes that already exist with the same options
+    def ensure(self):
+        for collection, keys, options in self.indexes:
+            name = options["name"]
+            self.set_status(name, status="building")
+            start = time.perf_counter()
+            try:
+                self.db[collection].create_index(keys, **options)
+                self.set_status(name, status="ready", error=None, duration_ms=round((time.perf_counter() - start) * 1000, 2))
+            except PyMongoError as e:
+                self.set_status(name, status="failed", error=str(e), duration_ms=round((time.perf_counter() - start) * 1000, 2))
+                logger.error(f"Mongo index {collection}.{name} could not be built: {e}") # e.g. duplicate categories block the unique index
+        return self.report()
+
+    # Starts the builds on a background thread so startup doesn't wait for large collections
+    def ensure_in_background(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.ensure, name="mongo-index-builder", daemon=True)
+            self.thread.start()
+        return self.thread
+
+    # Returns the build status of each managed index plus the indexes that currently exist on each collection
+    def report(self):
+        with self.lock:
+            managed = {name: dict(status) for name, status in self.status.items()}
+        existing = {}
+        for collection in sorted({collection for collection, _, _ in self.indexes}):
+            try:
+                existing[collection] = sorted(self.db[collection].index_information())
+            except PyMongoError as e:
+                existing[collection] = {"error": str(e)}
+        return {"ready": all(status["status"] == "ready" for status in managed.values()), "indexes": managed, "existing": existing}
@@ -0,0 +1,76 @@
+import os # Accesses the environment variables
+import time # Times every probe
+import logging # Reports the chosen backend and probe timings
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED # Runs the probes side by side
+from dotenv import load_dotenv # Loads secrets from .env.
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Backend Probe Configurations
+BACKEND_PROBE_TIMEOUT = float(os.getenv("BACKEND_PROBE_TIMEOUT", "5")) # Seconds a database probe may take, passed to the drivers as their connect/server selection timeout
+PROBE_GRACE = 2 # Extra seconds before a probe whose driver ignores its timeout is given up on
+ERROR_LENGTH = 160 # Characters of a probe error kept in the log, driver errors repeat the whole topology
+
+# Probes every candidate backend at once and picks the first healthy one in preference order
+class BackendProbe:
+    def __init__(self, kind: str, candidates: list, timeout: float = BACKEND_PROBE_TIMEOUT):
+        self.kind = kind # "SQL" or "Mongo", used in the log lines
+        self.candidates = candidates # (name, connect, close) in preference order, connect returns a ready resource or raises
+        self.timeout = timeout
+        self.timings = {} # Name -> {"ok", "ms", "error"}
+
+    # Function to run one probe and record its timing
+    def run(self, name: str, connect):
+        start = time.perf_counter()
+        try:
+            resource = connect()
+            self.timings[name] = {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 1)}
+            return resource
+        except Exception as e:
+            self.timings[name] = {"ok": False, "ms": round((time.perf_counter() - start) * 1000, 1), "error": (str(e).splitlines() or [type(e).__name__])[0][:ERROR_LENGTH]}
+            raise
+
+    # Function to return (name, resource) of the most preferred healthy backend, or (None, None) when none answered
+    def select(self):
+        if not self.candidates:
+            logger.error(f"No {self.kind} backend configured")
+            return None, None
+
+        pool = ThreadPoolExecutor(max_workers=len(self.candidates), thread_name_prefix=f"probe-{self.kind.lower()}")
+        futures = [pool.submit(self.run, name, connect) for name, connect, _ in self.candidates]
+        pool.shutdown(wait=False) # Slow losers finish in the background
+        deadline = time.monotonic() + self.timeout + PROBE_GRACE
+        chosen = None
+
+        # Waits only as long as a more preferred probe may still succeed, so the same healthy backends always give the same choice
+        pending = set(futures)
+        while chosen is None and pending:
+            for index, future in enumerate(futures):
+                if not future.done():
+                    break # A more preferred backend is still answering
+                if future.exception() is None:
+                    chosen = index
+                    break
+            else:
+                break # Every probe failed
+            if chosen is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                pending = {future for future in futures if not future.done()}
+                wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        if chosen is None: # Past the deadline a hanging probe counts as failed
+            chosen = next((index for index, future in enumerate(futures) if future.done() and future.exception() is None), None)
+
+        # Closes every resource that wasn't chosen, now or once its probe finishes
+        for index, (name, _, close) in enumerate(self.candidates):
+            if index != chosen:
+                futures[index].add_done_callback(lambda future, close=close: close(future.result()) if future.exception() is None else None)
+
+        timings = {name: self.timings.get(name, {"ok": None, "ms": None, "error": "still probing"}) for name, _, _ in self.candidates} # Slower probes not needed for the decision are still running
+        name = self.candidates[chosen][0] if chosen is not None else None
+        log = logger.info if chosen == 0 else logger.warning
+        log(f"{self.kind} backend: {name or 'none reachable'}, probes: {timings}")
+        return (name, futures[chosen].result()) if chosen is not None else (None, None)
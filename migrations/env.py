@@ -0,0 +1,42 @@
+from logging.config import fileConfig # Applies the logging sections of alembic.ini
+from alembic import context # Migration context of the running alembic command
+from sqlalchemy import create_engine # Engine for a database given with -x url=...
+from database.database import Base # Declarative base the models register on
+import models.models # Registers every table on Base.metadata
+
+if context.config.config_file_name:
+    fileConfig(context.config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata # Used by alembic revision --autogenerate
+
+# Function to return the database to migrate, -x url=... wins over the backend the app itself would select
+def migration_url():
+    return context.get_x_argument(as_dictionary=True).get("url")
+
+# Function to emit the migration SQL as a script instead of running it
+def run_migrations_offline():
+    url = migration_url()
+    if not url:
+        raise RuntimeError("Offline migrations need the target database, pass -x url=postgresql://...")
+    context.configure(url=url, target_metadata=target_metadata, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+# Function to run the migrations against the chosen database
+def run_migrations_online():
+    url = migration_url()
+    if url:
+        engine = create_engine(url)
+    else:
+        from database.database import engine # Supabase when it answers, local Postgres otherwise, like the app
+        if engine is None:
+            raise RuntimeError("No SQL database reachable, pass -x url=... to pick one")
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,49 @@
+"""Delete profiles and audit logs with their user or admin through ON DELETE CASCADE
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import context, op # Migration context and schema operations
+import sqlalchemy as sa # Inspects the constraints already in the database
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table) of every foreign key the set-based bulk deletes rely on the database to cascade
+FOREIGN_KEYS = [
+    ("user_profiles", "user_id", "Users"),
+    ("audit_logs", "user_id", "Users"),
+    ("audit_logs", "admin_id", "AdminUsers"),
+]
+
+# Function to find the constraint currently on a column, the Postgres default name is assumed when generating SQL offline
+def existing_foreign_key(table: str, column: str):
+    if context.is_offline_mode():
+        return {"name": f"{table}_{column}_fkey", "options": {}}
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return next((fk for fk in inspector.get_foreign_keys(table) if fk["constrained_columns"] == [column]), {"name": None, "options": {}})
+
+# Function to recreate the foreign keys with the given ON DELETE rule, keys that already have it are left alone
+def replace_foreign_keys(ondelete: str = None):
+    if op.get_context().dialect.name == "sqlite":
+        return # SQLite can't alter constraints, its databases are benchmark and test scratch files created with the cascade by create_all
+    for table, column, referred in FOREIGN_KEYS:
+        fk = existing_foreign_key(table, column)
+        if fk is None:
+            continue # Table not created yet, create_all adds it with the current rule
+        if not context.is_offline_mode() and fk["name"] and (fk["options"].get("ondelete") or "").upper() == (ondelete or ""):
+            continue
+        if fk["name"]:
+            op.drop_constraint(fk["name"], table, type_="foreignkey")
+        op.create_foreign_key(f"{table}_{column}_fkey", table, referred, [column], ["id"], ondelete=ondelete)
+
+def upgrade():
+    replace_foreign_keys("CASCADE")
+
+def downgrade():
+    replace_foreign_keys(None)
@@ -8,6 +8,7 @@ from typing import List, Optional
 # ORM Model representing a row in the "items" table
 class Item(Base):
     __tablename__ = "Items" # Table name in the database
+    __mapper_args__ = {"eager_defaults": True} # Fetches generated columns in the INSERT/UPDATE itself instead of a later SELECT
 
     id = Column(Integer, primary_key=True, index=True) # Primary Key marks the id column as a unique identifier while index:True creates an index for faster searches
     category_id = Column(Integer, ForeignKey("Categories.id"), nullable=False) # Links to the category the item belongs to
@@ -38,6 +39,7 @@ class Category(Base):
 # ORM Model representing a row in the "AdminUsers" table
 class Admin(Base):
     __tablename__ = "AdminUsers" # Table name in the database
+    __mapper_args__ = {"eager_defaults": True} # Fetches generated columns in the INSERT/UPDATE itself instead of a later SELECT
 
     id = Column(Integer, primary_key=True, index=True) # Primary Key marks the id column as a unique identifier while index:True creates an index for faster searches
     first_name = Column(String)  # Adds a first name column that stores strings
@@ -49,11 +51,12 @@ class Admin(Base):
     force_password_change = Column(Boolean, default=True) # Forces password change on first time login
 
     # Relationships
-    audit_logs = relationship("AuditLog", back_populates="admin", cascade="all, delete-orphan") # Relationship back to audit logs
+    audit_logs = relationship("AuditLog", back_populates="admin", cascade="all, delete-orphan", passive_deletes=True) # Relationship back to audit logs, deleted by the database's ON DELETE CASCADE instead of loading each row
 
 # ORM Model representing a row in the "Users" table
 class User(Base):
     __tablename__ = "Users" # Table name in the database
+    __mapper_args__ = {"eager_defaults": True} # Fetches generated columns in the INSERT/UPDATE itself instead of a later SELECT
 
     # Primary identification
     id = Column(Integer, primary_key=True, index=True) # Primary Key marks the id column as a unique identifier while index.
@@ -71,15 +74,16 @@ class User(Base):
     verified_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) # Timestamp for when the user is verification
 
     # Relationships
-    profile = relationship("UserProfile", back_populates="user", uselist=False)
-    audit_logs = relationship("AuditLog", back_populates="user", cascade="all, delete-orphan") 
+    profile = relationship("UserProfile", back_populates="user", uselist=False, passive_deletes=True)
+    audit_logs = relationship("AuditLog", back_populates="user", cascade="all, delete-orphan", passive_deletes=True) 
 
 # ORM Model representing a row in the "User Profiles" table 
 class UserProfile(Base):
     __tablename__ = "user_profiles" # Table name in the database
+    __mapper_args__ = {"eager_defaults": True} # Fetches generated columns in the INSERT/UPDATE itself instead of a later SELECT
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('Users.id'), nullable=False, unique=True)
+    user_id = Column(Integer, ForeignKey('Users.id', ondelete="CASCADE"), nullable=False, unique=True)
 
     # Basic Company Information
     name = Column(String, nullable=True)
@@ -95,10 +99,11 @@ class UserProfile(Base):
 # ORM Model representing a row in the "AuditLogs" table
 class AuditLog(Base):
     __tablename__ = "audit_logs" # Table name in the database
+    __mapper_args__ = {"eager_defaults": True} # Fetches generated columns in the INSERT/UPDATE itself instead of a later SELECT
 
     id = Column(Integer, primary_key=True, index=True) # Primary Key marks the id column as a unique identifier while index:True creates an index for faster searches
-    user_id = Column(Integer, ForeignKey("Users.id"), nullable=True) # Links to user (nullable for system events)
-    admin_id = Column(Integer, ForeignKey("AdminUsers.id"), nullable=True) # Links to admin user if applicable
+    user_id = Column(Integer, ForeignKey("Users.id", ondelete="CASCADE"), nullable=True) # Links to user (nullable for system events), rows are removed by the database when the user is deleted
+    admin_id = Column(Integer, ForeignKey("AdminUsers.id", ondelete="CASCADE"), nullable=True) # Links to admin user if applicable, rows are removed by the database when the admin is deleted
     
     # Event details
     action = Column(String, nullable=False) # Action performed such as login, logout, create_item and so on
@@ -122,6 +127,15 @@ class AuditLog(Base):
     user = relationship("User", back_populates="audit_logs") # Relationship to regular user table
     admin = relationship("Admin", back_populates="audit_logs") # Relationship to admin user table
 
+# ORM Model representing a row in the "RevokedTokens" table, login tokens refused before they expire
+class RevokedToken(Base):
+    __tablename__ = "RevokedTokens" # Table name in the database
+
+    id = Column(Integer, primary_key=True) # Increasing id lets every worker fetch only the revocations it hasn't seen yet
+    jti = Column(String, nullable=False, unique=True) # Unique id of the revoked login token
+    expires_at = Column(DateTime, nullable=False, index=True) # Token expiry, the row can be purged after it
+    revoked_at = Column(DateTime, default=datetime.utcnow) # Timestamp when the token was revoked
+
 # MONGO DB DATA MODEL
 class ItemSchema(BaseModel): 
     item_name: str = Field(..., unique=True) # Item Name
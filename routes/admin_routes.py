@@ -1,18 +1,18 @@
 from fastapi import APIRouter,Request, Form, Depends # Imports APIRouter to create a modular group of API Routes
 from fastapi.responses import HTMLResponse, RedirectResponse # Imports response classes to return rendered HTML pages &  to redirect client to another URL after a POST 
-from fastapi.templating import Jinja2Templates # Imports Jinja2Templates to enable server-side rendering of HTML templates with variables.
 from crud.operations import AdminUserCRUD # Imports CRUD operations for database interaction
 from schemas.schemas import  AdminRegistration # Imports request and response schemas respectively
 from sqlalchemy.orm import Session # Imports SQLAlchemy ORM database Session class for querying data
 from database.database import get_db, engine, Base # Imports SQLAlchemy engine connected to the database, dependency function to provide DB Session and declarative Base for models to create tables
 from config.jwt_handler import JWTHandler # Imports JWT Handler Class for token creation and validation
+from config.token_revocation import revoked_tokens # Revokes login tokens at logout
 from utilities.utils import AuditLogger
 import logging
+from config.templates import templates # Shared, bytecode-cached template environment
 
 
 Base.metadata.create_all(bind=engine) # Creates all database tables based on the models if not yet existent
 router = APIRouter() #  Creates a router instance to group related routes
-templates = Jinja2Templates(directory="templates") # Initializes templates
 acrud = AdminUserCRUD() # Initializes AdminUserCRUD class instance to perorm DB Operations
 
 # FORM PAGE ROUTES
@@ -140,6 +140,7 @@ def admin_logout_route(db: Session = Depends(get_db), request: Request = None):
         try:
             payload = JWTHandler.verify_login_token(token)
             admin_id = payload.get("user_id")
+            revoked_tokens.revoke_payload(db, payload) # The token stops working even if a copy of the cookie survives
         except:
             pass
 
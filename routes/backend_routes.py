@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, Body, Form, Request # Imports APIRouter to create a modular group of API Routes, HTTPException for raising HTTP error responses
-from fastapi.responses import RedirectResponse, HTMLResponse  # JSON response handling
+from fastapi import APIRouter, HTTPException, Depends, Body, Form, Request, UploadFile, File # Imports APIRouter to create a modular group of API Routes, HTTPException for raising HTTP error responses
+from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse  # JSON response handling
 from sqlalchemy.orm import Session # Imports SQLAlchemy ORM database Session class for querying data
-from database.database import get_db, engine, Base # Imports database configurations & dependency function to provide a database session for each request
-from crud.operations import AdminUserCRUD, UserCRUD, CategoryCRUD, ItemCRUD # Imports CRUD operations for database interaction
-from schemas.schemas import CreateCategory, ReadCategory, CreateUser, ReadUser, AdminUser, Create_AdminUser, Read_Adminuser, CreateItem, ReadItem # Imports schema models for request validation and response serialization
-from typing import List # Imports typing for Type hinting support
-from fastapi.templating import Jinja2Templates # Imports Jinja2Templates to enable server-side rendering of HTML templates with variables.
+from database.database import get_db, engine, Base, SessionLocal # Imports database configurations & dependency function to provide a database session for each request
+from crud.operations import AdminUserCRUD, UserCRUD, CategoryCRUD, ItemCRUD, CatalogueCRUD # Imports CRUD operations for database interaction
+from crud.archive_operations import SessionArchive # Imports the Parquet archive of past events
+from utilities.utils import CatalogueUtils, ExportUtils # Imports catalogue parsing and serialisation helpers
+from crud.mongo_operations import SESSION_EXPORT_COLUMNS, EVENT_EXPORT_COLUMNS # Column layouts of the Mongo exports
+from routes.ui_routes import mongo, mongo_indexes # Shares the UI's Mongo connection for exports and index diagnostics
+from pydantic import ValidationError # Raised when an imported row fails schema validation
+from schemas.schemas import CreateCategory, ReadCategory, CreateUser, ReadUser, AdminUser, Create_AdminUser, Read_Adminuser, CreateItem, ReadItem, BulkDeleteSummary, AdminReviewRequest, AdminReviewReport # Imports schema models for request validation and response serialization
+from typing import List, Optional # Imports typing for Type hinting support
+from datetime import datetime, timedelta, date # Computes cutoffs for stale account cleanup and analytics date ranges
+from config.templates import templates # Shared, bytecode-cached template environment
+from routes.protected_routes import get_current_admin_user # Admin cookie check used by the admin UI
 
 # Initializes CRUD operation classes
 Base.metadata.create_all(bind=engine) # Creates all database tables based on the models if not yet present
@@ -14,7 +21,8 @@ ccrud = CategoryCRUD() # Initializes Category class instance to perform DB Opera
 ucrud = UserCRUD() # Initializes UserCRUD class instance to perform DB Operations
 acrud = AdminUserCRUD() # Initializes AdminUserCRUD class instance to perform DB Operations
 icrud = ItemCRUD() # Initializes Item CRUD class instance to perform DB Operations
-templates = Jinja2Templates(directory="templates") # Initializes templates
+catcrud = CatalogueCRUD() # Initializes Catalogue CRUD class instance to perform bulk DB Operations
+archive = SessionArchive() # Initializes the event archive reader
 
 # MAIN ROUTE
 @router.get("/", response_class=HTMLResponse)
@@ -69,13 +77,14 @@ def delete_admin_user(email: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found for deletion") # Raises error if admin user isnt found
     return deleted_user # Returns the deleted user
 
-# Route to delete all admin users 
-@router.delete("/admin_users", response_model=List[AdminUser]) # DELETE /admin_users removes all admin users 
-def delete_all_admin_users(db: Session = Depends(get_db)): 
-    deleted_users = acrud.delete_admin_users(db)  # Calls CRUD delete function deletes all admin users
-    if not deleted_users:
+# Route to delete all admin users or only pending/stale ones
+@router.delete("/admin_users", response_model=BulkDeleteSummary) # DELETE /admin_users removes admin users in one statement
+def delete_all_admin_users(request: Request, unverified_only: bool = False, older_than_days: Optional[int] = None, db: Session = Depends(get_db)): 
+    created_before = datetime.utcnow() - timedelta(days=older_than_days) if older_than_days is not None else None # Cutoff for stale accounts
+    summary = acrud.delete_admin_users(db, unverified_only=unverified_only, created_before=created_before, request=request)  # Calls CRUD bulk delete function
+    if not summary["deleted"]:
         raise HTTPException(status_code=404, detail="Users arent found for deletion") # Raises error if users aren't found
-    return deleted_users # Returns the deleted user
+    return summary # Returns the number and projection of deleted users
 
 # Route to verify admin user
 @router.post("/verify_admin_user/{email}", response_model=Create_AdminUser) # POST /verify_admin_user/{email} verifies a pending admin user using the email
@@ -89,6 +98,13 @@ def verify_pending_user(email: str,  db: Session = Depends(get_db)):
 
     return verified_user  # Returns the verified user 
 
+# Route to approve and reject pending admin users in one transaction, reporting the outcome per email
+@router.post("/admin_users/review", response_model=AdminReviewReport) # POST /admin_users/review with {"approve": [...], "reject": [...]}
+def review_pending_users(review: AdminReviewRequest, request: Request, db: Session = Depends(get_db), admin = Depends(get_current_admin_user)): # Only a logged in, verified admin may approve or reject accounts
+    if not review.approve and not review.reject:
+        raise HTTPException(status_code=422, detail="Nothing to review") # Raises error for an empty review
+    return acrud.review_admin_users(db, approve=[str(email) for email in review.approve], reject=[str(email) for email in review.reject], request=request) # Calls CRUD bulk review function
+
 # Route to change password
 @router.put("/verified_admin_user/{email}/change_pwd", response_model=Create_AdminUser) # PUT /verified_admin_user/{email}/change_pwd changes the password
 def change_password(email: str, new_password: str = Body(..., embed=True), db: Session = Depends(get_db)):
@@ -133,6 +149,15 @@ def delete_user(work_email: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found for deletion") # Raises error if user isnt found
     return deleted_user # Returns the deleted user
 
+# Route to clean up users in bulk, e.g. test accounts or stale unverified registrations
+@router.delete("/users", response_model=BulkDeleteSummary) # DELETE /users removes users in one statement
+def delete_users(request: Request, user_type: Optional[str] = None, unverified_only: bool = False, older_than_days: Optional[int] = None, db: Session = Depends(get_db)):
+    created_before = datetime.utcnow() - timedelta(days=older_than_days) if older_than_days is not None else None # Cutoff for stale accounts
+    summary = ucrud.delete_users(db, user_type=user_type, unverified_only=unverified_only, created_before=created_before, request=request) # Calls CRUD bulk delete function
+    if not summary["deleted"]:
+        raise HTTPException(status_code=404, detail="Users arent found for deletion") # Raises error if users aren't found
+    return summary # Returns the number and projection of deleted users
+
 # Route to verify a user 
 @router.get("/verify")  # GET /verify verifiess a user 
 def verify_user(email: str, db: Session = Depends(get_db)):
@@ -235,4 +260,68 @@ def delete_item(name: str = Form(...), db: Session = Depends(get_db)):
         return RedirectResponse("/api?msg=item_notfound", status_code=303)
     
     icrud.delete_item(db, name)  # Deletes the item
-    return RedirectResponse("/api?msg=item_deleted", status_code=303)  # Redirect after deletion
\ No newline at end of file
+    return RedirectResponse("/api?msg=item_deleted", status_code=303)  # Redirect after deletion
+
+# CATALOGUE ROUTES
+# Route to import categories and items from an uploaded CSV or JSON file in one request
+@router.post("/catalogue/import") # POST /catalogue/import upserts a whole partner catalogue
+def import_catalogue(request: Request, file: UploadFile = File(...), fmt: Optional[str] = Form(None), db: Session = Depends(get_db)): # Sync so the parse and the upserts run in the threadpool, not on the event loop
+    fmt = fmt or ("json" if (file.filename or "").lower().endswith(".json") else "csv") # Falls back to the file extension
+    try:
+        categories, items = CatalogueUtils.parse(file.file.read(), fmt) # Parses and validates every row before touching the database
+    except (ValueError, KeyError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid catalogue file: {e}") # Rejects the whole file on the first bad row
+
+    try:
+        return catcrud.import_catalogue(db, categories, items, request=request) # Upserts categories and items in batches
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Route to stream the catalogue as CSV or JSON in the same format accepted by the import
+@router.get("/catalogue/export") # GET /catalogue/export?fmt=csv|json streams all categories and items
+def export_catalogue(fmt: str = "csv"):
+    if fmt not in ("csv", "json"):
+        raise HTTPException(status_code=400, detail="Format must be 'csv' or 'json'")
+
+    # Opens its own session so it stays alive for the whole stream
+    def stream():
+        with SessionLocal() as db:
+            yield from CatalogueUtils.export(catcrud.iter_catalogue(db), fmt)
+
+    media_type = "text/csv" if fmt == "csv" else "application/json"
+    return StreamingResponse(stream(), media_type=media_type, headers={"Content-Disposition": f"attachment; filename=catalogue.{fmt}"})
+
+# EXPORT ROUTES
+# Route to stream all stored exchange sessions as CSV or JSON, one row per exchanged item
+@router.get("/export/sessions") # GET /export/sessions?fmt=csv|json
+def export_sessions(fmt: str = "csv"):
+    return export_rows(mongo.iter_session_rows(), SESSION_EXPORT_COLUMNS, fmt, "sessions")
+
+# Route to stream all event logs as CSV or JSON, one row per item of each event's leaderboard
+@router.get("/export/events") # GET /export/events?fmt=csv|json
+def export_events(fmt: str = "csv"):
+    return export_rows(mongo.iter_event_rows(), EVENT_EXPORT_COLUMNS, fmt, "events")
+
+# Function to wrap exported rows in a streaming download
+def export_rows(rows, columns: list, fmt: str, name: str):
+    if fmt not in ("csv", "json"):
+        raise HTTPException(status_code=400, detail="Format must be 'csv' or 'json'")
+    media_type = "text/csv" if fmt == "csv" else "application/json"
+    return StreamingResponse(ExportUtils.stream(rows, columns, fmt), media_type=media_type, headers={"Content-Disposition": f"attachment; filename={name}.{fmt}"})
+
+# DIAGNOSTICS ROUTES
+# Route to report the build status of the Mongo indexes provisioned at startup
+@router.get("/diagnostics/mongo-indexes") # GET /diagnostics/mongo-indexes
+def mongo_index_status():
+    return mongo_indexes.report()
+
+# ANALYTICS ROUTES
+# Route to get per event totals from the archive, optionally between two event dates
+@router.get("/analytics/events") # GET /analytics/events?start=YYYY-MM-DD&end=YYYY-MM-DD
+def event_trends(start: Optional[date] = None, end: Optional[date] = None):
+    return archive.event_trends(start, end)
+
+# Route to get per event item counts from the archive, optionally for one item
+@router.get("/analytics/items") # GET /analytics/items?item=NAME&start=YYYY-MM-DD&end=YYYY-MM-DD
+def item_trends(start: Optional[date] = None, end: Optional[date] = None, item: Optional[str] = None):
+    return archive.item_trends(start, end, item)
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, Request # Imports APIRouter to create a modular group of API Routes, HTTPException for raising HTTP error responses, and Depends for dependency injection tools s
-from fastapi.responses import HTMLResponse, RedirectResponse # Imports response classes to return rendered HTML pages &  to redirect client to another URL after a POST 
-from fastapi.templating import Jinja2Templates # Imports Jinja2Templates to enable server-side rendering of HTML templates with variables.
+from fastapi.responses import RedirectResponse # Imports response class to redirect client to another URL after a POST 
 from sqlalchemy.orm import Session # Imports SQLAlchemy ORM database Session class for querying data
 
 # Internal Modules
@@ -8,12 +7,12 @@ from crud.operations import UserCRUD, AdminUserCRUD # Imports CRUD operations fo
 from database.database import get_db, engine, Base # Imports SQLAlchemy engine connected to the database, dependency function to provide DB Session and declarative Base for models to create tables
 from config.jwt_handler import JWTHandler # Imports JWT Handler Class 
 from config.mail_handler import EmailHandler
+from config.static_pages import static_pages # Serves the constant outcome pages pre-rendered
 
 Base.metadata.create_all(bind=engine) # Creates all database tables based on the models if not yet existent
 router = APIRouter() #  Creates a router instance to group related routes
 ucrud = UserCRUD() # Initializes CRUD class instance to perorm DB Operations
 acrud = AdminUserCRUD() # Initializes CRUD class instance to perorm DB Operations
-templates = Jinja2Templates(directory="templates") # Initializes templates
 
 # EMAIL ROUTES
 # User Verification Route
@@ -114,46 +113,15 @@ def reject_user(request: Request, db: Session = Depends(get_db)):
         return RedirectResponse(url="/email/invalid_token", status_code=303) # Redirects to invalid token page if token is expired or invalid
 
 # HTML RESPONGE PAGES
-@router.get("/approved", response_class=HTMLResponse)
-def approved_page(request: Request):
-    return templates.TemplateResponse("approved.html", {"request": request})
-
-@router.get("/already_approved", response_class=HTMLResponse)
-def already_approved_page(request: Request):
-    return templates.TemplateResponse("already_approved.html", {"request": request})
-
-@router.get("/rejected", response_class=HTMLResponse)
-def rejected_page(request: Request):
-    return templates.TemplateResponse("rejected.html", {"request": request})
-
-@router.get("/unfound", response_class=HTMLResponse)
-def unfound_page(request: Request):
-    return templates.TemplateResponse("not_found.html", {"request": request})
-
-@router.get("/invalid_token", response_class=HTMLResponse)
-def invalid_token_page(request: Request):
-    return templates.TemplateResponse("invalid.html", {"request": request})
-
-@router.get("/user_verified", response_class=HTMLResponse)
-def verified_page(request: Request):
-    return templates.TemplateResponse("verified.html", {"request": request})
-
-@router.get("/already_verified", response_class=HTMLResponse)
-def already_verified_page(request: Request):
-    return templates.TemplateResponse("already_verified.html", {"request": request})
-
-@router.get("/user_unfound", response_class=HTMLResponse)
-def user_not_found_page(request: Request):
-    return templates.TemplateResponse("user_not_found.html", {"request": request})
-
-@router.get("/expired_token", response_class=HTMLResponse)
-def expired_token_page(request: Request):
-    return templates.TemplateResponse("expired_token.html", {"request": request})
-
-@router.get("/verification", response_class=HTMLResponse)
-def verification_page(request: Request):
-    return templates.TemplateResponse("re_verification.html", {"request": request})
-
-@router.get("/error_verification", response_class=HTMLResponse)
-def error_verification(request: Request):
-    return templates.TemplateResponse("error_verification.html", {"request": request})
\ No newline at end of file
+# Constant outcome pages, rendered once and served with an ETag
+static_pages.page(router, "/approved", "approved.html")
+static_pages.page(router, "/already_approved", "already_approved.html")
+static_pages.page(router, "/rejected", "rejected.html")
+static_pages.page(router, "/unfound", "not_found.html")
+static_pages.page(router, "/invalid_token", "invalid.html")
+static_pages.page(router, "/user_verified", "verified.html")
+static_pages.page(router, "/already_verified", "already_verified.html") # No template yet, answers 404 with a startup warning
+static_pages.page(router, "/user_unfound", "user_not_found.html") # No template yet, answers 404 with a startup warning
+static_pages.page(router, "/expired_token", "expired_token.html")
+static_pages.page(router, "/verification", "re_verification.html")
+static_pages.page(router, "/error_verification", "error_verification.html")
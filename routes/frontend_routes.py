@@ -5,6 +5,7 @@ from database.database import get_db, engine, Base # Imports database configurat
 from crud.operations import UserCRUD # Imports CRUD operations for database interaction
 from schemas.schemas import LoginRequest, RegisterRequest, LoginResponse, RegisterResponse, LogoutResponse, CreateUser # Imports schema models for request validation and response serialization
 from config.jwt_handler import JWTHandler # Imports JWT Handler Class for token creation and validation
+from config.token_revocation import revoked_tokens # Revokes login tokens at logout
 from config.pwd_handler import PWDHandler # Imports Password handler for strength validation and hashing
 from utilities.utils import AuditLogger
 
@@ -33,7 +34,7 @@ def api_login_route(login_data: LoginRequest,db: Session = Depends(get_db), requ
         return JSONResponse(status_code=401,content={"success": False, "message": "User account not verified. Please check your email for verification link.", "error_code": "USER_NOT_VERIFIED"}) # Returns error if user is not verified
     
     # Checks if password is correct
-    if not ucrud.confirm_password(db, password=login_data.password, email=login_data.email, user_type="client"):
+    if not ucrud.confirm_password(db, password=login_data.password, work_email=login_data.email, user_type="client"):
         return JSONResponse(status_code=401, content={"success": False, "message": "Incorrect password", "error_code": "INVALID_PASSWORD"}) # Returns error if password is incorrect
 
     # Generates JWT token for login
@@ -152,6 +153,7 @@ def api_logout_route(db: Session = Depends(get_db), request: Request = None):
         try:
             payload = JWTHandler.verify_login_token(token)
             user_id = payload.get("user_id")
+            revoked_tokens.revoke_payload(db, payload) # The token stops working even if a copy of the cookie survives
         except:
             pass
     AuditLogger.log_action(db=db, action="logout", resource_type="User", resource_id=user_id, user_id=user_id, admin_id=None, status="success", details={}, request=request) # Logs logoout
@@ -1,18 +1,28 @@
 # FastAPI Components to build the web app.
-from fastapi import APIRouter, Request, Form # Imports FastAPI , Request for handling HTTP requests & Form to accept data submitted via POST Requests
-from fastapi.responses import HTMLResponse, RedirectResponse, Response # Specifies that a route returns HTML
+from fastapi import APIRouter, Request, Form, Body, HTTPException # Imports FastAPI , Request for handling HTTP requests & Form to accept data submitted via POST Requests
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse # Specifies that a route returns HTML
+from fastapi.concurrency import run_in_threadpool # Runs the blocking Mongo reads off the event loop
 from fastapi.staticfiles import StaticFiles # Serves Static Files Like CSS, JS & Images
-from fastapi.templating import Jinja2Templates  # Imports Jinja2 template support
 
 # Utilities & Database Connection Classes
 from dotenv import load_dotenv # Loads secrets from .env.
-from pathlib import Path # Provides object-oriented file system paths
 from utilities.utils import AppUtils # Imports the data processing functions
 from database.database import SessionLocal, Base, engine, Co2 # Imports SQLAlchemy engine connected to the database, dependency function to provide DB Session and declarative Base for models to create tables
-from crud.local_operations import LocalCRUD
+from database.mongo_indexes import MongoIndexManager # Provisions the Mongo indexes
+from crud.tally_operations import Catalogue, TallyStore, STATION_COOKIE, STATION_IDLE_SECONDS, MAX_BATCH_OPERATIONS # Per-station tallies aligned to the shared catalogue
 from crud.mongo_operations import MongoCRUD
 from crud.sql_operations import SQLCRUD
+from crud.tally_journal import TallyJournal, TALLY_JOURNAL_ENABLED # Keeps station tallies across restarts
+from crud.archive_operations import SessionArchive # Archives sessions to Parquet before they are cleared
+from schemas.schemas import TallyDelta, TallyBatchResponse # Batched tally changes
+from typing import List # Typing support for the batch body
+from config.metrics import SESSIONS_SAVED # Counts exchange sessions saved
+from utilities.fragment_cache import FragmentCache, GLOBAL_STATS_MAX_AGE # Caches rendered HTMX partials
+from utilities.broadcaster import StatsBroadcaster # Pushes live global stats to open dashboards
+from utilities.ranking import ItemRanking # Keeps items ordered by exchanged count
 import os
+from config.templates import templates # Shared, bytecode-cached template environment
+from config.compression import no_compression # Keeps the live stream uncompressed
 
 # Creates tables using SQLAlchemy
 Base.metadata.create_all(bind=engine)
@@ -23,15 +33,17 @@ ENV = os.getenv("ENV", "dev")
 
 # Initializes FastAPI Web Application
 router = APIRouter()
-templates = Jinja2Templates(directory=Path(__file__).parent.parent/"templates")  # Sets up Jinja2Templates for dynamic HTML rendering from templates folder
+fragments = FragmentCache(templates) # Caches item, equivalents and global stats partials between clicks
+broadcaster = StatsBroadcaster() # Streams global stats to every open main page
 
 # Mongo DB Initialization
 mongo_client = Co2()
+mongo_indexes = MongoIndexManager(mongo_client.db) # Built at application startup
 
 # Initializes CRUD instances
-local = LocalCRUD()
 sql = SQLCRUD()
-mongo = MongoCRUD(co2=mongo_client.co2, sos=mongo_client.sos, logs=mongo_client.logs)
+mongo = MongoCRUD(co2=mongo_client.co2, sos=mongo_client.sos, logs=mongo_client.logs, items=mongo_client.items)
+archive = SessionArchive()
 
 # Loads items from the SQL Database
 with SessionLocal() as db:
@@ -41,111 +53,130 @@ with SessionLocal() as db:
 grouped_items = mongo.group_data_by_category(items)
 
 # Inserts Items into Mongo DB co2 Database if documents empty
-if mongo.co2.count_documents({}) == 0:
+if mongo.is_empty():
     mongo.send_to_mongo(grouped_items)
 
-items = grouped_items
+catalogue = Catalogue(grouped_items) # Shared index of item names and CO2 values
+tallies = TallyStore(catalogue) # One tally per volunteer station
+tally_journal = TallyJournal().attach(tallies) if TALLY_JOURNAL_ENABLED else None # Restored at application startup
+ranking = ItemRanking(catalogue).seed(mongo.get_item_totals()) # Item leaderboard, updated as sessions are saved
+
+# Function to resolve the station id and tally of the requesting browser
+def station_tally(request: Request):
+    return tallies.get(request.cookies.get(STATION_COOKIE))
+
+# Function to set the station cookie on every tally response, so its max_age slides with the server side idle eviction instead of expiring mid shift
+def with_station(request: Request, response, station_id: str):
+    response.set_cookie(key=STATION_COOKIE, value=station_id, httponly=True, secure=False, samesite="lax", max_age=STATION_IDLE_SECONDS, path="/UI")
+    return response
+
+# Function to return the item ranking, reloaded from Mongo once it may have missed sessions saved by other workers
+def item_ranking():
+    if ranking.stale():
+        ranking.seed(mongo.get_item_totals())
+    return ranking
+
+# Function to compute the cumulative totals, session count and items sorted by count from Mongo
+def load_global_stats():
+    totals, session_count = AppUtils.calculate_total(mongo.get_all_sessions()) # Cumulative totals and number of sessions
+    sorted_items = item_ranking().ordered() # Most used items first, already in order
+    return totals, session_count, sorted_items
+
+# Function to push fresh global stats to connected dashboards, computed once per change instead of once per screen
+def publish_global_stats():
+    if broadcaster.has_subscribers():
+        broadcaster.publish(*load_global_stats())
+    else:
+        broadcaster.invalidate() # Next screen to connect loads fresh stats
 
 # DEMO PAGE ROUTES
 # Route for the demopage ('/') that returns an HTML response displaying items
 @router.get("/", response_class=HTMLResponse)
 def demo(request: Request):
+    station_id, tally = station_tally(request)
+    total_co2 = tally.total() # Total CO2 saved by this station's tally
 
-    # Calculates the total CO2 emission based on item's counts and CO2 per item
-    total_co2 = sum(
-        (item.get('co2', 0))
-        for category in items
-        for item in category['items'])
-    
     equivalents = AppUtils.calculate_equivalents(total_co2)  # Calculates how mmuch C02 is equivalent to driving a car, riding a bus or flying in a plane using the AppUtils calculate session function
 
     context = {
         "env": ENV,
         "request": request, # Passes the request for Jinja2 to access
-        "items": items,  # Passes items data to be rendered
+        "items": tally.grouped(),  # Passes this station's items data to be rendered
         "equivalents": equivalents, # C02 equivalent in different modes of transport
         "total_co2": total_co2, # Total C02 emitted based on selected items
     }
     # Renders the response
     response = templates.TemplateResponse("demo.html", context)
-    return response 
+    return with_station(request, response, station_id)
 
 # Route to handle form submissions of incrementing & decrementing counts on demo page
 @router.post("/", response_class=HTMLResponse)
 def update_count(request: Request, action: str = Form(...), item_name: str = Form(...)): # request:Request accesses headers & cookies while the Form(...) tells FastAPI value must come from a form field
-    local.update_item_count(items, item_name, action)
-    return RedirectResponse(url="/", status_code=303) # Redirects back to homepage after form submission to display updated data & to prevent resubmission on refresh
+    station_id, tally = station_tally(request)
+    tally.update(item_name, action)
+    return with_station(request, RedirectResponse(url="/", status_code=303), station_id) # Redirects back to homepage after form submission to display updated data & to prevent resubmission on refresh
 
 # Route to handle form submissions of incrementing & decrementing counts on demo page without reloads
 @router.post("/hx-update", response_class=HTMLResponse)
 def update_item_hx(request: Request, action: str = Form(...), item_name: str = Form(...)):
-    global total_co2
-    local.update_item_count(items, item_name, action) # Updates the in-memory count and CO2
-
-    # Loops through all categories and items 
-    updated_item = None
-    for category in items:
-        for item in category['items']:
-            # Re-renders single item block as HTML once found
-            if item['name'] == item_name:
-                updated_item = item
-                break
-
+    station_id, tally = station_tally(request)
+    updated_item = tally.update(item_name, action) # Updates this station's count and returns the item
     if updated_item is None:
         return HTMLResponse(status_code=404, content="Item not found")
-    
-    total_co2 = sum(
-        (item.get('co2', 0))
-        for category in items
-        for item in category['items'])
-    
-    equivalents = AppUtils.calculate_equivalents(total_co2)
 
-    # Renders the updated item form partial
-    item_html = templates.get_template("partials/item.html").render({
-        "request": request,
+    total_co2 = tally.total()
+    total_bucket = round(total_co2, 2) # Fragments are keyed on the total as displayed
+
+    # Renders the updated item form partial unless this name and count were rendered before
+    item_html = fragments.render("partials/item.html", ("/UI/hx-update", updated_item["name"], updated_item["count"]), {
         "item": updated_item,
         "hx_post_url": "/UI/hx-update"
     })
 
-    # Renders the equivalents partial with OOB swap
-    equivalents_html = templates.get_template("partials/equivalents.html").render({
-        "request": request,
-        "total_co2": total_co2,
-        "equivalents": equivalents
+    # Renders the equivalents partial with OOB swap unless this total was rendered before
+    equivalents_html = fragments.render("partials/equivalents.html", (total_bucket,), lambda: {
+        "total_co2": total_bucket,
+        "equivalents": AppUtils.calculate_equivalents(total_bucket)
     })
     
     # Returns both concatenated
-    return HTMLResponse(content=item_html + equivalents_html)
+    return with_station(request, HTMLResponse(content=item_html + equivalents_html), station_id)
 
 # Route to reset all items locally
 @router.post("/reset", response_class=HTMLResponse)
 def renew(request: Request):
-    local.reset_items(items)
-    return RedirectResponse(url="/UI/", status_code=303) # Redirects back to demo page
+    station_id, tally = station_tally(request)
+    tally.reset()
+    return with_station(request, RedirectResponse(url="/UI/", status_code=303), station_id) # Redirects back to demo page
+
+# Route applying a JSON list of {item, delta} changes to the station's tally in one step, for scanner kiosks and debounced front ends
+@router.post("/tally/batch", response_model=TallyBatchResponse)
+def apply_tally_batch(request: Request, operations: List[TallyDelta] = Body(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)):
+    station_id, tally = station_tally(request)
+    try:
+        items = tally.apply([(operation.item, operation.delta) for operation in operations]) # All or nothing
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail={"message": "Unknown items, nothing was counted", "items": e.args[0]})
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    total_co2 = tally.total()
+    result = TallyBatchResponse(items=[{"name": item["name"], "count": item["count"], "co2": item["co2"]} for item in items], total_co2=total_co2, equivalents=AppUtils.calculate_equivalents(total_co2))
+    return with_station(request, JSONResponse(content=result.model_dump()), station_id)
 
 # MAIN PAGE ROUTES 
 # Route for the homepage ('/main') that returns an HTML response displaying items
 @router.get("/main", response_class=HTMLResponse)
 def main(request: Request):
+    station_id, tally = station_tally(request)
+    total_co2 = tally.total() # Total CO2 saved by this station's tally
 
-    global total_co2
-
-    # Calculates the total CO2 emission based on item's counts and CO2 per item
-    total_co2 = sum(
-        (item.get('co2', 0))
-        for category in items
-        for item in category['items'])
-    
     equivalents = AppUtils.calculate_equivalents(total_co2)  # Calculates how mmuch C02 is equivalent to driving a car, riding a bus or flying in a plane using the AppUtils calculate session function
-    totals, session_count = AppUtils.calculate_total(mongo.get_all_sessions()) # Gets All Sessions Function loops through all stored sessions in the Database, then passes them to AppUtils, calculates total function to calculate cumulative totals and number of sessions
-    updated_items = mongo.get_updated_items() # Fetches the latest items data from the MongoDB database
-    rearranged_items = AppUtils.rearrange_updated_items(updated_items)  # Single Lists MongoDB items
-    sorted_items = AppUtils.sort_updated_items(rearranged_items) # Sorts items by 'count' in descending order with most used items coming first
+    totals, session_count, sorted_items = load_global_stats() # Cumulative totals, number of sessions and items sorted by count
 
     context = {
         "request": request, # Passes the request for Jinja2 to access
-        "items": items,  # Passes items data to be rendered
+        "items": tally.grouped(),  # Passes this station's items data to be rendered
         "equivalents": equivalents, # C02 equivalent in different modes of transport
         "total_co2": total_co2, # Total C02 emitted based on selected items
         "totals": totals, # Cumulative totals of all sessions
@@ -153,92 +184,94 @@ def main(request: Request):
         "sorted_items": sorted_items, # Sorted list of updated items for display
     }
     # Renders the response
-    return templates.TemplateResponse("main.html", context)
+    return with_station(request, templates.TemplateResponse("main.html", context), station_id)
+
+# Route streaming global stats to the main page as server-sent events whenever a session is saved or cleared
+@router.get("/main/stream")
+@no_compression
+async def stream_global_stats(request: Request):
+    events = broadcaster.subscribe(request, lambda: run_in_threadpool(load_global_stats))
+    return StreamingResponse(events, media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache", # Every event must reach the browser
+        "X-Accel-Buffering": "no", # Stops nginx from buffering the stream
+    })
 
 # Route to handle form submissions of incrementing & decrementing counts
 @router.post("/main", response_class=HTMLResponse)
 def updatee_count(request: Request, action: str = Form(...), item_name: str = Form(...)): # request:Request accesses headers & cookies while the Form(...) tells FastAPI value must come from a form field
-    local.update_item_count(items, item_name, action)
-    return RedirectResponse(url="main", status_code=303)  # Redirects back to homepage after form submission to display updated data & to prevent resubission on refresh
+    station_id, tally = station_tally(request)
+    tally.update(item_name, action)
+    return with_station(request, RedirectResponse(url="main", status_code=303), station_id)  # Redirects back to homepage after form submission to display updated data & to prevent resubission on refresh
 
 # Route to handle form submissions of incrementing & decrementing counts on demo page without reloads
 @router.post("/main/hx-updatee", response_class=HTMLResponse)
 def updatee_item_hx(request: Request, action: str = Form(...), item_name: str = Form(...)):
-    global total_co2 
-
-    local.update_item_count(items, item_name, action) # Updates the in-memory count and CO2
-
-    # Loops through all categories and items 
-    updated_item = None
-    for category in items:
-        for item in category['items']:
-            # Re-renders single item block as HTML once found
-            if item['name'] == item_name:
-                updated_item = item
-                break
+    station_id, tally = station_tally(request)
+    updated_item = tally.update(item_name, action) # Updates this station's count and returns the item
     if updated_item is None:
         return HTMLResponse(status_code=404, content="Item not found")
-    
+
     # Recalculates derived stats
-    total_co2 = sum(
-        (item.get('co2', 0))
-        for category in items
-        for item in category['items'])
-    
-     
-    equivalents = AppUtils.calculate_equivalents(total_co2)  # Calculates how mmuch C02 is equivalent to driving a car, riding a bus or flying in a plane using the AppUtils calculate session function
-    totals, session_count = AppUtils.calculate_total(mongo.get_all_sessions()) # Gets All Sessions Function loops through all stored sessions in the Database, then passes them to AppUtils, calculates total function to calculate cumulative totals and number of sessions
-    updated_items = mongo.get_updated_items() # Fetches the latest items data from the MongoDB database
-    rearranged_items = AppUtils.rearrange_updated_items(updated_items)  # Single Lists MongoDB items
-    sorted_items = AppUtils.sort_updated_items(rearranged_items) # Sorts items by 'count' in descending order with most used items coming first
+    total_co2 = tally.total()
+    total_bucket = round(total_co2, 2) # Fragments are keyed on the total as displayed
+
+    # Renders the updated item form partial unless this name and count were rendered before
+    item_html = fragments.render("partials/item.html", ("/UI/main/hx-updatee", updated_item["name"], updated_item["count"]), {
+        "item": updated_item,
+        "hx_post_url": "/UI/main/hx-updatee"
+    })
+
+    # Renders the personal savings partial unless this total was rendered before
+    personalization_html = fragments.render("partials/personalization.html", (total_bucket,), lambda: {
+        "total_co2": total_bucket,
+        "equivalents": AppUtils.calculate_equivalents(total_bucket)  # Calculates how mmuch C02 is equivalent to driving a car, riding a bus or flying in a plane using the AppUtils calculate session function
+    })
+
+    # Renders the global stats partial only after a session was saved or cleared, Mongo is only read on a miss
+    global_stats_html = fragments.render("partials/global_stats.html", (fragments.version("global_stats"),), lambda: {
+        "totals": AppUtils.calculate_total(mongo.get_all_sessions())[0] # Cumulative totals of all stored sessions
+    }, max_age=GLOBAL_STATS_MAX_AGE)
     
-    return templates.TemplateResponse("partials/item_update_response.html", {
+    response = templates.TemplateResponse("partials/item_update_response.html", {
             "request": request,
-            "item": updated_item,
-            "total_co2": total_co2,
-            "equivalents": equivalents,
-            "totals": totals,
-            "session_count": session_count,
-            "sorted_items": sorted_items,
-            "hx_post_url": "/UI/main/hx-updatee"
+            "item_html": item_html,
+            "personalization_html": personalization_html,
+            "global_stats_html": global_stats_html,
         })
+    return with_station(request, response, station_id)
 
 # Route to save items data to database and reset all items locally
 @router.post("/main/reset", response_class=HTMLResponse)
 def renew(request: Request):
-    # Saves all items data from session to database before resetting
+    station_id, tally = station_tally(request)
+
+    # Saves this station's items data to database before resetting
     try:
-        exc_items = {} 
-
-        # Update items and collects exchanged items
-        for category in items:
-            for item in category['items']:
-                if item.get('count', 0) > 0 or item.get('co2', 0) > 0: # Tries to get 'CO2', if it doesn't exist, it returns 0 instead , to prevent crashes
-                    mongo.update_item(category["category"], item["name"], item['count'], item['co2']) # Updates items count and CO2 by category using the MongoCO2 class defined function
-                    
-                    # Ensures a list exists for each category
-                    if category['category'] not in exc_items:
-                        exc_items[category["category"]] = []
-                    
-                    exc_items[category["category"]].append({
-                        "name": item["name"],
-                        "count": item["count"],
-                        "co2": item["co2"]
-                    })
+        exc_items = tally.exchanged() # Counted items grouped by category
+
+        # Adds each exchanged item's count and CO2 to the database totals
+        for category, exchanged in exc_items.items():
+            for item in exchanged:
+                mongo.update_item(category, item["name"], item['count'], item['co2']) # Updates items count and CO2 by category using the MongoCO2 class defined function
+                ranking.add(item["name"], item['count'], item['co2']) # Moves the item up the leaderboard
 
         # Inserts session data if any CO2 was saved
+        total_co2 = tally.total()
         if total_co2 > 0:
             equivalents = AppUtils.calculate_equivalents(total_co2)  # Calculates how much C02 is equivalent to driving a car, riding a bus or flying in a plane using the AppUtils calculate session function
             mongo.insert_session(total_co2, equivalents, exc_items) # Inserts exchanged items and sessions for a participant
+            SESSIONS_SAVED.inc()
+            fragments.bump("global_stats") # Cumulative totals changed
+            publish_global_stats()
 
-        # Resets locally displayed items
-        local.reset_items(items)
+        # Resets this station's tally
+        tally.reset()
 
     except Exception as e:
         print(f"Error in /reset: {e}")
         raise e
     
-    return RedirectResponse(url="/UI/main", status_code=303) # Redirects back to mainpage
+    return with_station(request, RedirectResponse(url="/UI/main", status_code=303), station_id) # Redirects back to mainpage
 
 
 # Route to save events data to database and reset all items locally
@@ -246,16 +279,19 @@ def renew(request: Request):
 def logout(request: Request):
 
     # Checks if there were actual calculations during sessions
-    totals, session_count = AppUtils.calculate_total(mongo.get_all_sessions()) # Gets All Sessions Function loops through all stored sessions in the Database, then passes them to AppUtils, calculates total function to calculate cumulative totals and number of sessions
+    sessions = mongo.get_all_sessions() # Read once for the totals and the archive
+    totals, session_count = AppUtils.calculate_total(sessions) # Gets All Sessions Function loops through all stored sessions in the Database, then passes them to AppUtils, calculates total function to calculate cumulative totals and number of sessions
 
     # If data was exchanged during the event, then its collected and saved into the logs event collection
     if session_count > 0:
-        updated_items = mongo.get_updated_items() # Fetches the latest items data from the MongoDB database
-        rearranged_items = AppUtils.rearrange_updated_items(updated_items)  # Single Lists MongoDB items
-        sorted_items = AppUtils.sort_updated_items(rearranged_items) # Sorts items by 'count' in descending order with most used items coming first
+        sorted_items = ranking.seed(mongo.get_item_totals()).ordered() # Reloaded so the event log holds every worker's counts, most used items first
+        archive.archive_event(sessions) # Raises before anything is deleted if the archive can't be written
         mongo.log_out(sessions=session_count, sorted_items=sorted_items, total=totals)
-        mongo.reset_counts(items) # Resets items database count 
-        mongo.clear_sessions() # Deletes all documents inside the sessions collection
+        mongo.reset_counts(catalogue.grouped()) # Resets items database count 
+        ranking.reset()
+        mongo.clear_sessions([session["_id"] for session in sessions]) # Deletes only the archived sessions, ones saved since the read stay for the next event
+        fragments.bump("global_stats") # Cumulative totals were reset
+        publish_global_stats()
 
     # Prepares redirect response 
     return RedirectResponse(url="/api", status_code=303) 
@@ -265,11 +301,15 @@ def logout(request: Request):
 # Route to reset item counts in database to zero
 @router.get("/main/reset_DBS", response_class=HTMLResponse)
 def reset_count(request: Request):
-    mongo.reset_counts(items)
+    mongo.reset_counts(catalogue.grouped())
+    ranking.reset()
+    publish_global_stats()
     return RedirectResponse(url="/UI/main", status_code=303) # Redirects back to homepage after resetting counts
 
 # Route to clear all exchange sessions from the database
 @router.get("/main/clear_SOS", response_class=HTMLResponse)
 def clear_sessions(request: Request):
     mongo.clear_sessions() # Deletes all documents inside the sessions collection
+    fragments.bump("global_stats") # Cumulative totals were reset
+    publish_global_stats()
     return RedirectResponse(url="/UI/main", status_code=303) # Redirects back to homepage after clearing sessions
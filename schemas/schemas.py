@@ -2,6 +2,8 @@ from pydantic import BaseModel, ConfigDict, EmailStr, Field # Imports BaseModel
 from typing import  Optional, List, Dict, Any # Imported to give typing support
 from datetime import datetime # Imports datetime to handle date & time fields
 
+MAX_ADMIN_REVIEW = 200 # Longest approve or reject list of one bulk review
+
 # USER SCHEMAS
 # Creates a class that inherits from BaseModel and determines the user model ensuring required fields of name and email are included and valid.
 class AdminUser(BaseModel):
@@ -101,6 +103,53 @@ LoginResponse = AuthResponse
 RegisterResponse = AuthResponse
 LogoutResponse = AuthResponse 
 
+# BULK OPERATION SCHEMAS
+# Creates a class that inherits from BaseModel holding the projected columns of a deleted account
+class DeletedAccount(BaseModel):
+    id: int # ID of the deleted account
+    email: str # Email of the deleted account
+
+# Creates a class that inherits from BaseModel summarising a set-based deletion
+class BulkDeleteSummary(BaseModel):
+    deleted: int # Number of deleted rows
+    users: List[DeletedAccount] = [] # Projected id and email of every deleted row
+
+# Creates a class that inherits from BaseModel listing pending admin users to approve or reject in one request
+class AdminReviewRequest(BaseModel):
+    approve: List[EmailStr] = Field(default=[], max_length=MAX_ADMIN_REVIEW) # Emails of admins to approve and send credentials to
+    reject: List[EmailStr] = Field(default=[], max_length=MAX_ADMIN_REVIEW) # Emails of admins to delete
+
+# Creates a class that inherits from BaseModel holding the outcome for one email of a review
+class AdminReviewResult(BaseModel):
+    email: str # Email as listed in the request
+    status: str # approved, rejected, not_found, already_verified, email_failed or conflict
+    detail: Optional[str] = None # Why the email wasn't approved or rejected
+
+# Creates a class that inherits from BaseModel summarising a bulk review
+class AdminReviewReport(BaseModel):
+    approved: int # Admins verified and sent their credentials
+    rejected: int # Pending admins deleted
+    failed: int # Emails left unchanged
+    results: List[AdminReviewResult] # One result per email, in request order
+
+# TALLY SCHEMAS
+# Creates a class that inherits from BaseModel holding one change to a station's tally
+class TallyDelta(BaseModel):
+    item: str = Field(..., min_length=1) # Item name as listed in the catalogue
+    delta: int = Field(..., ge=-1000, le=1000) # Positive counts up, negative counts down, stops at zero
+
+# Creates a class that inherits from BaseModel holding one item of a station's tally after a batch
+class TallyItemCount(BaseModel):
+    name: str # Item name
+    count: int # New count at this station
+    co2: float # CO2 saved by this item's count
+
+# Creates a class that inherits from BaseModel returning the result of a batch of tally changes
+class TallyBatchResponse(BaseModel):
+    items: List[TallyItemCount] # Items touched by the batch, in the order first touched
+    total_co2: float # CO2 saved by the station's whole tally
+    equivalents: Dict[str, float] # Total as car, plane and bus kilometres
+
 # AUDIT LOG SCHEMAS
 # Creates a class that inherits from BaseModel and determines the audit log model ensuring required fields are included and valid.
 class AuditLogBase(BaseModel):
@@ -0,0 +1,61 @@
+// <!-- Live Global Stats Script -->
+
+document.addEventListener("DOMContentLoaded", function () {
+    if (!window.EventSource) return; // Older browsers keep the stats rendered with the page
+
+    const itemsByName = new Map(); // Latest count and CO2 of every exchanged item
+
+    // Builds one leaderboard row matching the server rendered markup
+    function row(name, value, rowClass, buttonClass) {
+        const div = document.createElement("div");
+        div.className = rowClass;
+        const label = document.createElement("button");
+        label.className = buttonClass;
+        label.textContent = name;
+        const spacer = document.createElement("div");
+        spacer.className = "flex-grow-1 text-center";
+        spacer.style.whiteSpace = "nowrap";
+        const amount = document.createElement("button");
+        amount.className = buttonClass;
+        amount.textContent = value;
+        div.append(document.createElement("br"), label, spacer, amount);
+        return div;
+    }
+
+    // Writes totals, session count and both leaderboards
+    function render(data) {
+        const totals = document.getElementById("global-stats");
+        for (const [key, value] of Object.entries(data.totals)) {
+            const cell = totals && totals.querySelector(`[data-total="${key}"]`);
+            if (cell) cell.textContent = value;
+        }
+
+        const count = document.getElementById("session-count");
+        if (count) count.textContent = data.session_count;
+
+        const top = document.getElementById("top-items");
+        if (top) top.replaceChildren(...data.top.map(item =>
+            row(item.name, item.count, "d-flex align-items-center text-success justify-content-center rounded shadow-sm", "btn btn-outline btn-sm text-success")));
+
+        const all = document.getElementById("all-items");
+        if (all) all.replaceChildren(...[...itemsByName.values()].sort((a, b) => b.count - a.count).map(item =>
+            row(item.name, item.co2, "d-flex align-items-center justify-content-center gap-1 bg-white rounded shadow-sm mb-2", "btn btn-outline btn-sm")));
+    }
+
+    const source = new EventSource("/UI/main/stream");
+
+    // Full stats sent once on connect
+    source.addEventListener("snapshot", function (event) {
+        const data = JSON.parse(event.data);
+        itemsByName.clear();
+        data.sorted_items.forEach(item => itemsByName.set(item.name, item));
+        render(data);
+    });
+
+    // Totals plus only the items that changed since the previous update
+    source.addEventListener("delta", function (event) {
+        const data = JSON.parse(event.data);
+        data.changed.forEach(item => itemsByName.set(item.name, item));
+        render(data);
+    });
+});
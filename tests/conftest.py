@@ -0,0 +1,8 @@
+import pytest # Testing framework to define and run test functions
+
+# Pytest fixture provides a client for the whole app wired to a throwaway SQLite database and mongomock, built once per run
+@pytest.fixture(scope="session")
+def app_client():
+    from fastapi.testclient import TestClient # Simulates requests to the app
+    from benchmarks.harness import build_app # Same wiring as the benchmarks
+    return TestClient(build_app())
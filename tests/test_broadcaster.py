@@ -0,0 +1,93 @@
+import asyncio # Runs the subscribers on a real event loop
+import json # Reads the event payloads
+import threading # Publishes from another thread like the threadpool routes
+from utilities.broadcaster import StatsBroadcaster, SUBSCRIBER_QUEUE_SIZE # Class under test
+
+TOTALS = {"ingesamt": 10.0}
+ITEMS = [{"name": "Hemd", "count": 2, "co2": 5.0}, {"name": "Pulli", "count": 1, "co2": 4.0}]
+
+# Stub request whose disconnect flag the test controls
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+# Function to split a server-sent event into its name and payload
+def parse_event(message: str):
+    event, data = message.strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+# Test to verify subscribers get the snapshot first, loaded once for all of them
+def test_subscribe_sends_snapshot_first():
+    async def scenario():
+        broadcaster = StatsBroadcaster(top_n=1)
+        loads = []
+        async def load_snapshot():
+            loads.append(1)
+            return TOTALS, 2, ITEMS
+
+        streams = [broadcaster.subscribe(FakeRequest(), load_snapshot) for _ in range(2)]
+        events = [parse_event(await anext(stream)) for stream in streams]
+        for stream in streams:
+            await stream.aclose()
+        return events, loads, broadcaster
+
+    events, loads, broadcaster = asyncio.run(scenario())
+    assert [event for event, _ in events] == ["snapshot", "snapshot"]
+    assert events[0][1]["top"] == ITEMS[:1] and events[0][1]["session_count"] == 2
+    assert len(loads) == 1
+    assert not broadcaster.has_subscribers()
+
+# Test to verify a publish from another thread reaches the subscriber as a delta of the changed items only
+def test_publish_from_thread_sends_delta():
+    async def scenario():
+        broadcaster = StatsBroadcaster()
+        async def load_snapshot():
+            return TOTALS, 2, ITEMS
+
+        stream = broadcaster.subscribe(FakeRequest(), load_snapshot)
+        await anext(stream) # Snapshot, the loop is captured from here on
+        changed_items = [{"name": "Hemd", "count": 3, "co2": 7.5}, ITEMS[1]]
+        publisher = threading.Thread(target=broadcaster.publish, args=({"ingesamt": 12.5}, 3, changed_items))
+        publisher.start()
+        publisher.join()
+        message = await asyncio.wait_for(anext(stream), timeout=5)
+        await stream.aclose()
+        return parse_event(message)
+
+    event, payload = asyncio.run(scenario())
+    assert event == "delta"
+    assert payload["changed"] == [{"name": "Hemd", "count": 3, "co2": 7.5}]
+    assert payload["session_count"] == 3 and payload["totals"] == {"ingesamt": 12.5}
+
+# Test to verify a full queue drops its oldest update instead of raising QueueFull
+def test_full_queue_drops_oldest():
+    broadcaster = StatsBroadcaster()
+    queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    broadcaster.subscribers.add(queue)
+    for index in range(SUBSCRIBER_QUEUE_SIZE + 2):
+        broadcaster.fanout(f"update {index}")
+    assert queue.qsize() == SUBSCRIBER_QUEUE_SIZE
+    assert queue.get_nowait() == "update 2"
+
+# Test to verify a disconnected screen's queue is removed from the subscribers
+def test_disconnect_removes_subscriber():
+    async def scenario():
+        broadcaster = StatsBroadcaster()
+        request = FakeRequest()
+        async def load_snapshot():
+            return TOTALS, 2, ITEMS
+
+        stream = broadcaster.subscribe(request, load_snapshot)
+        await anext(stream)
+        subscribed = broadcaster.has_subscribers()
+        request.disconnected = True
+        remaining = [message async for message in stream] # Ends once the disconnect is noticed
+        return subscribed, remaining, broadcaster.subscribers
+
+    subscribed, remaining, subscribers = asyncio.run(scenario())
+    assert subscribed
+    assert remaining == []
+    assert subscribers == set()
@@ -0,0 +1,137 @@
+import pytest # Testing framework to define and run test functions
+from datetime import datetime, timedelta # Used to create stale accounts
+from sqlalchemy import create_engine # SQLAlchemy function to create a connection to a test database
+from sqlalchemy.orm import sessionmaker # A factory for creating database session instances
+from database.database import Base # Imports Base class from database to define ORM models
+from models.models import Admin, AuditLog, Item, Category # Imports ORM models used to seed and inspect the database
+from crud.operations import AdminUserCRUD, CatalogueCRUD # Imports the admin and catalogue CRUD classes
+from config.mail_handler import EmailHandler # Batched credentials sender, replaced so no mail leaves the test
+from utilities.utils import CatalogueUtils # Imports catalogue parsing and serialisation helpers
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:" # In-memory SQLite database reset after each test run
+engine = create_engine(SQLALCHEMY_DATABASE_URL) # Creates database engine using SQLite
+TestingSessionLocal = sessionmaker(bind=engine) # Binds the engine to create session instances for testing
+Base.metadata.create_all(bind=engine) # Creates all database tables based on the models
+
+# Pytest fixture provides a fresh database session for each test function and clears tables afterwards
+@pytest.fixture
+def db_session():
+    session = TestingSessionLocal() # Creates a new database session
+    try:
+        yield session # Provides the session to the test
+    finally:
+        session.query(AuditLog).delete() # Cleans up audit rows
+        session.query(Admin).delete() # Cleans up admins
+        session.query(Item).delete() # Cleans up items
+        session.query(Category).delete() # Cleans up categories
+        session.commit()
+        session.close() # Ensures the session is closed after the request
+
+# Helper that seeds an admin with one audit log row
+def add_admin(db, email, is_verified=False, created_at=None):
+    admin = Admin(first_name="Test", last_name="Admin", email=email, is_verified=is_verified, created_at=created_at or datetime.utcnow())
+    db.add(admin)
+    db.flush()
+    db.add(AuditLog(action="login", admin_id=admin.id))
+    db.commit()
+    return admin
+
+# Test to verify all admins are deleted in one statement and their audit logs are removed by the database cascade
+def test_delete_admin_users_returns_summary_and_cascades(db_session):
+    add_admin(db_session, "a@example.com")
+    add_admin(db_session, "b@example.com", is_verified=True)
+
+    summary = AdminUserCRUD().delete_admin_users(db_session)
+
+    assert summary["deleted"] == 2 # Both admins were removed
+    assert sorted(user["email"] for user in summary["users"]) == ["a@example.com", "b@example.com"] # Projection holds the emails
+    assert db_session.query(Admin).count() == 0 # No admins left
+    assert db_session.query(AuditLog).filter(AuditLog.admin_id.isnot(None)).count() == 0 # Linked audit rows were cascaded
+
+# Test to verify only stale unverified admins are removed when filters are given
+def test_delete_admin_users_filters_stale_unverified(db_session):
+    old = datetime.utcnow() - timedelta(days=30)
+    add_admin(db_session, "stale@example.com", created_at=old)
+    add_admin(db_session, "fresh@example.com")
+    add_admin(db_session, "verified@example.com", is_verified=True, created_at=old)
+
+    summary = AdminUserCRUD().delete_admin_users(db_session, unverified_only=True, created_before=datetime.utcnow() - timedelta(days=7))
+
+    assert summary["deleted"] == 1 # Only the stale pending admin matched
+    assert summary["users"][0]["email"] == "stale@example.com"
+    assert db_session.query(Admin).count() == 2 # The other two admins remain
+
+# Test to verify a CSV catalogue is upserted and an existing item keeps its count while taking the new CO2 value
+def test_import_catalogue_upserts_items(db_session):
+    category = Category(name="OBERTEILE")
+    db_session.add(Item(name="T-Shirt", base_co2=1.0, count=3, category=category))
+    db_session.commit()
+
+    csv_file = b"category,description,name,base_co2\nOBERTEILE,Tops,T-Shirt,2.5\nOBERTEILE,,Pullover,4.0\nJACKEN,Jackets,,\n"
+    categories, items = CatalogueUtils.parse(csv_file, "csv")
+    summary = CatalogueCRUD().import_catalogue(db_session, categories, items)
+
+    assert summary == {"categories": 2, "items": 2} # OBERTEILE and JACKEN, T-Shirt and Pullover
+    shirt = db_session.query(Item).filter(Item.name == "T-Shirt").one()
+    db_session.refresh(shirt)
+    assert shirt.base_co2 == 2.5 # Base CO2 was updated
+    assert shirt.count == 3 # Existing count was kept
+    assert db_session.query(Category).filter(Category.name == "OBERTEILE").one().description == "Tops" # Description was filled in
+    assert db_session.query(Category).filter(Category.name == "JACKEN").count() == 1 # Category without items was created
+
+# Test to verify the JSON export can be imported again unchanged
+def test_export_round_trips_through_import(db_session):
+    payload = b'{"categories": [{"name": "JACKEN", "description": "Jackets"}], "items": [{"name": "Mantel", "base_co2": 9.5, "category_name": "JACKEN"}]}'
+    CatalogueCRUD().import_catalogue(db_session, *CatalogueUtils.parse(payload, "json"))
+
+    exported = "".join(CatalogueUtils.export(CatalogueCRUD().iter_catalogue(db_session), "json"))
+    categories, items = CatalogueUtils.parse(exported.encode(), "json")
+
+    assert [(c.name, c.description) for c in categories] == [("JACKEN", "Jackets")]
+    assert [(i.name, i.base_co2, i.category_name) for i in items] == [("Mantel", 9.5, "JACKEN")]
+
+# Test to verify a bulk review approves, rejects and reports every email in one commit, leaving admins whose email failed pending
+def test_review_admin_users_reports_each_email(db_session, monkeypatch):
+    for email in ("ok@example.com", "bounce@example.com", "no@example.com", "both@example.com"):
+        add_admin(db_session, email)
+    add_admin(db_session, "done@example.com", is_verified=True)
+    sent = []
+    monkeypatch.setattr(EmailHandler, "send_credentials_batch", lambda recipients: sent.extend(recipients) or {email: "Recipient refused" if email.startswith("bounce") else None for _, email, _ in recipients})
+
+    report = AdminUserCRUD().review_admin_users(db_session, approve=["ok@example.com", "bounce@example.com", "done@example.com", "both@example.com", "ghost@example.com"], reject=["no@example.com", "both@example.com"])
+
+    statuses = {row["email"]: row["status"] for row in report["results"]}
+    assert statuses == {"ok@example.com": "approved", "bounce@example.com": "email_failed", "done@example.com": "already_verified", "both@example.com": "conflict", "ghost@example.com": "not_found", "no@example.com": "rejected"}
+    assert (report["approved"], report["rejected"], report["failed"]) == (1, 1, 4)
+    assert [email for _, email, _ in sent] == ["ok@example.com", "bounce@example.com"] # One batch for every approval
+
+    db_session.expire_all()
+    admins = {admin.email: admin for admin in db_session.query(Admin)}
+    assert admins["ok@example.com"].is_verified and admins["ok@example.com"].password.startswith("$2")
+    assert not admins["bounce@example.com"].is_verified
+    assert "no@example.com" not in admins
+
+# Test to verify large JSON exports are sent in several chunks rather than built as one document
+def test_json_export_streams_in_chunks():
+    rows = [("OBERTEILE", "Tops", f"Item {index}", 1.5) for index in range(5000)] + [("JACKEN", None, None, None)]
+    chunks = list(CatalogueUtils.export(iter(rows), "json"))
+    categories, items = CatalogueUtils.parse("".join(chunks).encode(), "json")
+
+    assert len(chunks) > 1
+    assert [(c.name, c.description) for c in categories] == [("OBERTEILE", "Tops"), ("JACKEN", None)]
+    assert len(items) == 5000 and items[0].name == "Item 0"
+
+# Test to verify the bulk review endpoint turns away callers without a verified admin login
+def test_review_endpoint_requires_admin_login(app_client, monkeypatch):
+    import database.database as database # Harness database behind the app client
+    import config.jwt_handler as jwt_handler # Issues the same cookie as /admin/login
+    monkeypatch.setattr(jwt_handler, "JWT_SECRET", "test-secret") # No .env secret in the test run
+    with database.SessionLocal() as db:
+        admin = add_admin(db, "reviewer@example.com", is_verified=True)
+        token = jwt_handler.JWTHandler.create_login_token(email=admin.email, user_id=admin.id, first_name=admin.first_name, last_name=admin.last_name)
+    review = {"approve": ["ghost@example.com"], "reject": []}
+
+    assert app_client.post("/api/admin_users/review", json=review).status_code == 401 # No cookie
+    response = app_client.post("/api/admin_users/review", json=review, headers={"Cookie": f"access_token={token}"})
+    assert response.status_code == 200
+    assert [(row["email"], row["status"]) for row in response.json()["results"]] == [("ghost@example.com", "not_found")] # Nothing was sent or changed
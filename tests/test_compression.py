@@ -0,0 +1,80 @@
+import gzip # Decodes the compressed bodies
+import pytest # Testing framework to define and run test functions
+from fastapi import FastAPI # Minimal app wrapped by the middleware
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse # Response types under test
+from fastapi.testclient import TestClient # Simulates requests to the app
+from config.compression import CompressionMiddleware, negotiate, no_compression # Middleware under test
+
+PAGE = "<div class='item'>Hemd</div>\n" * 200 # Repetitive HTML like the rendered item lists
+
+# Test app with one route per kind of response
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+@app.get("/page", response_class=HTMLResponse)
+def page():
+    return PAGE
+
+@app.get("/small")
+def small():
+    return PlainTextResponse("ok")
+
+@app.get("/rows")
+def rows():
+    return StreamingResponse((f"row {index}\n" for index in range(2000)), media_type="text/csv")
+
+@app.get("/events")
+def events():
+    return StreamingResponse(iter(["data: 1\n\n", "data: 2\n\n"]), media_type="text/event-stream")
+
+@app.get("/raw", response_class=HTMLResponse)
+@no_compression
+def raw():
+    return PAGE
+
+# Pytest fixture provides a client for the compressed test app
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+# Test to verify negotiation prefers brotli, respects q values and refuses identity only clients
+def test_negotiate():
+    assert negotiate("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert negotiate("*;q=0.1", ["br", "gzip"]) == "br"
+    assert negotiate("identity", ["br", "gzip"]) is None
+    assert negotiate("gzip;q=0", ["gzip"]) is None
+
+# Test to verify complete responses above the threshold are compressed with a correct length, small ones are left alone
+def test_compresses_pages_above_threshold(client):
+    response = client.get("/page", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == PAGE
+    assert int(response.headers["content-length"]) < len(PAGE) // 10
+
+    assert "content-encoding" not in client.get("/small", headers={"accept-encoding": "gzip"}).headers
+
+# Test to verify streamed responses are compressed chunk by chunk into one valid gzip stream
+def test_streams_compressed_chunks(client):
+    with client.stream("GET", "/rows", headers={"accept-encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        body = b"".join(response.iter_raw())
+    assert gzip.decompress(body).decode().count("\n") == 2000
+
+# Test to verify event streams and opted out endpoints are never compressed
+def test_skips_event_streams_and_opted_out_routes(client):
+    assert "content-encoding" not in client.get("/events", headers={"accept-encoding": "gzip"}).headers
+    response = client.get("/raw", headers={"accept-encoding": "gzip, br"})
+    assert "content-encoding" not in response.headers
+    assert response.text == PAGE
+
+# Test to verify HTMX fragment requests are passed through unless COMPRESS_HTMX is on
+def test_skips_htmx_fragments(client):
+    response = client.get("/page", headers={"accept-encoding": "gzip", "hx-request": "true"})
+    assert "content-encoding" not in response.headers
+    assert response.text == PAGE
+
+    htmx_client = TestClient(CompressionMiddleware(app, minimum_size=500, compress_htmx=True))
+    assert htmx_client.get("/page", headers={"accept-encoding": "gzip", "hx-request": "true"}).headers["content-encoding"] == "gzip"
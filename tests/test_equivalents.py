@@ -0,0 +1,19 @@
+from utilities.utils import AppUtils # Utilities under test
+
+# Tests that the batch equivalents match the scalar calculation
+def test_batch_equivalents_match_scalar():
+    totals = [0.0, 1.5, 12.34]
+    batch = AppUtils.batch_equivalents(totals)
+
+    for position, total in enumerate(totals):
+        assert {mode: float(values[position]) for mode, values in batch.items()} == AppUtils.calculate_equivalents(total)
+
+# Tests cumulative sums and totals over stored session documents
+def test_totals_over_sessions():
+    equivalents, cumulative = AppUtils.batch_totals([2.0, 3.0])
+    sessions = [{"session": [{"ingesamt": 2.0, **AppUtils.calculate_equivalents(2.0)}]}, {"session": [{"ingesamt": 3.0, **AppUtils.calculate_equivalents(3.0)}]}]
+
+    assert cumulative["ingesamt"].tolist() == [2.0, 5.0]
+    assert cumulative["wiebus"][-1] == AppUtils.calculate_equivalents(5.0)["wiebus"]
+    assert AppUtils.calculate_total(sessions) == ({"ingesamt": 5.0, **{mode: round(float(values.sum()), 2) for mode, values in equivalents.items()}}, 2)
+    assert AppUtils.calculate_total([]) == ({"ingesamt": 0.0, "wieauto": 0.0, "wieflugzeug": 0.0, "wiebus": 0.0}, 0)
@@ -0,0 +1,15 @@
+import json # Parses the streamed JSON export
+from utilities.utils import ExportUtils # Utility under test
+
+# Tests that large exports are streamed in bounded chunks that join into valid CSV and JSON
+def test_stream_chunks():
+    rows = ({"timestamp": f"2026-05-01T10:{index % 60:02d}", "item": "Hemd", "count": index} for index in range(20000))
+    chunks = list(ExportUtils.stream(rows, ["timestamp", "item", "count"], "csv"))
+
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) < ExportUtils.CHUNK_SIZE + 1024
+    assert "".join(chunks).splitlines()[:2] == ["timestamp,item,count", "2026-05-01T10:00,Hemd,0"]
+
+    exported = json.loads("".join(ExportUtils.stream(iter([{"item": "Hemd", "count": 1, "extra": True}]), ["item", "count"], "json")))
+    assert exported == [{"item": "Hemd", "count": 1}]
+    assert json.loads("".join(ExportUtils.stream(iter([]), ["item"], "json"))) == []
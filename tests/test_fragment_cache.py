@@ -0,0 +1,88 @@
+import pytest # Testing framework to define and run test functions
+from fastapi.testclient import TestClient # Simulates requests to the app
+from utilities.fragment_cache import FragmentCache # Class under test
+
+# Stub template environment counting how often a template is fetched for rendering
+class CountingTemplates:
+    def __init__(self):
+        self.calls = 0
+        self.env = self
+
+    def get_template(self, name: str):
+        self.calls += 1
+        return self
+
+    def render(self, context: dict):
+        return f"<p>{context['value']}</p>"
+
+# Pytest fixture provides a small cache over the counting stub
+@pytest.fixture
+def templates():
+    return CountingTemplates()
+
+# Test to verify a repeated key is served from the cache and a callable context only runs on a miss
+def test_hit_skips_rendering_and_context(templates):
+    cache = FragmentCache(templates)
+    context_calls = []
+    context = lambda: context_calls.append(1) or {"value": 1}
+
+    assert cache.render("item.html", ("Hemd", 1), context) == "<p>1</p>"
+    assert cache.render("item.html", ("Hemd", 1), context) == "<p>1</p>"
+    assert (templates.calls, len(context_calls)) == (1, 1)
+
+    cache.render("item.html", ("Hemd", 2), {"value": 2}) # New key renders again
+    assert templates.calls == 2
+
+# Test to verify entries beyond max_entries are evicted least recently used first
+def test_evicts_oldest_entries(templates):
+    cache = FragmentCache(templates, max_entries=2)
+    for value in (1, 2, 3):
+        cache.render("item.html", (value,), {"value": value})
+    assert list(cache.entries) == [("item.html", 2), ("item.html", 3)]
+
+    cache.render("item.html", (1,), {"value": 1}) # Evicted, renders again
+    assert templates.calls == 4
+
+# Test to verify bumping a namespace makes fragments keyed on its version miss
+def test_bump_invalidates_namespace(templates):
+    cache = FragmentCache(templates)
+    cache.render("global_stats.html", (cache.version("global_stats"),), {"value": "old"})
+    cache.bump("global_stats")
+    assert cache.render("global_stats.html", (cache.version("global_stats"),), {"value": "new"}) == "<p>new</p>"
+    assert templates.calls == 2
+
+# Test to verify max_age expires an entry
+def test_max_age_expires(templates, monkeypatch):
+    cache = FragmentCache(templates)
+    now = [100.0]
+    monkeypatch.setattr("utilities.fragment_cache.time.monotonic", lambda: now[0])
+    cache.render("global_stats.html", (0,), {"value": 1}, max_age=5)
+    now[0] += 4
+    cache.render("global_stats.html", (0,), {"value": 1}, max_age=5)
+    assert templates.calls == 1
+    now[0] += 2
+    cache.render("global_stats.html", (0,), {"value": 1}, max_age=5)
+    assert templates.calls == 2
+
+# Test to verify a click back to a count rendered earlier is served from the cache with that count's CO2 and equivalents
+def test_hx_update_serves_cached_fragments(app_client, monkeypatch):
+    from benchmarks.harness import item_names
+    from routes.ui_routes import catalogue, fragments
+    from utilities.utils import AppUtils
+
+    name = item_names()[0]
+    base_co2 = catalogue.base_co2[catalogue.position(name)]
+    click = lambda action: app_client.post("/UI/hx-update", data={"action": action, "item_name": name})
+
+    first = click("increment").text # Count 1, fragments rendered or already cached
+    click("increment")
+    rendered = []
+    get_template = fragments.templates.get_template
+    monkeypatch.setattr(fragments, "templates", type("Spy", (), {"get_template": staticmethod(lambda template: rendered.append(template) or get_template(template))})())
+
+    again = click("decrement") # Back to count 1
+    assert again.status_code == 200
+    assert rendered == [] # Item and equivalents came from the cache
+    assert again.text == first
+    assert f"{name} : {base_co2}" in again.text
+    assert f"{AppUtils.calculate_equivalents(round(base_co2, 2))['wieauto']} km mit dem Auto" in again.text
@@ -0,0 +1,19 @@
+from sqlalchemy import create_engine, text # In-memory SQLite engine whose statements are observed
+from config.metrics import DB_LATENCY, instrument_sqlalchemy, metrics_authorized # Metrics helpers under test
+
+# Test to verify the scrape token check accepts only the configured bearer token
+def test_metrics_token():
+    assert metrics_authorized(None, token=None) # No token configured, scrapes are open
+    assert metrics_authorized("Bearer s3cret", token="s3cret")
+    assert not metrics_authorized("Bearer wrong", token="s3cret")
+    assert not metrics_authorized("Basic s3cret", token="s3cret")
+    assert not metrics_authorized(None, token="s3cret")
+
+# Test to verify SQL latency is labelled with the dialect of the engine that ran the statement
+def test_sql_latency_labelled_by_dialect():
+    instrument_sqlalchemy()
+    sample = lambda: DB_LATENCY.labels("sqlite", "SELECT")._sum.get()
+    before = sample()
+    with create_engine("sqlite://").connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert sample() > before
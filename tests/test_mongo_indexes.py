@@ -0,0 +1,32 @@
+import mongomock # In-memory Mongo collections
+from database.mongo_indexes import MongoIndexManager, MONGO_INDEXES # Class under test and the managed indexes
+
+# Test to verify every managed index is built and listed on its collection
+def test_ensure_builds_every_index():
+    report = MongoIndexManager(mongomock.MongoClient().db).ensure()
+
+    assert report["ready"]
+    for collection, _, options in MONGO_INDEXES:
+        assert report["indexes"][options["name"]]["status"] == "ready"
+        assert options["name"] in report["existing"][collection]
+
+# Test to verify duplicate categories fail only the unique category index and keep the report from being ready
+def test_duplicate_categories_fail_unique_index():
+    db = mongomock.MongoClient().db
+    db.co2.insert_many([{"category": "OBERTEILE", "items": []}, {"category": "OBERTEILE", "items": []}])
+    report = MongoIndexManager(db).ensure()
+
+    assert not report["ready"]
+    assert report["indexes"]["category_unique"]["status"] == "failed"
+    assert report["indexes"]["category_unique"]["error"]
+    assert all(status["status"] == "ready" for name, status in report["indexes"].items() if name != "category_unique")
+    assert "category_unique" not in report["existing"]["co2"]
+
+# Test to verify the diagnostics route returns the manager's report
+def test_diagnostics_route(app_client):
+    from routes.ui_routes import mongo_indexes
+    mongo_indexes.ensure()
+
+    body = app_client.get("/api/diagnostics/mongo-indexes").json()
+    assert body["ready"]
+    assert set(body["indexes"]) == {options["name"] for _, _, options in MONGO_INDEXES}
@@ -0,0 +1,82 @@
+import mongomock # In-memory Mongo collections
+import pytest # Testing framework to define and run test functions
+from pymongo import ReplaceOne # Bulk operation type replayed by the in-memory collections
+from crud.mongo_operations import MongoCRUD # Class under test
+
+GROUPED = [
+    {"category": "OBERTEILE", "items": [{"name": "Hemd", "base_co2": 2.5, "count": 0, "co2": 0}, {"name": "Pulli", "base_co2": 4.0, "count": 0, "co2": 0}]},
+    {"category": "JACKEN", "items": [{"name": "Mantel", "base_co2": 10.0, "count": 0, "co2": 0}]},
+]
+
+# Function to apply bulk operations one document at a time, mongomock rejects the sort option pymongo 4.12 passes to bulk writes
+def per_document_writes(collection):
+    def bulk_write(operations, ordered=True):
+        for operation in operations:
+            if isinstance(operation, ReplaceOne):
+                collection.replace_one(operation._filter, operation._doc, upsert=operation._upsert)
+            else:
+                collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+    collection.bulk_write = bulk_write
+    return collection
+
+# Function to build a MongoCRUD of the given layout on in-memory collections
+def make_mongo(layout: str = "embedded", db=None):
+    db = db if db is not None else mongomock.MongoClient().db
+    return MongoCRUD(co2=per_document_writes(db.co2), sos=db.sessions, logs=db.Event_Logs, items=per_document_writes(db.co2_items), layout=layout)
+
+# Function to reduce item totals to name -> (count, co2) for comparisons
+def totals(mongo):
+    return {row["name"]: (row["count"], row["co2"]) for row in mongo.get_item_totals()}
+
+# Pytest fixture provides a MongoCRUD on empty in-memory collections
+@pytest.fixture
+def mongo():
+    return make_mongo()
+
+# Tests that clearing by id keeps sessions saved after the archived ones were read
+def test_clear_sessions_by_id(mongo):
+    mongo.insert_session(2.5, {"wieauto": 1, "wieflugzeug": 1, "wiebus": 1}, {})
+    archived = mongo.get_all_sessions()
+    mongo.insert_session(4.0, {"wieauto": 1, "wieflugzeug": 1, "wiebus": 1}, {}) # Saved while logging out
+    mongo.clear_sessions([session["_id"] for session in archived])
+    assert [session["session"][0]["ingesamt"] for session in mongo.get_all_sessions()] == [4.0]
+
+    mongo.clear_sessions()
+    assert mongo.get_all_sessions() == []
+
+# Tests that increments, totals and resets behave the same in both layouts
+@pytest.mark.parametrize("layout", ["embedded", "flat"])
+def test_layout_counts(layout):
+    mongo = make_mongo(layout)
+    assert mongo.is_empty()
+    mongo.send_to_mongo(GROUPED)
+    assert not mongo.is_empty()
+
+    mongo.update_item("OBERTEILE", "Hemd", 2, 5.0)
+    mongo.update_item("OBERTEILE", "Hemd", 1, 2.5)
+    mongo.update_item("JACKEN", "Mantel", 1, 10.0)
+    assert totals(mongo) == {"Hemd": (3, 7.5), "Pulli": (0, 0), "Mantel": (1, 10.0)}
+    assert {category["category"]: [item["name"] for item in category["items"]] for category in mongo.get_updated_items()} == {"OBERTEILE": ["Hemd", "Pulli"], "JACKEN": ["Mantel"]}
+
+    mongo.reset_counts(GROUPED)
+    assert totals(mongo) == {"Hemd": (0, 0), "Pulli": (0, 0), "Mantel": (0, 0)}
+
+# Tests that counts survive a migration to the flat layout and back, and that reruns don't duplicate items
+@pytest.mark.parametrize("drop_source", [False, True])
+def test_layout_migrations(drop_source):
+    db = mongomock.MongoClient().db
+    embedded = make_mongo("embedded", db)
+    embedded.send_to_mongo(GROUPED)
+    embedded.update_item("OBERTEILE", "Pulli", 4, 16.0)
+
+    flat = make_mongo("flat", db)
+    assert flat.migrate_to_flat() == {"layout": "flat", "items": 3}
+    assert flat.migrate_to_flat(drop_source=drop_source)["items"] == 3 # Rerun upserts by name
+    assert totals(flat) == {"Hemd": (0, 0), "Pulli": (4, 16.0), "Mantel": (0, 0)}
+    assert embedded.is_empty() == drop_source
+
+    flat.update_item("JACKEN", "Mantel", 2, 20.0) # Counted while running flat
+    assert flat.migrate_to_embedded(drop_source=drop_source) == {"layout": "embedded", "categories": 2, "items": 3}
+    assert totals(embedded) == {"Hemd": (0, 0), "Pulli": (4, 16.0), "Mantel": (2, 20.0)}
+    assert db.co2.count_documents({}) == 2
+    assert flat.is_empty() == drop_source
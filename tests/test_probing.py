@@ -0,0 +1,32 @@
+import time # Simulates slow backends
+from database.probing import BackendProbe # Class under test
+
+# Function to build a candidate answering after a delay, or failing
+def candidate(name, delay=0.0, fails=False, closed=None):
+    def connect():
+        time.sleep(delay)
+        if fails:
+            raise ConnectionError(f"{name} unreachable")
+        return name
+    return (name, connect, lambda resource: closed.append(resource) if closed is not None else None)
+
+# Test to verify the preferred backend wins even when a fallback answers first, and the fallback is closed
+def test_prefers_healthy_cloud_backend():
+    closed = []
+    name, resource = BackendProbe("SQL", [candidate("cloud", delay=0.2), candidate("local", closed=closed)], timeout=1).select()
+    assert (name, resource) == ("cloud", "cloud")
+    assert closed == ["local"]
+
+# Test to verify probes run side by side: a failing cloud backend doesn't delay the fallback beyond its own probe
+def test_falls_back_concurrently():
+    start = time.perf_counter()
+    probe = BackendProbe("Mongo", [candidate("cloud", delay=0.3, fails=True), candidate("local", delay=0.3)], timeout=1)
+    assert probe.select() == ("local", "local")
+    assert time.perf_counter() - start < 0.55
+    assert probe.timings["cloud"]["ok"] is False and probe.timings["cloud"]["error"] == "cloud unreachable"
+
+# Test to verify a cloud probe hanging past its timeout is given up on and nothing reachable returns no backend
+def test_gives_up_on_hanging_and_failed_probes(monkeypatch):
+    monkeypatch.setattr("database.probing.PROBE_GRACE", 0)
+    assert BackendProbe("SQL", [candidate("cloud", delay=2), candidate("local")], timeout=0.2).select() == ("local", "local")
+    assert BackendProbe("SQL", [candidate("cloud", fails=True)], timeout=0.2).select() == (None, None)
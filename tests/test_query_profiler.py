@@ -0,0 +1,27 @@
+import pytest # Testing framework to define and run test functions
+from fastapi import FastAPI # Minimal app wrapped by the middleware
+from fastapi.testclient import TestClient # Simulates requests to the app
+from config.query_profiler import QueryProfilerMiddleware, profiler # Middleware and shared profiler under test
+
+# Test app whose sync handler runs a slow query in the threadpool like the CRUD routes
+app = FastAPI()
+app.add_middleware(QueryProfilerMiddleware)
+
+@app.get("/items/{item_id}")
+def item(item_id: int):
+    profiler.record("sql", "SELECT * FROM items WHERE id = ?", profiler.slow_query_ms + 1)
+    return {"id": item_id}
+
+# Pytest fixture provides a client and clears the shared profiler around each test
+@pytest.fixture
+def client():
+    profiler.reset()
+    yield TestClient(app)
+    profiler.reset()
+
+# Test to verify slow queries run by the handler are logged with the matched route template
+def test_slow_queries_carry_route(client):
+    client.get("/items/7")
+    summary = profiler.summary()
+    assert [entry["route"] for entry in summary["slow_queries"]] == ["GET /items/{item_id}"]
+    assert summary["routes"]["GET /items/{item_id}"]["sql_queries"] == 1
@@ -0,0 +1,34 @@
+import random # Generates saved sessions
+from operator import itemgetter # Sort key of the full sort the ranking replaces
+from crud.tally_operations import Catalogue # Catalogue the ranking is ordered by
+from utilities.ranking import ItemRanking # Class under test
+
+GROUPED = [
+    {"category": "OBERTEILE", "items": [{"name": "Hemd", "base_co2": 2.5}, {"name": "Pulli", "base_co2": 4.0}, {"name": "Bluse", "base_co2": 3.0}]},
+    {"category": "JACKEN", "items": [{"name": "Mantel", "base_co2": 10.0}, {"name": "Weste", "base_co2": 5.0}]},
+]
+
+# Test to verify the ranking matches a stable full sort after every saved item, overall and per category
+def test_matches_full_sort():
+    rows = [{"name": item["name"], "count": 0, "co2": 0} for category in GROUPED for item in category["items"]]
+    ranking = ItemRanking(Catalogue(GROUPED)).seed(rows)
+    generator = random.Random(7)
+    for _ in range(200):
+        row = generator.choice(rows)
+        count = generator.randint(1, 3)
+        row["count"] += count
+        row["co2"] += count * 2.0
+        ranking.add(row["name"], count, count * 2.0)
+        assert ranking.ordered() == sorted(rows, key=itemgetter("count"), reverse=True)
+
+    assert ranking.top(2) == ranking.ordered()[:2]
+    jackets = [row for row in ranking.ordered() if row["name"] in ("Mantel", "Weste")]
+    assert ranking.category("JACKEN") == jackets
+    assert ranking.category("JACKEN", 1) == jackets[:1]
+
+# Test to verify a reset zeroes the counts and falls back to catalogue order
+def test_reset():
+    ranking = ItemRanking(Catalogue(GROUPED)).seed([{"name": "Weste", "count": 4, "co2": 20.0}, {"name": "Hemd", "count": 1, "co2": 2.5}])
+    assert [row["name"] for row in ranking.top(5)] == ["Weste", "Hemd"]
+    ranking.reset()
+    assert ranking.ordered() == [{"name": "Hemd", "count": 0, "co2": 0}, {"name": "Weste", "count": 0, "co2": 0}]
@@ -0,0 +1,24 @@
+from datetime import datetime, date # Session timestamps and query bounds
+from crud.archive_operations import SessionArchive # Archive under test
+
+# Builds a stored session document like MongoCRUD.insert_session
+def session_doc(timestamp, name, count, co2):
+    return {"session": [{"timestamp": timestamp, "ingesamt": co2, "wieauto": 1.0, "wieflugzeug": 1.0, "wiebus": 1.0, "exc_items": {"OBERTEILE": [{"name": name, "count": count, "co2": co2}]}}]}
+
+# Tests that archived events are partitioned by date and queryable per event and per item
+def test_archive_and_query(tmp_path):
+    archive = SessionArchive(tmp_path)
+    may = archive.archive_event([session_doc(datetime(2026, 5, 1, 10), "Hemd", 2, 5.0), session_doc(datetime(2026, 5, 1, 11), "Hemd", 1, 2.5)])
+    archive.archive_event([session_doc(datetime(2026, 6, 1, 10), "Pulli", 3, 12.0)])
+
+    assert (tmp_path / "sessions" / "event_date=2026-05-01" / f"{may['event_id']}.parquet").exists()
+    assert [(row["event_date"], row["sessions"], row["ingesamt"]) for row in archive.event_trends()] == [("2026-05-01", 2, 7.5), ("2026-06-01", 1, 12.0)]
+    assert [(row["item"], row["count"]) for row in archive.item_trends(start=date(2026, 5, 2))] == [("Pulli", 3)]
+    assert archive.item_trends(item="Hemd")[0]["co2"] == 7.5
+    assert archive.archive_event([])["sessions"] == 0
+
+# Tests that sessions without timestamps are archived under the archiving day instead of failing
+def test_archive_without_timestamps(tmp_path):
+    summary = SessionArchive(tmp_path).archive_event([session_doc(None, "Hemd", 1, 2.5)])
+    assert summary["event_date"] == date.today().isoformat()
+    assert summary["sessions"] == 1
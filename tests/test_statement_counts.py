@@ -0,0 +1,45 @@
+import pytest # Testing framework to define and run test functions
+from sqlalchemy import create_engine # SQLAlchemy function to create a connection to a test database
+from sqlalchemy.orm import sessionmaker # A factory for creating database session instances
+from database.database import Base, statement_count # Imports Base class and the per-session statement counter
+from models.models import Category, Item, User, AuditLog # Imports ORM models used to seed and inspect the database
+from crud.operations import ItemCRUD, UserCRUD # Imports the CRUD classes under test
+from schemas.schemas import CreateItem # Imports a request pydantic schema
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:" # In-memory SQLite database reset after each test run
+engine = create_engine(SQLALCHEMY_DATABASE_URL) # Creates database engine using SQLite
+TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False) # Same session settings as SessionLocal
+Base.metadata.create_all(bind=engine) # Creates all database tables based on the models
+
+# Pytest fixture seeds a category and a pending user, then hands a fresh session to the test
+@pytest.fixture
+def db_session():
+    with TestingSessionLocal() as seed:
+        seed.add(Category(name="OBERTEILE"))
+        seed.add(User(first_name="Test", last_name="User", email="user@example.com"))
+        seed.commit()
+
+    session = TestingSessionLocal() # Creates a new database session whose statements are counted from zero
+    try:
+        yield session # Provides the session to the test
+    finally:
+        session.rollback()
+        for model in (AuditLog, User, Item, Category):
+            session.query(model).delete() # Cleans up the seeded rows
+        session.commit()
+        session.close() # Ensures the session is closed after the request
+
+# Test to verify creating an item costs one category lookup and one INSERT with no refresh SELECT afterwards
+def test_create_item_statement_count(db_session):
+    item = ItemCRUD().create_item(db_session, CreateItem(name="Pullover", base_co2=4.0, category_name="OBERTEILE"))
+
+    assert item.id is not None # Generated id is available without a refresh
+    assert statement_count(db_session) == 2 # SELECT category + INSERT item
+
+# Test to verify verifying a user writes the update and its audit row in one unit of work
+def test_verify_user_statement_count(db_session):
+    user = UserCRUD().verify_user(db_session, "user@example.com")
+
+    assert user.is_verified # Attribute is readable after commit without another SELECT
+    assert statement_count(db_session) == 3 # SELECT user + UPDATE user + INSERT audit log
+    assert db_session.query(AuditLog).filter(AuditLog.action == "verify_user").count() == 1 # Audit row was committed with the update
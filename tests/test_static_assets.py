@@ -0,0 +1,50 @@
+import pytest # Testing framework to define and run test functions
+from PIL import Image # Creates the test images
+from starlette.applications import Starlette # Minimal app to mount the static handler on
+from starlette.routing import Mount # Mounts the static handler
+from fastapi.testclient import TestClient # Simulates requests to the app
+from utilities.asset_pipeline import AssetPipeline # Builds the fingerprinted assets
+from config.static_assets import AssetManifest, ImmutableStaticFiles, IMMUTABLE_CACHE # Resolves and serves them
+
+# Pytest fixture provides a static directory with an image and a stylesheet, already built
+@pytest.fixture
+def static_dir(tmp_path):
+    Image.new("RGB", (1600, 900), (40, 120, 80)).save(tmp_path / "bg.jpg")
+    (tmp_path / "styles.css").write_text("body { background-color: white; }\n" * 40)
+    AssetPipeline(tmp_path, widths=[640, 1280], max_width=1500).build()
+    return tmp_path
+
+# Test to verify images get capped and downscaled variants and text assets get precompressed copies
+def test_build_writes_variants_and_encodings(static_dir):
+    manifest = AssetManifest(static_dir / "dist" / "manifest.json")
+    image = manifest.entries["bg.jpg"]
+    assert image["width"] == 1600
+    assert sorted(image["variants"]["jpeg"], key=int) == ["640", "1280", "1500"] # Full size capped at max_width
+    assert "webp" in image["variants"]
+    assert set(manifest.entries["styles.css"]["encodings"]) >= {"gzip"}
+    assert all((static_dir / "dist" / name).is_file() for sizes in image["variants"].values() for name in sizes.values())
+
+# Test to verify a rerun writes nothing and helpers resolve names, unknown names fall back to the plain path
+def test_rebuild_is_incremental_and_urls_resolve(static_dir):
+    pipeline = AssetPipeline(static_dir, widths=[640, 1280], max_width=1500)
+    pipeline.build()
+    assert pipeline.written == 0
+
+    manifest = AssetManifest(static_dir / "dist" / "manifest.json")
+    assert manifest.url("bg.jpg", width=700, fmt="webp").endswith(".w1280.webp") # Smallest variant not below the width
+    assert manifest.url("bg.jpg", width=5000).endswith(".w1500.jpg")
+    assert manifest.url("missing.png") == "/static/missing.png"
+    assert "image/avif" in manifest.image_set("bg.jpg") or "image/webp" in manifest.image_set("bg.jpg")
+
+# Test to verify fingerprinted files are immutable and served precompressed, plain files are left as they were
+def test_static_files_serve_precompressed_and_immutable(static_dir):
+    manifest = AssetManifest(static_dir / "dist" / "manifest.json")
+    client = TestClient(Starlette(routes=[Mount("/static", ImmutableStaticFiles(directory=static_dir))]))
+
+    response = client.get(manifest.url("styles.css"), headers={"accept-encoding": "gzip"})
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.startswith("body {")
+    assert client.get(manifest.url("styles.css"), headers={"accept-encoding": "gzip", "if-none-match": response.headers["etag"]}).status_code == 304
+
+    assert "cache-control" not in client.get("/static/styles.css").headers
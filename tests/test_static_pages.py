@@ -0,0 +1,32 @@
+from types import SimpleNamespace # Stands in for the asset manifest
+from fastapi import APIRouter, FastAPI # Minimal app the pages are registered on
+from fastapi.templating import Jinja2Templates # Wraps the test environment
+from fastapi.testclient import TestClient # Simulates requests to the app
+from config.templates import create_environment # Environment factory the app uses
+from config.static_pages import StaticPageRegistry # Class under test
+
+# Test to verify pages are rendered once, revalidated with their ETag, re-rendered after an asset rebuild and missing templates answer 404
+def test_static_pages(tmp_path):
+    (tmp_path / "approved.html").write_text("<h1>Approved</h1>")
+    manifest = SimpleNamespace(version=1)
+    templates = Jinja2Templates(env=create_environment(tmp_path, cache_dir=None))
+    pages = StaticPageRegistry(templates, manifest)
+    router = APIRouter()
+    pages.page(router, "/approved", "approved.html")
+    pages.page(router, "/missing", "missing.html")
+    app = FastAPI()
+    app.include_router(router, prefix="/email")
+    client = TestClient(app)
+
+    assert pages.render_all() == {"approved.html": True, "missing.html": False}
+    response = client.get("/email/approved")
+    assert response.text == "<h1>Approved</h1>"
+    etag = response.headers["etag"]
+    assert client.get("/email/approved", headers={"if-none-match": etag}).status_code == 304
+    assert client.get("/email/missing").status_code == 404
+
+    (tmp_path / "approved.html").write_text("<h1>Approved again</h1>") # Not picked up until the assets change
+    assert client.get("/email/approved").text == "<h1>Approved</h1>"
+    manifest.version = 2
+    response = client.get("/email/approved", headers={"if-none-match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
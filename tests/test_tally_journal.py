@@ -0,0 +1,55 @@
+import pytest # Testing framework to define and run test functions
+from crud.tally_operations import Catalogue, TallyStore # Tallies being journaled
+from crud.tally_journal import TallyJournal, fcntl # Class under test
+
+GROUPED = [
+    {"category": "OBERTEILE", "items": [{"name": "Hemd", "base_co2": 2.5, "count": 0, "co2": 0}, {"name": "Pulli", "base_co2": 4.0, "count": 0, "co2": 0}]},
+    {"category": "JACKEN", "items": [{"name": "Mantel", "base_co2": 10.0, "count": 0, "co2": 0}]},
+]
+
+# Function to start a store journaled to a directory, as the app does at startup
+def open_store(directory, **options):
+    store = TallyStore(Catalogue(GROUPED))
+    journal = TallyJournal(directory, **options).attach(store)
+    journal.open()
+    return store, journal
+
+# Tests that a crashed process (no close) gets its tallies back from the snapshot plus the log, including a torn last record
+def test_restore_after_crash(tmp_path):
+    store, journal = open_store(tmp_path, fsync="always")
+    first_id, first = store.get()
+    second_id, second = store.get()
+    first.update("Hemd", "increment")
+    first.apply([("Mantel", 2), ("Hemd", 1)])
+    second.update("Pulli", "increment")
+    second.reset()
+    with open(journal.log_path, "ab") as log_file:
+        log_file.write(b'["set","torn",{"He') # Process died mid-write
+    journal.lock_file.close() # The OS releases the lock of a dead process
+
+    restored, _ = open_store(tmp_path)
+    assert len(restored) == 1 # The reset station had nothing to keep
+    assert restored.get(first_id)[1].snapshot() == {"Hemd": 2, "Mantel": 2}
+    assert restored.get(first_id)[1].total() == 25.0
+
+# Tests that compaction empties the log and a clean shutdown leaves everything in the snapshot
+def test_compaction_and_shutdown(tmp_path):
+    store, journal = open_store(tmp_path, snapshot_seconds=0)
+    station_id, tally = store.get()
+    tally.apply([("Pulli", 3)])
+    assert journal.log_path.stat().st_size > 0
+
+    journal.tick() # Snapshot interval of 0 compacts on every tick
+    assert journal.log_path.stat().st_size == 0
+    tally.update("Pulli", "decrement")
+    journal.close()
+
+    restored, _ = open_store(tmp_path)
+    assert restored.get(station_id)[1].snapshot() == {"Pulli": 2}
+
+# Tests that a second process can't append to a journal already in use
+@pytest.mark.skipif(fcntl is None, reason="no advisory file locks on this platform")
+def test_second_process_is_refused(tmp_path):
+    open_store(tmp_path)
+    _, second = open_store(tmp_path)
+    assert second.log is None
@@ -0,0 +1,59 @@
+import pytest # Testing framework to define and run test functions
+from crud.tally_operations import Catalogue, TallyStore # Classes under test
+
+GROUPED = [
+    {"category": "OBERTEILE", "items": [{"name": "Hemd", "base_co2": 2.5, "count": 0, "co2": 0}, {"name": "Pulli", "base_co2": 4.0, "count": 0, "co2": 0}]},
+    {"category": "JACKEN", "items": [{"name": "Mantel", "base_co2": 10.0, "count": 0, "co2": 0}]},
+]
+
+# Tests that two stations count independently
+def test_stations_are_isolated():
+    store = TallyStore(Catalogue(GROUPED))
+    first_id, first = store.get()
+    second_id, second = store.get()
+
+    first.update("Hemd", "increment")
+    first.update("Hemd", "increment")
+    second.update("Mantel", "increment")
+
+    assert first_id != second_id
+    assert store.get(first_id)[1].total() == 5.0
+    assert second.total() == 10.0
+    assert first.exchanged() == {"OBERTEILE": [{"name": "Hemd", "count": 2, "co2": 5.0}]}
+    assert first.grouped()[0]["items"][0] == {"name": "Hemd", "base_co2": 2.5, "count": 2, "co2": 5.0}
+    assert first.update("Unbekannt", "increment") is None
+
+# Tests that idle stations are evicted
+def test_idle_stations_are_evicted():
+    store = TallyStore(Catalogue(GROUPED), idle_seconds=10)
+    station_id, tally = store.get()
+    tally.update("Pulli", "increment")
+
+    store.evict_idle(tally.last_seen + 11)
+
+    assert len(store) == 0
+    assert store.get(station_id)[1].total() == 0 # Same id starts a fresh tally
+
+# Tests that the running total matches the dot product after mixed updates
+def test_running_total_matches_dot_product():
+    store = TallyStore(Catalogue(GROUPED))
+    _, tally = store.get()
+    for name, action in [("Hemd", "increment"), ("Pulli", "increment"), ("Hemd", "decrement"), ("Hemd", "decrement"), ("Mantel", "increment")]:
+        tally.update(name, action)
+
+    assert tally.total() == 14.0
+    assert tally.recompute() == 14.0
+    assert list(tally.counts) == [0, 1, 1]
+
+# Tests that a batch applies in order, stops at zero and leaves the tally untouched when an item is unknown
+def test_batch_is_applied_all_or_nothing():
+    _, tally = TallyStore(Catalogue(GROUPED)).get()
+
+    touched = tally.apply([("Hemd", 3), ("Pulli", -2), ("Hemd", -1), ("Mantel", 1)])
+    assert [(item["name"], item["count"]) for item in touched] == [("Hemd", 2), ("Pulli", 0), ("Mantel", 1)]
+    assert tally.total() == 15.0
+
+    with pytest.raises(KeyError):
+        tally.apply([("Hemd", 5), ("Unbekannt", 1)])
+    assert tally.total() == 15.0
+    assert tally.recompute() == 15.0
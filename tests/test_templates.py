@@ -0,0 +1,24 @@
+from fastapi.templating import Jinja2Templates # Wraps the environment like config.templates does
+from config.templates import create_environment, precompile # Functions under test
+
+# Function to write a small template folder with a partial and one broken template
+def write_templates(directory):
+    (directory / "partials").mkdir(parents=True)
+    (directory / "page.html").write_text("{% include 'partials/item.html' %}")
+    (directory / "partials" / "item.html").write_text("<b>{{ name }}</b>")
+    (directory / "broken.html").write_text("{% if %}")
+
+# Test to verify precompilation compiles pages and partials, reports broken templates and fills the bytecode cache for the next worker
+def test_precompile_and_bytecode_cache(tmp_path):
+    write_templates(tmp_path / "templates")
+    cache_dir = tmp_path / "cache"
+    templates = Jinja2Templates(env=create_environment(tmp_path / "templates", auto_reload=False, cache_dir=str(cache_dir)))
+
+    report = precompile(templates)
+    assert report["templates"] == 2
+    assert list(report["failed"]) == ["broken.html"]
+    assert report["auto_reload"] is False
+    assert len(list(cache_dir.iterdir())) == 2 # One bytecode file per compiled template
+
+    restarted = Jinja2Templates(env=create_environment(tmp_path / "templates", cache_dir=str(cache_dir)))
+    assert restarted.get_template("page.html").render(name="<Hemd>") == "<b>&lt;Hemd&gt;</b>" # Loaded from bytecode, still autoescaped
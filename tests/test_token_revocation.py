@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta # Token expiry times
+from sqlalchemy import create_engine # SQLAlchemy function to create a connection to a test database
+from sqlalchemy.orm import sessionmaker # A factory for creating database session instances
+from database.database import Base # Declarative base holding the RevokedTokens table
+from models.models import RevokedToken # Persisted denylist
+from config.token_revocation import TokenRevocationList # Class under test
+
+# Function to create a file database two workers can share
+def shared_sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'revocations.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+# Test to verify a revocation is seen at once by the worker that logged out and by another worker after its next sync
+def test_revocation_reaches_other_workers(tmp_path):
+    sessions = shared_sessions(tmp_path)
+    first, second = TokenRevocationList(sessions, sync_seconds=0), TokenRevocationList(sessions, sync_seconds=3600)
+    assert second.is_revoked("abc") is False # First check syncs, the next ones are answered from memory
+
+    with sessions() as db:
+        first.revoke(db, "abc", datetime.utcnow() + timedelta(hours=1))
+        first.revoke(db, "abc", datetime.utcnow() + timedelta(hours=1)) # Logging out twice is harmless
+    assert first.is_revoked("abc") is True
+    assert second.is_revoked("abc") is False # Not synced yet
+    second.sync()
+    assert second.is_revoked("abc") is True
+    assert first.is_revoked(None) is False # Tokens without a jti
+
+# Test to verify expired revocations leave memory and are purged from the table
+def test_expired_revocations_are_dropped(tmp_path):
+    sessions = shared_sessions(tmp_path)
+    revocations = TokenRevocationList(sessions, sync_seconds=0, purge_seconds=0)
+    with sessions() as db:
+        revocations.revoke(db, "old", datetime.utcnow() - timedelta(seconds=1))
+        revocations.revoke(db, "new", datetime.utcnow() + timedelta(hours=1))
+    assert revocations.is_revoked("old") is False
+    assert revocations.is_revoked("new") is True
+    with sessions() as db:
+        assert [row.jti for row in db.query(RevokedToken)] == ["new"]
@@ -0,0 +1,184 @@
+import os # Accesses the environment variables and replaces files atomically
+import io # Encodes images in memory
+import gzip # Precompresses text assets
+import json # Writes the asset manifest
+import hashlib # Content hashes for the fingerprinted names
+import logging # Reports skipped formats
+import argparse # Parses command line arguments
+import tempfile # Writes outputs next to their final name before renaming
+from pathlib import Path # Provides object-oriented file system paths
+from dotenv import load_dotenv # Loads secrets from .env.
+
+try:
+    from PIL import Image, ImageOps, features # Converts and resizes images, optional
+except ImportError:
+    Image = None
+try:
+    import brotli # Brotli precompression, optional
+except ImportError:
+    brotli = None
+
+load_dotenv() # Loads Environment Variables from .env File
+
+logger = logging.getLogger(__name__) # Logger instance for module
+
+# Asset Pipeline Configurations
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static" # Source assets
+DIST_NAME = "dist" # Subdirectory of static/ the fingerprinted files are written to
+MANIFEST_NAME = "manifest.json" # Maps source names to their fingerprinted files
+HASH_LENGTH = 12 # Hex characters of the SHA-256 content hash kept in file names
+IMAGE_WIDTHS = [int(width) for width in os.getenv("ASSET_IMAGE_WIDTHS", "640,1280,1920").split(",") if width.strip()] # Downscaled widths, only those smaller than the source are built
+IMAGE_MAX_WIDTH = int(os.getenv("ASSET_IMAGE_MAX_WIDTH", "2560")) # Full size variants are capped at this width
+IMAGE_EXTENSIONS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png"} # Images that get resized and converted variants
+TEXT_EXTENSIONS = {".css", ".js", ".svg", ".json", ".txt"} # Assets that get .gz and .br copies
+MODERN_FORMATS = {"webp": {"quality": 80, "method": 6}, "avif": {"quality": 60, "speed": 6}} # Encoder settings per converted format
+FALLBACK_OPTIONS = {"jpeg": {"quality": 82, "optimize": True, "progressive": True}, "png": {"optimize": True}} # Encoder settings for downscaled originals
+MIN_COMPRESS_BYTES = 256 # Smaller text assets are served as is
+ORIENTATION_TAG = 0x0112 # EXIF orientation
+ROTATED_ORIENTATIONS = {5, 6, 7, 8} # Orientations that turn the image by 90 degrees
+
+# Function to write bytes next to the target and rename them into place so readers never see partial files
+def write_atomic(path: Path, data: bytes):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as out:
+        out.write(data)
+    os.replace(tmp, path)
+
+# Function to list the formats this Pillow build can encode
+def available_formats():
+    if Image is None:
+        return []
+    return [fmt for fmt in MODERN_FORMATS if features.check(fmt)]
+
+# Builds fingerprinted, converted and precompressed copies of the static assets plus a manifest
+class AssetPipeline:
+    def __init__(self, static_dir: Path = STATIC_DIR, widths: list = IMAGE_WIDTHS, max_width: int = IMAGE_MAX_WIDTH):
+        self.static_dir = Path(static_dir)
+        self.dist_dir = self.static_dir / DIST_NAME
+        self.manifest_path = self.dist_dir / MANIFEST_NAME
+        self.widths = sorted(widths)
+        self.max_width = max_width
+        self.formats = available_formats()
+        self.written = 0 # Files written by the last build, unchanged assets are skipped
+
+    # Function to list the source assets, the dist directory and hidden files are skipped
+    def sources(self):
+        return sorted(path for path in self.static_dir.iterdir() if path.is_file() and not path.name.startswith("."))
+
+    # Function to write one output unless a file with that (content hashed) name already exists
+    def emit(self, name: str, render):
+        target = self.dist_dir / name
+        if not target.exists():
+            write_atomic(target, render())
+            self.written += 1
+        return name
+
+    # Function to build every asset and write the manifest, reruns only write what changed
+    def build(self, prune: bool = False):
+        self.dist_dir.mkdir(parents=True, exist_ok=True)
+        self.written = 0
+        manifest = {}
+        for path in self.sources():
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+            stem, suffix = path.stem, path.suffix.lower()
+            entry = {"file": self.emit(f"{stem}.{digest}{suffix}", lambda: data), "size": len(data)}
+            if suffix in IMAGE_EXTENSIONS and Image is not None:
+                entry.update(self.build_image(path, stem, digest, IMAGE_EXTENSIONS[suffix], entry["file"]))
+            elif suffix in TEXT_EXTENSIONS and len(data) >= MIN_COMPRESS_BYTES:
+                entry["encodings"] = self.build_encodings(entry["file"], data)
+            manifest[path.name] = entry
+
+        write_atomic(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+        if prune:
+            self.prune(manifest)
+        logger.info(f"Built {len(manifest)} assets, {self.written} files written to {self.dist_dir}")
+        return manifest
+
+    # Function to build the resized WebP/AVIF variants and downscaled fallbacks of one image, it is only decoded when a variant is missing
+    def build_image(self, path: Path, stem: str, digest: str, own_format: str, original: str):
+        with Image.open(path) as opened:
+            width, height = opened.size # Read from the header
+            if opened.getexif().get(ORIENTATION_TAG) in ROTATED_ORIENTATIONS:
+                width, height = height, width # Camera rotation swaps the displayed dimensions
+        targets = [w for w in self.widths if w < min(width, self.max_width)] + [min(width, self.max_width)] # Requested widths plus the (capped) full size
+        decoded = []
+
+        # Decodes the image once, on the first missing variant
+        def load():
+            if not decoded:
+                with Image.open(path) as opened:
+                    image = ImageOps.exif_transpose(opened) # Applies camera rotation before resizing
+                    image.load()
+                decoded.append(image)
+            return decoded[0]
+
+        variants = {}
+        for fmt in [own_format, *self.formats]:
+            variants[fmt] = {}
+            for target in targets:
+                if fmt == own_format and target == width:
+                    variants[fmt][str(target)] = original # The fingerprinted original already is this variant
+                    continue
+                extension = "jpg" if fmt == "jpeg" else fmt
+                name = f"{stem}.{digest}.w{target}.{extension}"
+                variants[fmt][str(target)] = self.emit(name, lambda t=target, f=fmt: self.encode(load(), t, f))
+        return {"width": width, "height": height, "format": own_format, "variants": variants}
+
+    # Function to resize an image to a width and encode it in a format
+    def encode(self, image, width: int, fmt: str):
+        if width != image.width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB") # JPEG has no alpha channel
+        elif fmt != "jpeg" and image.mode == "P":
+            image = image.convert("RGBA") # Keeps palette transparency in the converted formats
+        options = MODERN_FORMATS.get(fmt) or FALLBACK_OPTIONS.get(fmt, {})
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt.upper(), **options)
+        return buffer.getvalue()
+
+    # Function to write gzip and brotli copies of a text asset next to its fingerprinted file, only encodings that save bytes are kept
+    def build_encodings(self, name: str, data: bytes):
+        encoders = {"gzip": (".gz", lambda: gzip.compress(data, compresslevel=9, mtime=0))}
+        if brotli is not None:
+            encoders["br"] = (".br", lambda: brotli.compress(data, quality=11))
+        encodings = {}
+        for encoding, (suffix, compress) in encoders.items():
+            target = self.dist_dir / f"{name}{suffix}"
+            if not target.exists():
+                compressed = compress()
+                if len(compressed) >= len(data):
+                    continue
+                write_atomic(target, compressed)
+                self.written += 1
+            encodings[encoding] = f"{name}{suffix}"
+        return encodings
+
+    # Function to delete fingerprinted files no longer referenced by the manifest
+    def prune(self, manifest: dict):
+        referenced = {MANIFEST_NAME}
+        for entry in manifest.values():
+            referenced.add(entry["file"])
+            referenced.update(entry.get("encodings", {}).values())
+            referenced.update(name for sizes in entry.get("variants", {}).values() for name in sizes.values())
+        removed = [path for path in self.dist_dir.iterdir() if path.is_file() and path.name not in referenced]
+        for path in removed:
+            path.unlink()
+        return len(removed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build fingerprinted, resized and precompressed static assets")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="Write static/dist and its manifest, unchanged assets are skipped")
+    build_parser.add_argument("--prune", action="store_true", help="Delete fingerprinted files of assets that changed or were removed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pipeline = AssetPipeline()
+    if Image is None:
+        print("Pillow is not installed, images are only fingerprinted")
+    elif len(pipeline.formats) < len(MODERN_FORMATS):
+        print(f"This Pillow build cannot encode {sorted(set(MODERN_FORMATS) - set(pipeline.formats))}, those variants are skipped")
+    manifest = pipeline.build(prune=args.prune)
+    print(f"{len(manifest)} assets in the manifest, {pipeline.written} files written to {pipeline.dist_dir}")
@@ -0,0 +1,75 @@
+import asyncio # Event loop, queues and timeouts for connected streams
+import json # Serialises event payloads
+import threading # Guards the last published snapshot
+from dotenv import load_dotenv # Loads secrets from .env.
+import os # Accesses the environment variables
+
+load_dotenv() # Loads Environment Variables from .env File
+
+# Broadcaster Configurations
+LIVE_TOP_N = int(os.getenv("LIVE_TOP_N", "5")) # Number of top items pushed with every update
+KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", "15")) # Comment lines keep proxies from closing idle streams
+SUBSCRIBER_QUEUE_SIZE = 16 # Slow screens drop their oldest pending update instead of growing memory
+
+# Pushes global exchange statistics computed once per saved session to every connected screen over server-sent events
+class StatsBroadcaster:
+    def __init__(self, top_n: int = LIVE_TOP_N):
+        self.top_n = top_n
+        self.subscribers = set() # One asyncio.Queue per connected screen
+        self.loop = None # Event loop the streams run on, captured on first subscribe
+        self.snapshot = None # Last published {"totals", "session_count", "sorted_items"}
+        self.lock = threading.Lock()
+
+    # Whether any screen is listening, lets routes skip computing stats nobody will see
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    # Drops the last snapshot so the next screen to connect loads fresh stats
+    def invalidate(self):
+        with self.lock:
+            self.snapshot = None
+
+    # Formats a server-sent event
+    @staticmethod
+    def format_event(event: str, payload: dict):
+        return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+    # Publishes new stats from any thread, sending only the items whose count changed since the previous publish
+    def publish(self, totals: dict, session_count: int, sorted_items: list):
+        with self.lock:
+            previous = {item["name"]: item for item in self.snapshot["sorted_items"]} if self.snapshot else {}
+            self.snapshot = {"totals": totals, "session_count": session_count, "sorted_items": sorted_items}
+
+        changed = [item for item in sorted_items if previous.get(item["name"]) != item] # Items new or different since the last update
+        message = self.format_event("delta", {"totals": totals, "session_count": session_count, "top": sorted_items[:self.top_n], "changed": changed})
+
+        if self.loop is not None and self.subscribers:
+            self.loop.call_soon_threadsafe(self.fanout, message) # Queues are only touched on the event loop thread
+
+    # Hands a message to every subscriber queue
+    def fanout(self, message: str):
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait() # Drops the oldest update for a screen that isn't keeping up
+            queue.put_nowait(message)
+
+    # Streams the current snapshot followed by every published update until the client disconnects
+    async def subscribe(self, request, load_snapshot):
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        try:
+            if self.snapshot is None:
+                totals, session_count, sorted_items = await load_snapshot() # Computed once, then shared with later screens
+                with self.lock:
+                    if self.snapshot is None:
+                        self.snapshot = {"totals": totals, "session_count": session_count, "sorted_items": sorted_items}
+            yield self.format_event("snapshot", {**self.snapshot, "top": self.snapshot["sorted_items"][:self.top_n]})
+
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self.subscribers.discard(queue)
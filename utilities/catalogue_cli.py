@@ -0,0 +1,42 @@
+import argparse # Parses command line arguments
+import sys # Writes exports to stdout
+from pathlib import Path # Provides object-oriented file system paths
+from database.database import SessionLocal # Provides database sessions outside of FastAPI
+from crud.operations import CatalogueCRUD # Imports the bulk catalogue operations
+from utilities.utils import CatalogueUtils # Imports catalogue parsing and serialisation helpers
+
+# Imports a CSV or JSON catalogue file into the database
+def import_file(path: str, fmt: str = None):
+    fmt = fmt or Path(path).suffix.lstrip(".").lower() # Falls back to the file extension
+    categories, items = CatalogueUtils.parse(Path(path).read_bytes(), fmt)
+    with SessionLocal() as db:
+        summary = CatalogueCRUD().import_catalogue(db, categories, items)
+    print(f"Imported {summary['categories']} categories and {summary['items']} items")
+
+# Exports the catalogue as CSV or JSON to a file or stdout
+def export_file(path: str = None, fmt: str = "csv"):
+    with SessionLocal() as db:
+        chunks = CatalogueUtils.export(CatalogueCRUD().iter_catalogue(db), fmt)
+        if path:
+            with open(path, "w", encoding="utf-8", newline="") as out:
+                out.writelines(chunks)
+        else:
+            sys.stdout.writelines(chunks)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import or export the item catalogue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = sub.add_parser("import", help="Upsert categories and items from a CSV or JSON file")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=["csv", "json"])
+
+    export_parser = sub.add_parser("export", help="Write the catalogue as CSV or JSON")
+    export_parser.add_argument("file", nargs="?")
+    export_parser.add_argument("--format", choices=["csv", "json"], default="csv")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        import_file(args.file, args.format)
+    else:
+        export_file(args.file, args.format)
@@ -0,0 +1,54 @@
+import os # Accesses the environment variables
+import time # Ages cached fragments
+import threading # Guards the cache from concurrent threadpool requests
+from collections import OrderedDict, defaultdict # LRU storage and per-namespace versions
+from dotenv import load_dotenv # Loads secrets from .env.
+
+load_dotenv() # Loads Environment Variables from .env File
+
+# Fragment Cache Configurations
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "1024")) # Maximum number of rendered fragments kept
+GLOBAL_STATS_MAX_AGE = float(os.getenv("GLOBAL_STATS_MAX_AGE", "5")) # Seconds a global stats fragment may be served, bounds staleness when another worker saved a session
+
+# LRU cache of rendered HTMX partials keyed by the values they depend on
+class FragmentCache:
+    def __init__(self, templates, max_entries: int = FRAGMENT_CACHE_SIZE):
+        self.templates = templates # Jinja2Templates instance used to render misses
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # Key -> (rendered html, rendered at)
+        self.versions = defaultdict(int) # Namespace -> version, bumped to invalidate every fragment of that namespace
+        self.lock = threading.Lock()
+
+    # Returns the current version of a namespace to include in fragment keys
+    def version(self, namespace: str):
+        return self.versions[namespace]
+
+    # Invalidates every fragment keyed on this namespace's version
+    def bump(self, namespace: str):
+        with self.lock:
+            self.versions[namespace] += 1
+
+    # Returns the cached fragment for key or renders the template, context may be a callable so expensive lookups only run on a miss
+    def render(self, template_name: str, key: tuple, context, max_age: float = None):
+        cache_key = (template_name,) + tuple(key)
+        now = time.monotonic()
+
+        with self.lock:
+            hit = self.entries.get(cache_key)
+            if hit and (max_age is None or now - hit[1] < max_age):
+                self.entries.move_to_end(cache_key) # Marks as recently used
+                return hit[0]
+
+        html = self.templates.get_template(template_name).render(context() if callable(context) else context) # Renders outside the lock
+
+        with self.lock:
+            self.entries[cache_key] = (html, now)
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False) # Evicts the least recently used fragment
+        return html
+
+    # Drops every cached fragment
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
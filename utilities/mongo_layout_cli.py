@@ -0,0 +1,22 @@
+import argparse # Parses command line arguments
+from database.database import Co2 # Connects to Atlas or the local MongoDB
+from crud.mongo_operations import MongoCRUD # Imports the layout migrations
+
+# Copies item data between the embedded (co2) and flat (co2_items) layouts
+def migrate(target: str, drop_source: bool = False):
+    client = Co2()
+    mongo = MongoCRUD(co2=client.co2, sos=client.sos, logs=client.logs, items=client.items, layout=target)
+    summary = mongo.migrate_to_flat(drop_source) if target == "flat" else mongo.migrate_to_embedded(drop_source)
+    print(f"Migrated to the {summary['layout']} layout: {summary}")
+    print(f"Set MONGO_LAYOUT={target} and restart the app to use it")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate Mongo item data between the embedded and flat layouts")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = sub.add_parser("migrate", help="Copy item counts into the target layout, safe to rerun")
+    migrate_parser.add_argument("--to", dest="target", choices=["flat", "embedded"], required=True)
+    migrate_parser.add_argument("--drop-source", action="store_true", help="Empty the source collection after copying")
+
+    args = parser.parse_args()
+    migrate(args.target, args.drop_source)
@@ -0,0 +1,96 @@
+import os # Accesses the environment variables
+import time # Ages the ranking against the database
+import threading # Guards the ranking from concurrent threadpool requests
+from bisect import bisect_left, insort # Binary search into the ordered keys
+from dotenv import load_dotenv # Loads secrets from .env.
+
+load_dotenv() # Loads Environment Variables from .env File
+
+# Ranking Configurations
+RANKING_RESYNC_SECONDS = float(os.getenv("RANKING_RESYNC_SECONDS", "60")) # Reloads the ranking from Mongo this often so sessions saved by other workers show up, 0 never reloads
+
+# Items ordered by exchanged count, kept in order as saved sessions add to the counts instead of sorted on every request
+class ItemRanking:
+    def __init__(self, catalogue, resync_seconds: float = RANKING_RESYNC_SECONDS):
+        self.resync_seconds = resync_seconds
+        self.order = dict(catalogue.index) # Item name -> tie breaker, equal counts keep the catalogue order like a stable sort did
+        self.category_of = {catalogue.names[position]: category for category, positions in catalogue.categories for position in positions}
+        self.totals = {} # Item name -> [count, co2]
+        self.keys = [] # (-count, order, name) ascending, so the most exchanged item comes first
+        self.category_keys = {category: [] for category, _ in catalogue.categories} # Same keys per category
+        self.seeded_at = None
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.totals)
+
+    # Function to build the key an item is ordered by
+    def key(self, name: str, count: int):
+        order = self.order.setdefault(name, len(self.order)) # Items missing from the catalogue go last among equals
+        return (-count, order, name)
+
+    # Function to replace the ranking with the item totals read from Mongo, one sort per reload
+    def seed(self, rows: list):
+        with self.lock:
+            self.totals = {row["name"]: [row.get("count", 0), row.get("co2", 0)] for row in rows}
+            self.keys = sorted(self.key(name, total[0]) for name, total in self.totals.items())
+            self.category_keys = {category: [] for category in self.category_keys}
+            for key in self.keys: # Already in order, appending keeps every category list sorted
+                category = self.category_of.get(key[2])
+                if category is not None:
+                    self.category_keys[category].append(key)
+            self.seeded_at = time.monotonic()
+        return self
+
+    # Function to tell whether the ranking should be reloaded from Mongo
+    def stale(self):
+        if self.seeded_at is None:
+            return True
+        return self.resync_seconds > 0 and time.monotonic() - self.seeded_at >= self.resync_seconds
+
+    # Function to move one item after its count changed, a binary search to remove and one to insert
+    def move(self, name: str, old_count: int, new_count: int):
+        for keys in (self.keys, self.category_keys.get(self.category_of.get(name))):
+            if keys is None:
+                continue
+            old_key = self.key(name, old_count)
+            position = bisect_left(keys, old_key)
+            if position < len(keys) and keys[position] == old_key:
+                del keys[position]
+            insort(keys, self.key(name, new_count))
+
+    # Function to add a saved session's count and CO2 of one item, mirroring the $inc sent to Mongo
+    def add(self, name: str, count: int, co2: float):
+        with self.lock:
+            total = self.totals.setdefault(name, [0, 0])
+            self.move(name, total[0], total[0] + count)
+            total[0] += count
+            total[1] += co2
+
+    # Function to zero every count after the database counts were reset, the order falls back to the catalogue order
+    def reset(self):
+        with self.lock:
+            for total in self.totals.values():
+                total[0] = total[1] = 0
+            self.keys = sorted(self.key(name, 0) for name in self.totals)
+            self.category_keys = {category: [key for key in self.keys if self.category_of.get(key[2]) == category] for category in self.category_keys}
+
+    # Function to build the item rows for a slice of ordered keys
+    def rows(self, keys):
+        return [{"name": name, "count": self.totals[name][0], "co2": self.totals[name][1]} for _, _, name in keys]
+
+    # Function to return the n most exchanged items
+    def top(self, n: int):
+        with self.lock:
+            return self.rows(self.keys[:n])
+
+    # Function to return every item, most exchanged first
+    def ordered(self):
+        with self.lock:
+            return self.rows(self.keys)
+
+    # Function to return the items of one category, most exchanged first, or only its n first
+    def category(self, category: str, n: int = None):
+        with self.lock:
+            keys = self.category_keys.get(category, [])
+            return self.rows(keys if n is None else keys[:n])
@@ -3,8 +3,15 @@ from sqlalchemy.orm import Session  # For database transactions
 from fastapi import Request  # To extract request context 
 from typing import Dict, Any, Optional  # For typing hints
 from models.models import AuditLog  # Imports the AuditLog ORM model
+from schemas.schemas import CreateCategory, CreateItem # Imports schemas used to validate imported catalogues
+from config.metrics import AUDIT_ROWS # Counts audit rows written
+from config.emission_factors import EMISSION_FACTORS # Grams of CO2 per passenger km by mode of transport
 from operator import itemgetter # Sorts specific dictionary values by key.
 from datetime import datetime #  Used to get the current date and time
+import csv # Reads and writes catalogue CSV files
+import io # In-memory text buffers for CSV parsing and streaming
+import json # Reads and writes catalogue JSON files
+import numpy as np # Computes equivalents and totals for many sessions at once
 
 # Utility class for recording audit logs into the database
 class AuditLogger:
@@ -20,7 +27,8 @@ class AuditLogger:
         status: str = "success",  # Status of the action ("success" or "failure")
         details: Dict[str, Any] = None,  # Extra details about the operation in dictionary format
         error_message: str = None,  # Error message if action failed
-        request: Optional[Request] = None  # Request object for extracting IP, headers, etc.
+        request: Optional[Request] = None,  # Request object for extracting IP, headers, etc.
+        commit: bool = True  # Commits straight away, or leaves the row to the caller's unit of work when False
     ):
         # Collects request context if available
         ip_address = request.client.host if request else None  # Extracts client IP address
@@ -44,8 +52,9 @@ class AuditLogger:
         )
 
         db.add(log)  # Adds the log to the current database session
-        db.commit()  # Commits transaction to save permanently into the database
-        db.refresh(log)  # Refreshes the log object with DB-generated values (like ID)
+        AUDIT_ROWS.inc()  # Counts the audit row for the metrics endpoint
+        if commit:
+            db.commit()  # Commits transaction to save permanently into the database, the generated ID comes back through RETURNING
         return log  # Returns the created audit log object for reference
 
 
@@ -58,11 +67,22 @@ class AppUtils:
     # Method to calculate CO2 equivalents for different modes of transport
     @staticmethod
     def calculate_equivalents(total_co2): 
-        return{
-            "wieauto": round(total_co2 / (170.65 / 1000), 2), # 0.2Kg CO2 per Km
-            "wieflugzeug": round(total_co2 / (181.59 / 1000), 2), # 0.2Kg CO2 per Km
-            "wiebus": round(total_co2 /(27.33 / 1000), 2) # 0.05Kg CO2 per Km
-        }
+        return {mode: round(total_co2 / (grams / 1000), 2) for mode, grams in EMISSION_FACTORS.items()} # Km a passenger could travel for the same CO2
+
+    # Method to calculate the equivalents of many CO2 totals in one pass, returning an array per mode of transport
+    @staticmethod
+    def batch_equivalents(totals):
+        totals = np.asarray(totals, dtype=float)
+        km_per_kg = 1000 / np.fromiter(EMISSION_FACTORS.values(), dtype=float) # Km per kg CO2 for each mode
+        equivalents = np.outer(totals, km_per_kg).round(2) # One row per total, one column per mode
+        return dict(zip(EMISSION_FACTORS, equivalents.T))
+
+    # Method to return the equivalents and running sums of a series of session totals, e.g. to recompute an event with current factors
+    @staticmethod
+    def batch_totals(totals):
+        totals = np.asarray(totals, dtype=float)
+        running = np.cumsum(totals) # Cumulative CO2 after each session
+        return AppUtils.batch_equivalents(totals), {"ingesamt": running.round(2), **AppUtils.batch_equivalents(running)}
     
     # Method to flatten nested MongoDB documents into a list of item dictionaries for simplified rendering
     @staticmethod
@@ -88,22 +108,99 @@ class AppUtils:
     # Method to return calculated totals and session counts from documents
     @staticmethod
     def calculate_total(session_list):
-        totals = {"ingesamt": 0, "wieauto": 0, "wieflugzeug": 0, "wiebus": 0}
-        session_count = 0
-        for doc in session_list:  # Loops through all stored sessions in the Database to calculate cumulative totals and number of sessions
-                session = doc['session'][0]
-                totals["ingesamt"] += session.get("ingesamt", 0)
-                totals["wieauto"] += session.get("wieauto", 0)
-                totals["wieflugzeug"] += session.get("wieflugzeug", 0)
-                totals["wiebus"] += session.get("wiebus", 0)
-                session_count += 1 # Each time the for loop finds a doc, the session count is increased by 1
-
-        # Rounds off all totals to 2 decimal places before returning
-        for key in totals:
-            totals[key] = round(totals[key], 2)
-
-        return totals, session_count
+        fields = ("ingesamt", *EMISSION_FACTORS)
+        values = np.array([[doc['session'][0].get(field, 0) for field in fields] for doc in session_list], dtype=float).reshape(-1, len(fields)) # One row per stored session
+        sums = values.sum(axis=0).round(2) # Cumulative totals rounded to 2 decimal places
+        return dict(zip(fields, sums.tolist())), len(values)
     
+class CatalogueUtils:
+    CSV_COLUMNS = ["category", "description", "name", "base_co2"] # Header shared by import and export, rows without a name only declare a category
+
+    # Method to parse an uploaded CSV or JSON catalogue into validated category and item schemas
+    @staticmethod
+    def parse(content: bytes, fmt: str):
+        text = content.decode("utf-8-sig") # Tolerates BOMs written by spreadsheet tools
+        categories, items = [], []
+
+        if fmt == "json":
+            data = json.loads(text)
+            categories = [CreateCategory(**category) for category in data.get("categories", [])]
+            items = [CreateItem(**item) for item in data.get("items", [])]
+        elif fmt == "csv":
+            for row in csv.DictReader(io.StringIO(text)):
+                category = (row.get("category") or "").strip()
+                if not category:
+                    continue # Skips blank lines
+                categories.append(CreateCategory(name=category, description=(row.get("description") or None)))
+                if (row.get("name") or "").strip():
+                    items.append(CreateItem(name=row["name"].strip(), base_co2=float(row["base_co2"]), category_name=category))
+        else:
+            raise ValueError(f"Unsupported catalogue format '{fmt}'")
+
+        return categories, items
+
+    # Method to serialise (category, description, item, base_co2) rows chunk by chunk for streaming responses
+    @staticmethod
+    def export(rows, fmt: str):
+        if fmt not in ("csv", "json"):
+            raise ValueError(f"Unsupported catalogue format '{fmt}'")
+
+        buffer = io.StringIO()
+        if fmt == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(CatalogueUtils.CSV_COLUMNS)
+        else:
+            buffer.write('{"items": [') # Items are streamed as they arrive, the few categories follow once all are known
+        categories = {} # Category name -> description, in catalogue order
+        items = 0
+
+        for category, description, name, base_co2 in rows:
+            if fmt == "csv":
+                writer.writerow([category, description or "", name or "", "" if base_co2 is None else base_co2])
+            else:
+                categories.setdefault(category, description)
+                if name is not None:
+                    buffer.write(("" if items == 0 else ", ") + json.dumps({"name": name, "base_co2": base_co2, "category_name": category}))
+                    items += 1
+            if buffer.tell() >= ExportUtils.CHUNK_SIZE:
+                yield buffer.getvalue() # Sends a full chunk and starts over with an empty buffer
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        if fmt == "json":
+            buffer.write('], "categories": [' + ", ".join(json.dumps({"name": category, "description": description}) for category, description in categories.items()) + "]}") # Same keys parse reads, in any order
+        yield buffer.getvalue()
+
+class ExportUtils:
+    CHUNK_SIZE = 64 * 1024 # Characters buffered before a chunk is sent
+
+    # Method to serialise dict rows as CSV or a JSON array chunk by chunk for streaming responses
+    @staticmethod
+    def stream(rows, columns: list, fmt: str):
+        if fmt not in ("csv", "json"):
+            raise ValueError(f"Unsupported export format '{fmt}'")
+
+        buffer = io.StringIO()
+        if fmt == "csv":
+            writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+        else:
+            buffer.write("[")
+
+        for index, row in enumerate(rows):
+            if fmt == "csv":
+                writer.writerow(row)
+            else:
+                buffer.write(("" if index == 0 else ", ") + json.dumps({column: row.get(column) for column in columns}, default=str))
+            if buffer.tell() >= ExportUtils.CHUNK_SIZE:
+                yield buffer.getvalue() # Sends a full chunk and starts over with an empty buffer
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        if fmt == "json":
+            buffer.write("]")
+        yield buffer.getvalue()
+
 # Utility function to print debug messages to the console for development purposes
 def debug_print(msg, value=None):
     # Prints a message with value if provided, otherwise prints only the message